@@ -0,0 +1,231 @@
+"""
+Throughput benchmark for the campaign send path.
+
+Seeds an organization with N contacts, a template and a campaign, then runs
+``tasks.campaigns.send_campaign`` (every batch in-process, no broker) against
+either the counting ``null`` transport or an in-process SMTP sink, and reports
+emails/sec, per-transaction latency percentiles, DB statements per message and
+peak RSS as JSON. Each case runs in its own subprocess so peak RSS and module
+state are per case.
+
+    python -m benchmarks.send_pipeline --sizes 1000,100000 --output bench.json
+
+Without ``--database-url`` every case gets a fresh SQLite file; against
+Postgres each case seeds its own organization and leaves it in place.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+TRANSPORTS = ("null", "sink")
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def seed_workspace(size: int) -> int:
+    """Create an organization, template, campaign and ``size`` contacts; return the campaign id."""
+    from email_marketing_backend.db.models import Campaign, Contact, EmailTemplate, Organization
+    from email_marketing_backend.extensions import db
+    from email_marketing_backend.services.bulk import bulk_insert
+    from email_marketing_backend.services.load_data import contact_fields
+
+    suffix = f"{os.getpid()}-{time.time_ns()}"
+    org = Organization(name=f"Bench {suffix}", slug=f"bench-{suffix}")
+    db.session.add(org)
+    db.session.flush()
+    template = EmailTemplate(
+        organization_id=org.id,
+        name="Bench",
+        subject="Benchmark",
+        html="<table><tr><td><h1>Hello</h1><p>"
+        + "Lorem ipsum dolor sit amet. " * 40
+        + "</p></td></tr></table>",
+    )
+    db.session.add(template)
+    db.session.flush()
+    campaign = Campaign(
+        organization_id=org.id, name="Bench", template_id=template.id, status="sending"
+    )
+    db.session.add(campaign)
+    db.session.flush()
+
+    now = datetime.now(tz=timezone.utc)
+    bulk_insert(
+        db.session,
+        Contact.__table__,
+        ("organization_id", "email", "created_at", "updated_at"),
+        ((org.id, contact_fields(0, idx)[0], now, now) for idx in range(size)),
+    )
+    db.session.commit()
+    return campaign.id
+
+
+def run_case(size: int, transport: str) -> dict:
+    """Seed and send one audience in this process; returns the measurements."""
+    from sqlalchemy import event
+
+    from email_marketing_backend import create_app
+    from email_marketing_backend.extensions import db
+    from email_marketing_backend.services.email import get_mail_transport
+    from email_marketing_backend.services.smtp_sink import SMTPSink
+    from email_marketing_backend.tasks import campaigns as campaign_tasks
+
+    app = create_app()
+    sink = None
+    with app.app_context():
+        if app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite"):
+            db.create_all()
+        campaign_id = seed_workspace(size)
+
+        if transport == "sink":
+            sink = SMTPSink(record=False).start()
+            app.config.update(MAIL_TRANSPORT="smtp_pool", SMTP_HOST=sink.host, SMTP_PORT=sink.port)
+        else:
+            app.config.update(MAIL_TRANSPORT="null")
+        app.config.update(SMTP_DISPATCH_MODE="sync", THROTTLE_ENABLED=False)
+
+        latencies: list[float] = []
+        send = campaign_tasks.send_prepared_email
+
+        def timed_send(prepared, to_emails):
+            started = time.perf_counter()
+            try:
+                return send(prepared, to_emails)
+            finally:
+                latencies.append(time.perf_counter() - started)
+
+        statements = 0
+
+        def count_statement(*_args) -> None:
+            nonlocal statements
+            statements += 1
+
+        campaign_tasks.send_prepared_email = timed_send
+        event.listen(db.engine, "before_cursor_execute", count_statement)
+        started = time.perf_counter()
+        try:
+            summary = campaign_tasks.send_campaign(campaign_id)
+        finally:
+            elapsed = time.perf_counter() - started
+            event.remove(db.engine, "before_cursor_execute", count_statement)
+            campaign_tasks.send_prepared_email = send
+            if sink is not None:
+                sink.stop()
+
+        delivered = sink.message_count if sink is not None else get_mail_transport().messages
+        recipients = summary.get("recipients", 0)
+        return {
+            "audience": size,
+            "transport": transport,
+            "status": summary.get("status"),
+            "recipients": recipients,
+            "failures": summary.get("failures", 0),
+            "messages_delivered": delivered,
+            "duration_s": round(elapsed, 3),
+            "emails_per_sec": round(recipients / elapsed, 1) if elapsed else 0.0,
+            "latency_ms": {
+                "p50": round(percentile(latencies, 50) * 1000, 4),
+                "p99": round(percentile(latencies, 99) * 1000, 4),
+            },
+            "db_statements": statements,
+            "db_statements_per_message": round(statements / recipients, 4) if recipients else None,
+            # ru_maxrss is KiB on Linux, bytes on macOS.
+            "peak_rss_mb": round(
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                / (1024 * 1024 if sys.platform == "darwin" else 1024),
+                1,
+            ),
+        }
+
+
+def _spawn_case(size: int, transport: str, database_url: str | None, workdir: str) -> dict:
+    env = dict(os.environ)
+    env.setdefault("API_KEYS", "bench-key")
+    env["DATABASE_URL"] = database_url or f"sqlite:///{workdir}/bench-{transport}-{size}.db"
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.send_pipeline", "--case", f"{size}:{transport}"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if completed.returncode != 0:
+        return {"audience": size, "transport": transport, "error": completed.stderr[-2000:]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES))
+    parser.add_argument("--transports", default=",".join(TRANSPORTS))
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--output", default=None, help="write JSON here instead of stdout")
+    parser.add_argument("--case", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case:
+        size, _, transport = args.case.partition(":")
+        print(json.dumps(run_case(int(size), transport)))
+        return 0
+
+    transports = [name.strip() for name in args.transports.split(",") if name.strip()]
+    unknown = set(transports) - set(TRANSPORTS)
+    if unknown:
+        parser.error(f"unknown transports: {', '.join(sorted(unknown))}")
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="send-bench-") as workdir:
+        for size in sizes:
+            for transport in transports:
+                result = _spawn_case(size, transport, args.database_url, workdir)
+                print(json.dumps(result), file=sys.stderr)
+                results.append(result)
+
+    report = {
+        "benchmark": "send_pipeline",
+        "created_at": datetime.now(tz=timezone.utc).isoformat(),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": (args.database_url or "sqlite").split(":", 1)[0],
+        "batch_size": int(os.environ.get("CAMPAIGN_BATCH_SIZE", "500")),
+        "results": results,
+    }
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(payload + "\n")
+    else:
+        print(payload)
+    return 0 if all("error" not in result for result in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
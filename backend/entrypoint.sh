@@ -1,6 +1,12 @@
 #!/usr/bin/env sh
 set -eu
 
+if [ -n "${PROMETHEUS_MULTIPROC_DIR:-}" ]; then
+  # Metric files from a previous run would be summed into the new one.
+  rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+  mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
 if [ "${RUN_MIGRATIONS:-1}" = "1" ]; then
   echo "Waiting for database..."
   python - <<'PY'
@@ -12,3 +12,8 @@ accesslog = "-"
 errorlog = "-"
 loglevel = os.getenv("LOG_LEVEL", "info")
 
+
+def child_exit(server, worker):
+    from email_marketing_backend.metrics import mark_process_dead
+
+    mark_process_dead(worker.pid)
@@ -0,0 +1,27 @@
+"""add email_sends recipient index
+
+Revision ID: 3e6a1f2b9c47
+Revises: 7c0b3c8156b2
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "3e6a1f2b9c47"
+down_revision = "7c0b3c8156b2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Bulk status flushes update rows by (campaign_id, to_email).
+    op.create_index(
+        "ix_email_sends_campaign_id_to_email", "email_sends", ["campaign_id", "to_email"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_email_sends_campaign_id_to_email", table_name="email_sends")
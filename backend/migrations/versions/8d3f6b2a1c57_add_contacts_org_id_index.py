@@ -0,0 +1,28 @@
+"""replace contacts organization index with (organization_id, id)
+
+Revision ID: 8d3f6b2a1c57
+Revises: 4f2b8d1e6a93
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "8d3f6b2a1c57"
+down_revision = "4f2b8d1e6a93"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keyset pages (WHERE organization_id = :org AND id > :after ORDER BY id)
+    # become a range scan; the composite index still serves organization-only lookups.
+    op.create_index("ix_contacts_organization_id_id", "contacts", ["organization_id", "id"])
+    op.drop_index("ix_contacts_organization_id", table_name="contacts")
+
+
+def downgrade():
+    op.create_index("ix_contacts_organization_id", "contacts", ["organization_id"])
+    op.drop_index("ix_contacts_organization_id_id", table_name="contacts")
@@ -0,0 +1,28 @@
+"""add deferred counter to campaign batches
+
+Revision ID: 9b4e7d2c1a63
+Revises: 5d8c2a7e4f10
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9b4e7d2c1a63"
+down_revision = "5d8c2a7e4f10"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "campaign_batches",
+        sa.Column("deferred", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade():
+    op.drop_column("campaign_batches", "deferred")
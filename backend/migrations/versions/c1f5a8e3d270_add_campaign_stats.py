@@ -0,0 +1,53 @@
+"""add campaign stats
+
+Revision ID: c1f5a8e3d270
+Revises: 9b4e7d2c1a63
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c1f5a8e3d270"
+down_revision = "9b4e7d2c1a63"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "campaign_stats",
+        sa.Column("campaign_id", sa.Integer(), nullable=False),
+        sa.Column("queued", sa.Integer(), nullable=False),
+        sa.Column("sent", sa.Integer(), nullable=False),
+        sa.Column("failed", sa.Integer(), nullable=False),
+        sa.Column("deferred", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["campaign_id"], ["campaigns.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("campaign_id"),
+    )
+    # Backfill from the existing send log; from here on the writer keeps it current.
+    op.execute(
+        """
+        INSERT INTO campaign_stats
+            (campaign_id, queued, sent, failed, deferred, created_at, updated_at)
+        SELECT
+            campaign_id,
+            SUM(CASE WHEN status = 'queued' THEN 1 ELSE 0 END),
+            SUM(CASE WHEN status = 'sent' THEN 1 ELSE 0 END),
+            SUM(CASE WHEN status = 'failed' THEN 1 ELSE 0 END),
+            SUM(CASE WHEN status = 'deferred' THEN 1 ELSE 0 END),
+            CURRENT_TIMESTAMP,
+            CURRENT_TIMESTAMP
+        FROM email_sends
+        GROUP BY campaign_id
+        """
+    )
+
+
+def downgrade():
+    op.drop_table("campaign_stats")
@@ -0,0 +1,30 @@
+"""add compiled output columns to email templates
+
+Revision ID: e7a2c4d9b815
+Revises: c1f5a8e3d270
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e7a2c4d9b815"
+down_revision = "c1f5a8e3d270"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing rows stay NULL and are compiled on the fly until next saved.
+    op.add_column("email_templates", sa.Column("compiled_html", sa.Text(), nullable=True))
+    op.add_column("email_templates", sa.Column("compiled_text", sa.Text(), nullable=True))
+    op.add_column("email_templates", sa.Column("content_hash", sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    op.drop_column("email_templates", "content_hash")
+    op.drop_column("email_templates", "compiled_text")
+    op.drop_column("email_templates", "compiled_html")
@@ -13,6 +13,9 @@ from .api.auth import auth_bp
 from . import db as _models  # noqa: F401  # ensure models register with SQLAlchemy
 from .cli import register_cli
 from .errors import register_error_handlers
+from .instrumentation import register_sql_instrumentation
+from .metrics import InstrumentedQueuePool, register_metrics
+from .tracing import register_tracing
 from .api.authz import authenticate_request
 
 
@@ -27,13 +30,19 @@ def create_app() -> Flask:
             {}
             if is_sqlite
             else {
+                "poolclass": InstrumentedQueuePool,
                 "pool_pre_ping": True,
                 "pool_size": settings.db_pool_size,
                 "max_overflow": settings.db_max_overflow,
                 "pool_timeout": settings.db_pool_timeout,
             }
         ),
-        CELERY=dict(broker_url=settings.celery_broker_url, result_backend=settings.celery_result_backend),
+        REDIS_URL=settings.redis_url,
+        CELERY=dict(
+            broker_url=settings.celery_broker_url,
+            result_backend=settings.celery_result_backend,
+            broker_transport_options={"visibility_timeout": settings.celery_visibility_timeout},
+        ),
         API_VERSION=settings.version,
         API_KEYS=settings.api_keys,
         TOKEN_TTL_MINUTES=settings.token_ttl_minutes,
@@ -44,6 +53,45 @@ def create_app() -> Flask:
         SMTP_PASSWORD=settings.smtp_password,
         SMTP_USE_TLS=settings.smtp_use_tls,
         SMTP_FROM_EMAIL=settings.smtp_from_email,
+        CAMPAIGN_BATCH_SIZE=settings.campaign_batch_size,
+        CAMPAIGN_STALL_MINUTES=settings.campaign_stall_minutes,
+        SEND_LOG_FLUSH_SIZE=settings.send_log_flush_size,
+        SEND_LOG_FLUSH_SECONDS=settings.send_log_flush_seconds,
+        SMTP_TIMEOUT=settings.smtp_timeout,
+        SMTP_POOL_MAX_IDLE=settings.smtp_pool_max_idle,
+        SMTP_MAX_MESSAGES_PER_CONNECTION=settings.smtp_max_messages_per_connection,
+        SMTP_POOL_HEALTH_CHECK_SECONDS=settings.smtp_pool_health_check_seconds,
+        SMTP_MAX_RCPT_PER_TRANSACTION=settings.smtp_max_rcpt_per_transaction,
+        SMTP_DISPATCH_MODE=settings.smtp_dispatch_mode,
+        THROTTLE_ENABLED=settings.throttle_enabled,
+        THROTTLE_BACKEND=settings.throttle_backend,
+        THROTTLE_ACCOUNT_RATE=settings.throttle_account_rate,
+        THROTTLE_ACCOUNT_BURST=settings.throttle_account_burst,
+        THROTTLE_DOMAIN_RATE=settings.throttle_domain_rate,
+        THROTTLE_DOMAIN_BURST=settings.throttle_domain_burst,
+        THROTTLE_DOMAIN_RATES=settings.throttle_domain_rates,
+        THROTTLE_BACKOFF_FACTOR=settings.throttle_backoff_factor,
+        THROTTLE_RECOVERY_SECONDS=settings.throttle_recovery_seconds,
+        SMTP_ASYNC_CONCURRENCY=settings.smtp_async_concurrency,
+        SMTP_ASYNC_WINDOW=settings.smtp_async_window,
+        MAIL_TRANSPORT=settings.mail_transport,
+        MAIL_SPOOL_DIR=settings.mail_spool_dir,
+        SMTP_RETRY_MAX_ATTEMPTS=settings.smtp_retry_max_attempts,
+        SMTP_RETRY_BASE_SECONDS=settings.smtp_retry_base_seconds,
+        SMTP_RETRY_MAX_SECONDS=settings.smtp_retry_max_seconds,
+        TEMPLATE_CACHE_MAX_BYTES=settings.template_cache_max_bytes,
+        TEMPLATE_CACHE_REDIS=settings.template_cache_redis,
+        TEMPLATE_CACHE_REDIS_TTL=settings.template_cache_redis_ttl,
+        DKIM_PRIVATE_KEY_PATH=settings.dkim_private_key_path,
+        DKIM_SELECTOR=settings.dkim_selector,
+        DKIM_DOMAIN=settings.dkim_domain,
+        CONTACT_IMPORT_DIR=settings.contact_import_dir,
+        CONTACT_IMPORT_MAX_BYTES=settings.contact_import_max_bytes,
+        CONTACT_IMPORT_CHUNK_SIZE=settings.contact_import_chunk_size,
+        SQL_STATS_ENABLED=settings.sql_stats_enabled,
+        SQL_SLOW_QUERY_MS=settings.sql_slow_query_ms,
+        TRACE_EXPORTER=settings.trace_exporter,
+        TRACE_FILE=settings.trace_file,
     )
 
     cors.init_app(app, resources={r"/api/*": {"origins": settings.cors_origins}})
@@ -51,6 +99,9 @@ def create_app() -> Flask:
     migrate.init_app(app, db)
     register_cli(app)
     register_error_handlers(app)
+    register_sql_instrumentation(app)
+    register_metrics(app)
+    register_tracing(app)
     app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1, x_port=1, x_prefix=1)
 
     app.register_blueprint(api_bp, url_prefix="/api")
@@ -4,6 +4,7 @@ from dataclasses import asdict, dataclass
 
 from flask import Blueprint, jsonify, request, abort
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
 
 from ..extensions import db
 from ..db.models import Organization, User
@@ -117,7 +118,10 @@ def login():
     if not email or not password:
         abort(400, description="Email and password are required.")
 
-    user = db.session.query(User).filter_by(email=email).first()
+    query = db.session.query(User).filter_by(email=email)
+    if organization_slug:
+        query = query.options(joinedload(User.organization))
+    user = query.first()
     if not user or not user.check_password(password):
         abort(401, description="Invalid credentials")
 
@@ -2,12 +2,16 @@ from __future__ import annotations
 
 from flask import Blueprint, abort, g, jsonify, request
 from pydantic import ValidationError
-from sqlalchemy import select, func
+from sqlalchemy import case, func, select
 
-from ..db.models import Campaign, Contact, EmailSend, EmailTemplate
+from ..db.models import Campaign, EmailSend, EmailTemplate
 from ..extensions import db
-from ..tasks.campaigns import send_campaign_task
+from ..services.audience import has_audience
+from ..services.campaign_stats import get_campaign_stats
+from ..services.merge_tags import MergeTagError, validate_merge_tags
+from ..tasks.campaigns import has_claimable_batches, reset_batches_for_resend, send_campaign_task
 from .authz import requires_permission
+from .pagination import page_limit, paged, recent_first
 from .schemas import CampaignCreateSchema
 
 campaigns_bp = Blueprint("campaigns", __name__)
@@ -40,6 +44,45 @@ def serialize_campaign(campaign: Campaign) -> dict:
     }
 
 
+# What the campaign list returns: scalar columns plus the size of a custom
+# audience instead of the address list itself. Other audiences store JSON
+# ``null``, which Postgres cannot take the array length of.
+SUMMARY_COLUMNS = (
+    Campaign.id,
+    Campaign.name,
+    Campaign.status,
+    Campaign.template_id,
+    Campaign.subject,
+    Campaign.from_email,
+    Campaign.audience_type,
+    case(
+        (Campaign.audience_type == "custom", func.json_array_length(Campaign.recipients)),
+        else_=None,
+    ).label("recipient_count"),
+    Campaign.organization_id,
+    Campaign.created_by_user_id,
+    Campaign.created_at,
+    Campaign.updated_at,
+)
+
+
+def serialize_campaign_summary(row) -> dict:
+    return {
+        "id": row.id,
+        "name": row.name,
+        "status": row.status,
+        "template_id": row.template_id,
+        "subject": row.subject,
+        "from_email": row.from_email,
+        "audience_type": row.audience_type,
+        "recipient_count": row.recipient_count,
+        "organization_id": row.organization_id,
+        "created_by_user_id": row.created_by_user_id,
+        "created_at": row.created_at.isoformat(),
+        "updated_at": row.updated_at.isoformat(),
+    }
+
+
 def serialize_send(send: EmailSend) -> dict:
     return {
         "id": send.id,
@@ -60,13 +103,47 @@ def handle_validation_error(err: ValidationError):
 @campaigns_bp.get("")
 @requires_permission("campaigns.manage")
 def list_campaigns():
+    """
+    Campaign summaries, most recently updated first, ``?limit=`` per page.
+
+    Selects scalar columns only: no ``recipients`` arrays and none of the
+    template, organization or creator rows the entity would join in. Pass
+    ``next_cursor`` back as ``?cursor=`` for the following page.
+    """
     _, org_id = require_identity()
-    items = db.session.execute(
-        select(Campaign)
-        .where(Campaign.organization_id == org_id)
-        .order_by(Campaign.updated_at.desc())
-    ).unique().scalars().all()
-    return jsonify({"data": [serialize_campaign(item) for item in items]}), 200
+    limit = page_limit(50, 200)
+    stmt = recent_first(
+        select(*SUMMARY_COLUMNS).where(Campaign.organization_id == org_id),
+        Campaign,
+        request.args.get("cursor"),
+    )
+    rows = db.session.execute(stmt.limit(limit + 1)).all()
+    page, next_cursor = paged(rows, limit)
+    data = [serialize_campaign_summary(row) for row in page]
+    return jsonify({"data": data, "next_cursor": next_cursor}), 200
+
+
+@campaigns_bp.get("/stats")
+@requires_permission("campaigns.manage")
+def list_campaign_stats():
+    """Progress counters for several campaigns (``?ids=1,2,3``) in one round trip."""
+    _, org_id = require_identity()
+    try:
+        requested = {int(part) for part in request.args.get("ids", "").split(",") if part.strip()}
+    except ValueError:
+        abort(400, description="ids must be a comma-separated list of campaign ids")
+    if len(requested) > 100:
+        abort(400, description="At most 100 campaign ids per request")
+    campaigns = db.session.execute(
+        select(Campaign.id, Campaign.status).where(
+            Campaign.id.in_(requested), Campaign.organization_id == org_id
+        )
+    ).all()
+    stats = get_campaign_stats(db.session, [row.id for row in campaigns])
+    data = [
+        {"campaign_id": row.id, "status": row.status, **stats[row.id]} for row in campaigns
+    ]
+    return jsonify({"data": data}), 200
 
 
 @campaigns_bp.post("")
@@ -83,6 +160,10 @@ def create_campaign():
         abort(400, description="audience_type must be one of: all_contacts, custom")
     if payload.audience_type == "custom" and not payload.recipients:
         abort(400, description="recipients is required for custom audience_type")
+    try:
+        validate_merge_tags(payload.subject)
+    except MergeTagError as exc:
+        abort(400, description=str(exc))
 
     campaign = Campaign(
         organization_id=org_id,
@@ -122,15 +203,14 @@ def send_campaign(campaign_id: int):
     if campaign.status in ("sending", "sent"):
         abort(409, description=f"Campaign is already {campaign.status}")
 
-    if campaign.audience_type == "all_contacts":
-        count = db.session.scalar(
-            select(func.count()).select_from(Contact).where(Contact.organization_id == org_id)
-        )
-        if not count:
-            abort(400, description="No contacts found for this workspace")
-    if campaign.audience_type == "custom" and not (campaign.recipients or []):
-        abort(400, description="No recipients set for custom campaign")
+    if not has_audience(campaign):
+        if campaign.audience_type == "custom":
+            abort(400, description="No recipients set for custom campaign")
+        abort(400, description="No contacts found for this workspace")
 
+    if campaign.status in ("partial", "failed"):
+        # Re-sending skips recipients that already have a sent row.
+        reset_batches_for_resend(campaign)
     campaign.status = "sending"
     db.session.add(campaign)
     db.session.commit()
@@ -139,6 +219,37 @@ def send_campaign(campaign_id: int):
     return jsonify({"status": "queued", "task_id": async_result.id, "campaign_id": campaign.id}), 202
 
 
+@campaigns_bp.post("/<int:campaign_id>/resume")
+@requires_permission("campaigns.send")
+def resume_campaign(campaign_id: int):
+    _, org_id = require_identity()
+    campaign = db.session.get(Campaign, campaign_id)
+    if not campaign or campaign.organization_id != org_id:
+        abort(404, description="Campaign not found")
+    if campaign.status != "sending":
+        abort(409, description=f"Campaign is {campaign.status}, not sending")
+    if not has_claimable_batches(campaign.id):
+        abort(409, description="Campaign batches are still sending; none has stalled")
+
+    async_result = send_campaign_task.delay(campaign.id)
+    return jsonify({"status": "queued", "task_id": async_result.id, "campaign_id": campaign.id}), 202
+
+
+@campaigns_bp.get("/<int:campaign_id>/stats")
+@requires_permission("campaigns.manage")
+def campaign_stats(campaign_id: int):
+    _, org_id = require_identity()
+    campaign = db.session.execute(
+        select(Campaign.id, Campaign.status).where(
+            Campaign.id == campaign_id, Campaign.organization_id == org_id
+        )
+    ).first()
+    if not campaign:
+        abort(404, description="Campaign not found")
+    stats = get_campaign_stats(db.session, [campaign.id])[campaign.id]
+    return jsonify({"data": {"campaign_id": campaign.id, "status": campaign.status, **stats}}), 200
+
+
 @campaigns_bp.get("/<int:campaign_id>/sends")
 @requires_permission("campaigns.manage")
 def list_campaign_sends(campaign_id: int):
@@ -151,5 +262,5 @@ def list_campaign_sends(campaign_id: int):
         .where(EmailSend.campaign_id == campaign.id)
         .order_by(EmailSend.created_at.desc())
         .limit(200)
-    ).unique().scalars().all()
+    ).scalars().all()
     return jsonify({"data": [serialize_send(item) for item in sends]}), 200
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from flask import abort, request
+from sqlalchemy import and_, or_
+
+
+def page_limit(default: int, maximum: int) -> int:
+    """``?limit=`` clamped to ``[1, maximum]``."""
+    return min(max(request.args.get("limit", default, type=int), 1), maximum)
+
+
+def encode_cursor(updated_at: datetime, row_id: int) -> str:
+    raw = json.dumps([updated_at.isoformat(), row_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def recent_first(stmt, model, cursor: str | None):
+    """
+    Order ``stmt`` newest-updated first and start it after ``cursor``.
+
+    The cursor is the ``(updated_at, id)`` of the last row of the previous
+    page (see ``encode_cursor``); ``id`` breaks ties so no row is skipped or
+    repeated when several share a timestamp.
+    """
+    stmt = stmt.order_by(model.updated_at.desc(), model.id.desc())
+    if not cursor:
+        return stmt
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        stamp, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        updated_at = datetime.fromisoformat(stamp)
+        row_id = int(row_id)
+    except (binascii.Error, TypeError, ValueError):
+        abort(400, description="Invalid cursor")
+    return stmt.where(
+        or_(
+            model.updated_at < updated_at,
+            and_(model.updated_at == updated_at, model.id < row_id),
+        )
+    )
+
+
+def paged(rows, limit: int) -> tuple[list, str | None]:
+    """Split a ``limit + 1`` fetch into the page and the cursor for the next one."""
+    page = list(rows[:limit])
+    next_cursor = encode_cursor(page[-1].updated_at, page[-1].id) if len(rows) > limit else None
+    return page, next_cursor
@@ -8,12 +8,21 @@ from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 
 from ..extensions import db
-from ..db.models import Organization, Contact
+from ..db.models import Organization, Contact, ContactImport, ContactImportReject
+from ..services.contact_import import ContactImportError, check_upload, remove_upload, save_upload
+from ..tasks.contacts import import_contacts_task
 from .schemas import OrganizationCreateSchema, ContactCreateSchema
 from .authz import requires_internal, requires_permission
+from .pagination import page_limit
 
 api_bp = Blueprint("api", __name__)
 
+# Columns ``list_contacts`` can project, in response order; ``id`` is always
+# returned since it is the pagination cursor.
+CONTACT_FIELDS = ("id", "email", "first_name", "last_name", "organization_id", "created_at")
+CONTACTS_PAGE_SIZE = 100
+CONTACTS_MAX_PAGE = 1000
+
 
 def serialize_organization(org: Organization) -> dict[str, str]:
     return {
@@ -24,6 +33,10 @@ def serialize_organization(org: Organization) -> dict[str, str]:
     }
 
 
+def _json_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
 def serialize_contact(contact: Contact) -> dict[str, str]:
     return {
         "id": contact.id,
@@ -35,6 +48,41 @@ def serialize_contact(contact: Contact) -> dict[str, str]:
     }
 
 
+def serialize_contact_import(record: ContactImport) -> dict:
+    if record.size_bytes:
+        progress = round(record.processed_bytes / record.size_bytes, 4)
+    else:
+        progress = 1.0 if record.status == "completed" else 0.0
+    return {
+        "id": record.id,
+        "organization_id": record.organization_id,
+        "status": record.status,
+        "filename": record.filename,
+        "size_bytes": record.size_bytes,
+        "processed_bytes": record.processed_bytes,
+        "progress": progress,
+        "processed_rows": record.processed_rows,
+        "created": record.created_count,
+        "updated": record.updated_count,
+        "rejected": record.rejected_count,
+        "error": record.error,
+        "created_at": record.created_at.isoformat(),
+        "started_at": record.started_at.isoformat() if record.started_at else None,
+        "finished_at": record.finished_at.isoformat() if record.finished_at else None,
+    }
+
+
+def require_organization(org_id: int) -> Organization:
+    if getattr(g, "auth_mode", None) != "api_key":
+        current_org_id = getattr(g, "current_org_id", None)
+        if current_org_id is not None and int(current_org_id) != org_id:
+            abort(403, description="Cross-workspace access denied")
+    organization = db.session.get(Organization, org_id)
+    if not organization:
+        abort(404, description="Organization not found")
+    return organization
+
+
 @api_bp.errorhandler(ValidationError)
 def handle_validation_error(err: ValidationError):
     return jsonify({"error": {"message": "Validation error", "code": 400, "details": err.errors()}}), 400
@@ -75,29 +123,40 @@ def create_organization():
 @api_bp.get("/organizations/<int:org_id>/contacts")
 @requires_permission("journeys.build")
 def list_contacts(org_id: int):
-    if getattr(g, "auth_mode", None) != "api_key":
-        current_org_id = getattr(g, "current_org_id", None)
-        if current_org_id is not None and int(current_org_id) != org_id:
-            abort(403, description="Cross-workspace access denied")
-    organization = db.session.get(Organization, org_id)
-    if not organization:
-        abort(404, description="Organization not found")
-    contacts = db.session.scalars(
-        select(Contact).where(Contact.organization_id == organization.id)
+    """
+    One page of contacts in id order: ``?after=<id>&limit=&fields=email,first_name``.
+
+    Pages are keyset ranges over ``(organization_id, id)``, so any page costs
+    the same however deep it is, and only the requested columns are selected
+    -- no ``Contact`` entities and no organization join. ``next_after`` is
+    the cursor for the following page, or ``null`` on the last one.
+    """
+    organization = require_organization(org_id)
+    after = request.args.get("after", 0, type=int)
+    limit = page_limit(CONTACTS_PAGE_SIZE, CONTACTS_MAX_PAGE)
+    fields = CONTACT_FIELDS
+    if request.args.get("fields"):
+        requested = [name.strip() for name in request.args["fields"].split(",") if name.strip()]
+        unknown = sorted(set(requested) - set(CONTACT_FIELDS))
+        if unknown:
+            abort(400, description=f"Unknown contact fields: {', '.join(unknown)}")
+        fields = tuple(name for name in CONTACT_FIELDS if name == "id" or name in requested)
+    rows = db.session.execute(
+        select(*(getattr(Contact, name) for name in fields))
+        .where(Contact.organization_id == organization.id, Contact.id > after)
+        .order_by(Contact.id)
+        .limit(limit + 1)
     ).all()
-    return jsonify({"data": [serialize_contact(contact) for contact in contacts]})
+    page = rows[:limit]
+    data = [{name: _json_value(value) for name, value in zip(fields, row)} for row in page]
+    next_after = page[-1].id if len(rows) > limit else None
+    return jsonify({"data": data, "next_after": next_after})
 
 
 @api_bp.post("/organizations/<int:org_id>/contacts")
 @requires_permission("journeys.build")
 def create_contact(org_id: int):
-    if getattr(g, "auth_mode", None) != "api_key":
-        current_org_id = getattr(g, "current_org_id", None)
-        if current_org_id is not None and int(current_org_id) != org_id:
-            abort(403, description="Cross-workspace access denied")
-    organization = db.session.get(Organization, org_id)
-    if not organization:
-        abort(404, description="Organization not found")
+    organization = require_organization(org_id)
     payload = ContactCreateSchema.model_validate(request.get_json() or {})
     contact = Contact(
         email=payload.email,
@@ -112,3 +171,83 @@ def create_contact(org_id: int):
         db.session.rollback()
         abort(409, description="Contact with that email already exists for this organization")
     return jsonify({"data": serialize_contact(contact)}), 201
+
+
+@api_bp.post("/organizations/<int:org_id>/contacts/imports")
+@requires_permission("journeys.build")
+def create_contact_import(org_id: int):
+    """
+    Queue a bulk CSV import, sent as a ``file`` form field or a ``text/csv`` body.
+
+    The upload is streamed to ``CONTACT_IMPORT_DIR`` and only its header is
+    checked here; the rows are parsed and upserted by the worker.
+    """
+    organization = require_organization(org_id)
+    max_bytes = int(current_app.config.get("CONTACT_IMPORT_MAX_BYTES", 2 * 1024 * 1024 * 1024))
+    if request.content_length and request.content_length > max_bytes:
+        abort(413, description=f"Upload exceeds {max_bytes} bytes")
+    if request.mimetype == "text/csv":
+        stream, filename = request.stream, None
+    elif "file" in request.files:
+        upload = request.files["file"]
+        stream, filename = upload.stream, upload.filename
+    else:
+        abort(400, description="Send the CSV as a 'file' form field or a text/csv body")
+
+    try:
+        path, size = save_upload(stream, max_bytes=max_bytes)
+    except ContactImportError as exc:
+        abort(413, description=str(exc))
+    try:
+        check_upload(path)
+    except ContactImportError as exc:
+        remove_upload(path)
+        abort(400, description=str(exc))
+
+    record = ContactImport(
+        organization_id=organization.id,
+        created_by_user_id=getattr(g, "current_user_id", None),
+        filename=filename[:255] if filename else None,
+        upload_path=path,
+        size_bytes=size,
+    )
+    db.session.add(record)
+    db.session.commit()
+    async_result = import_contacts_task.delay(record.id)
+    return jsonify({"data": serialize_contact_import(record), "task_id": async_result.id}), 202
+
+
+@api_bp.get("/organizations/<int:org_id>/contacts/imports/<int:import_id>")
+@requires_permission("journeys.build")
+def get_contact_import(org_id: int, import_id: int):
+    require_organization(org_id)
+    record = db.session.get(ContactImport, import_id)
+    if not record or record.organization_id != org_id:
+        abort(404, description="Import not found")
+    return jsonify({"data": serialize_contact_import(record)})
+
+
+@api_bp.get("/organizations/<int:org_id>/contacts/imports/<int:import_id>/rejects")
+@requires_permission("journeys.build")
+def list_contact_import_rejects(org_id: int, import_id: int):
+    """Rejected rows in file order, paged by ``?after=<row_number>&limit=``."""
+    require_organization(org_id)
+    found = db.session.scalar(
+        select(ContactImport.id).where(
+            ContactImport.id == import_id, ContactImport.organization_id == org_id
+        )
+    )
+    if not found:
+        abort(404, description="Import not found")
+    after = request.args.get("after", 0, type=int)
+    limit = page_limit(500, 1000)
+    reject = ContactImportReject
+    rows = db.session.execute(
+        select(reject.row_number, reject.email, reject.reason)
+        .where(reject.import_id == import_id, reject.row_number > after)
+        .order_by(reject.row_number)
+        .limit(limit)
+    ).all()
+    data = [{"row": row.row_number, "email": row.email, "reason": row.reason} for row in rows]
+    next_after = rows[-1].row_number if len(rows) == limit else None
+    return jsonify({"data": data, "next_after": next_after})
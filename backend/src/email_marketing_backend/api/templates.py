@@ -8,8 +8,11 @@ from sqlalchemy.exc import IntegrityError
 from ..db.models import EmailTemplate
 from ..extensions import db
 from ..services.email import send_html_email
-from ..services.rendering import render_html_document
+from ..services.merge_tags import MergeTagError, validate_merge_tags
+from ..services.rendering import compile_into
+from ..services.template_cache import get_rendered_template, template_version
 from .authz import requires_permission
+from .pagination import page_limit, paged, recent_first
 from .schemas import (
     TemplateCreateSchema,
     TemplateSendTestSchema,
@@ -35,6 +38,7 @@ def serialize_template(template: EmailTemplate) -> dict:
         "html": template.html,
         "css": template.css,
         "project_data": template.project_data,
+        "content_hash": template.content_hash,
         "organization_id": template.organization_id,
         "created_by_user_id": template.created_by_user_id,
         "created_at": template.created_at.isoformat(),
@@ -42,6 +46,41 @@ def serialize_template(template: EmailTemplate) -> dict:
     }
 
 
+# What the template list returns; bodies and editor state only come from
+# ``GET /templates/<id>``.
+SUMMARY_COLUMNS = (
+    EmailTemplate.id,
+    EmailTemplate.name,
+    EmailTemplate.subject,
+    EmailTemplate.content_hash,
+    EmailTemplate.organization_id,
+    EmailTemplate.created_by_user_id,
+    EmailTemplate.created_at,
+    EmailTemplate.updated_at,
+)
+
+
+def serialize_template_summary(template) -> dict:
+    """Summary fields of a template row or entity."""
+    return {
+        "id": template.id,
+        "name": template.name,
+        "subject": template.subject,
+        "content_hash": template.content_hash,
+        "organization_id": template.organization_id,
+        "created_by_user_id": template.created_by_user_id,
+        "created_at": template.created_at.isoformat(),
+        "updated_at": template.updated_at.isoformat(),
+    }
+
+
+def check_merge_tags(*sources: str | None) -> None:
+    try:
+        validate_merge_tags(*sources)
+    except MergeTagError as exc:
+        abort(400, description=str(exc))
+
+
 @templates_bp.errorhandler(ValidationError)
 def handle_validation_error(err: ValidationError):
     return jsonify({"error": {"message": "Validation error", "code": 400, "details": err.errors()}}), 400
@@ -50,14 +89,24 @@ def handle_validation_error(err: ValidationError):
 @templates_bp.get("")
 @requires_permission("templates.manage")
 def list_templates():
+    """
+    Template summaries, most recently updated first, ``?limit=`` per page.
+
+    Only the summary columns are selected, so ``html``, ``css``,
+    ``project_data`` and the compiled output never leave the database here.
+    Pass ``next_cursor`` back as ``?cursor=`` for the following page.
+    """
     _, org_id = require_identity()
-    stmt = (
-        select(EmailTemplate)
-        .where(EmailTemplate.organization_id == org_id)
-        .order_by(EmailTemplate.updated_at.desc())
+    limit = page_limit(50, 200)
+    stmt = recent_first(
+        select(*SUMMARY_COLUMNS).where(EmailTemplate.organization_id == org_id),
+        EmailTemplate,
+        request.args.get("cursor"),
     )
-    templates = db.session.execute(stmt).unique().scalars().all()
-    return jsonify({"data": [serialize_template(tpl) for tpl in templates]}), 200
+    rows = db.session.execute(stmt.limit(limit + 1)).all()
+    page, next_cursor = paged(rows, limit)
+    data = [serialize_template_summary(row) for row in page]
+    return jsonify({"data": data, "next_cursor": next_cursor}), 200
 
 
 @templates_bp.post("")
@@ -65,6 +114,7 @@ def list_templates():
 def create_template():
     user_id, org_id = require_identity()
     payload = TemplateCreateSchema.model_validate(request.get_json() or {})
+    check_merge_tags(payload.subject, payload.html)
     template = EmailTemplate(
         organization_id=org_id,
         created_by_user_id=user_id,
@@ -74,6 +124,7 @@ def create_template():
         css=payload.css,
         project_data=payload.project_data,
     )
+    compile_into(template)
     db.session.add(template)
     try:
         db.session.commit()
@@ -101,6 +152,7 @@ def update_template(template_id: int):
     if not template or template.organization_id != org_id:
         abort(404, description="Template not found")
     payload = TemplateUpdateSchema.model_validate(request.get_json() or {})
+    check_merge_tags(payload.subject, payload.html)
 
     if payload.name is not None:
         template.name = payload.name
@@ -112,6 +164,8 @@ def update_template(template_id: int):
         template.css = payload.css
     if payload.project_data is not None:
         template.project_data = payload.project_data
+    if payload.html is not None or payload.css is not None:
+        compile_into(template)
 
     db.session.add(template)
     try:
@@ -138,16 +192,23 @@ def delete_template(template_id: int):
 @requires_permission("emails.send_test")
 def send_test(template_id: int):
     _, org_id = require_identity()
-    template = db.session.get(EmailTemplate, template_id)
+    # Only the ownership check and cache key come from the row; the rendered
+    # output is served from the template cache.
+    template = db.session.execute(
+        select(EmailTemplate.organization_id, EmailTemplate.name, EmailTemplate.updated_at).where(
+            EmailTemplate.id == template_id
+        )
+    ).first()
     if not template or template.organization_id != org_id:
         abort(404, description="Template not found")
+    rendered = get_rendered_template(template_id, template_version(template.updated_at))
 
     payload = TemplateSendTestSchema.model_validate(request.get_json() or {})
-    combined = render_html_document(html=template.html or "", css=template.css)
-
-    subject = payload.subject or template.subject or f"Test email: {template.name}"
+    subject = payload.subject or rendered.subject or f"Test email: {template.name}"
     try:
-        send_html_email(to_email=payload.to, subject=subject, html=combined)
+        send_html_email(
+            to_email=payload.to, subject=subject, html=rendered.html, text=rendered.text
+        )
     except Exception as exc:
         abort(502, description=f"SMTP send failed: {exc}")
 
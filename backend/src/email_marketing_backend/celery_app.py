@@ -3,9 +3,11 @@ from __future__ import annotations
 import os
 
 from celery import Celery
+from celery.signals import worker_init, worker_process_shutdown
 
 from . import create_app
 from .config import settings
+from .metrics import mark_process_dead, register_task_metrics, start_metrics_server
 
 celery = Celery(
     "email_marketing_backend",
@@ -13,7 +15,14 @@ celery = Celery(
     backend=settings.celery_result_backend,
     include=["email_marketing_backend.tasks"],
 )
-celery.conf.update(task_default_queue="default")
+# Prefetch one message at a time so a slow campaign batch never sits in front
+# of batches another idle worker could pick up. Deferred-send retries go to
+# their own queue, served by a separate low-concurrency worker.
+celery.conf.update(
+    task_default_queue="default",
+    worker_prefetch_multiplier=1,
+    task_routes={"tasks.retry_campaign_sends": {"queue": settings.smtp_retry_queue}},
+)
 
 
 @celery.task(name="tasks.health_check")
@@ -21,6 +30,21 @@ def health_check() -> str:
     return "ok"
 
 
+@worker_process_shutdown.connect
+def close_worker_mail_transport(**_kwargs) -> None:
+    from .services.email import close_mail_transport
+
+    close_mail_transport()
+    mark_process_dead(os.getpid())
+
+
+@worker_init.connect
+def serve_worker_metrics(**_kwargs) -> None:
+    # In the main worker process; pool processes report through PROMETHEUS_MULTIPROC_DIR.
+    if settings.celery_metrics_port:
+        start_metrics_server(settings.celery_metrics_port)
+
+
 def init_celery(app=None) -> Celery:
     app = app or create_app()
     celery.conf.update(app.config.get("CELERY", {}))
@@ -34,6 +58,11 @@ def init_celery(app=None) -> Celery:
                 return TaskBase.__call__(self, *args, **kwargs)
 
     celery.Task = ContextTask
+    register_task_metrics()
+    if app.config.get("SQL_STATS_ENABLED"):
+        from .instrumentation import register_task_sql_stats
+
+        register_task_sql_stats()
     return celery
 
 
@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+from datetime import timedelta
+
 import click
+from flask import current_app
 
 from .services.iam import seed_iam
+from .services.load_data import LoadProfile, seed_load
+from .tasks.campaigns import find_stalled_campaigns, send_campaign_task
+from .tracing import read_spans, summarize_trace
 
 
 def register_cli(app):
@@ -11,3 +17,63 @@ def register_cli(app):
         """Seed default permissions and roles."""
         seed_iam()
         click.echo("IAM roles and permissions seeded.")
+
+    @app.cli.command("resume-campaigns")
+    @click.option("--stale-minutes", type=int, help="Defaults to CAMPAIGN_STALL_MINUTES.")
+    def resume_campaigns_command(stale_minutes: int | None):
+        """Re-dispatch campaigns whose batches stopped making progress."""
+        if stale_minutes is None:
+            stale_minutes = int(current_app.config.get("CAMPAIGN_STALL_MINUTES", 30))
+        stalled = find_stalled_campaigns(timedelta(minutes=stale_minutes))
+        for campaign_id in stalled:
+            send_campaign_task.delay(campaign_id)
+        click.echo(f"Resumed {len(stalled)} stalled campaign(s).")
+
+    @app.cli.command("seed-load")
+    @click.option("--organizations", default=1, show_default=True, type=int)
+    @click.option(
+        "--contacts", default=100_000, show_default=True, type=int, help="Per organization."
+    )
+    @click.option("--templates", default=10, show_default=True, type=int)
+    @click.option("--campaigns", default=20, show_default=True, type=int)
+    @click.option("--sends-per-campaign", default=10_000, show_default=True, type=int)
+    @click.option("--seed", default=42, show_default=True, type=int)
+    def seed_load_command(
+        organizations: int,
+        contacts: int,
+        templates: int,
+        campaigns: int,
+        sends_per_campaign: int,
+        seed: int,
+    ):
+        """Bulk-generate large, reproducible workspaces for load and benchmark runs."""
+        profile = LoadProfile(
+            organizations=organizations,
+            contacts=contacts,
+            templates=templates,
+            campaigns=campaigns,
+            sends_per_campaign=sends_per_campaign,
+            seed=seed,
+        )
+        try:
+            org_ids = seed_load(profile, progress=click.echo)
+        except ValueError as exc:
+            raise click.ClickException(str(exc)) from exc
+        click.echo(
+            f"Seeded organizations {org_ids}; log in as owner@load-{seed}-<n>.test / load-test."
+        )
+
+    @app.cli.command("show-trace")
+    @click.argument("trace_id")
+    @click.option("--file", "path", default=None, help="Span file; defaults to TRACE_FILE.")
+    def show_trace_command(trace_id: str, path: str | None):
+        """Show where a trace's time went, from spans written by TRACE_EXPORTER=file."""
+        try:
+            spans = read_spans(path or app.config["TRACE_FILE"], trace_id)
+        except OSError as exc:
+            raise click.ClickException(str(exc)) from exc
+        if not spans:
+            raise click.ClickException(f"No spans recorded for trace {trace_id}")
+        for depth, name, count, total_ms in summarize_trace(spans):
+            label = "  " * depth + name + (f" x{count}" if count > 1 else "")
+            click.echo(f"{label:<64} {total_ms:>12.1f} ms")
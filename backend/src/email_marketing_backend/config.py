@@ -3,10 +3,15 @@ from __future__ import annotations
 from functools import lru_cache
 from typing import List
 
-from pydantic import Field, field_validator
+from pydantic import Field, field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+# Time a deferred-send retry may take to run once its countdown is due, on top
+# of SMTP_RETRY_MAX_SECONDS, before the broker may hand its message out again.
+RETRY_RUN_ALLOWANCE_SECONDS = 3600
+
+
 class Settings(BaseSettings):
     environment: str = Field(default="development", alias="ENVIRONMENT")
     secret_key: str = Field(default="local-dev-secret", alias="APP_SECRET_KEY")
@@ -19,6 +24,7 @@ class Settings(BaseSettings):
     celery_result_backend: str = Field(
         default="redis://redis:6379/2", alias="CELERY_RESULT_BACKEND"
     )
+    celery_visibility_timeout: int = Field(default=6 * 3600, alias="CELERY_VISIBILITY_TIMEOUT")
     cors_origins: List[str] = Field(
         default_factory=lambda: ["http://localhost:5173", "http://127.0.0.1:5173"]
     )
@@ -37,6 +43,55 @@ class Settings(BaseSettings):
     smtp_password: str | None = Field(default=None, alias="SMTP_PASSWORD")
     smtp_use_tls: bool = Field(default=False, alias="SMTP_USE_TLS")
     smtp_from_email: str = Field(default="no-reply@constellation.local", alias="SMTP_FROM_EMAIL")
+    campaign_batch_size: int = Field(default=500, alias="CAMPAIGN_BATCH_SIZE")
+    campaign_stall_minutes: int = Field(default=30, alias="CAMPAIGN_STALL_MINUTES")
+    send_log_flush_size: int = Field(default=200, alias="SEND_LOG_FLUSH_SIZE")
+    send_log_flush_seconds: float = Field(default=5, alias="SEND_LOG_FLUSH_SECONDS")
+    smtp_timeout: float = Field(default=15, alias="SMTP_TIMEOUT")
+    smtp_pool_max_idle: int = Field(default=4, alias="SMTP_POOL_MAX_IDLE")
+    smtp_max_messages_per_connection: int = Field(
+        default=100, alias="SMTP_MAX_MESSAGES_PER_CONNECTION"
+    )
+    smtp_pool_health_check_seconds: float = Field(
+        default=30, alias="SMTP_POOL_HEALTH_CHECK_SECONDS"
+    )
+    throttle_enabled: bool = Field(default=False, alias="THROTTLE_ENABLED")
+    throttle_backend: str = Field(default="redis", alias="THROTTLE_BACKEND")
+    throttle_account_rate: float = Field(default=0, alias="THROTTLE_ACCOUNT_RATE")
+    throttle_account_burst: float | None = Field(default=None, alias="THROTTLE_ACCOUNT_BURST")
+    throttle_domain_rate: float = Field(default=0, alias="THROTTLE_DOMAIN_RATE")
+    throttle_domain_burst: float | None = Field(default=None, alias="THROTTLE_DOMAIN_BURST")
+    throttle_domain_rates: str | None = Field(default=None, alias="THROTTLE_DOMAIN_RATES")
+    throttle_backoff_factor: float = Field(default=0.5, alias="THROTTLE_BACKOFF_FACTOR")
+    throttle_recovery_seconds: float = Field(default=300, alias="THROTTLE_RECOVERY_SECONDS")
+    smtp_max_rcpt_per_transaction: int = Field(default=1, alias="SMTP_MAX_RCPT_PER_TRANSACTION")
+    smtp_dispatch_mode: str = Field(default="sync", alias="SMTP_DISPATCH_MODE")
+    smtp_async_concurrency: int = Field(default=8, alias="SMTP_ASYNC_CONCURRENCY")
+    smtp_async_window: int | None = Field(default=None, alias="SMTP_ASYNC_WINDOW")
+    mail_transport: str = Field(default="smtp_pool", alias="MAIL_TRANSPORT")
+    mail_spool_dir: str = Field(default="/tmp/mail-spool", alias="MAIL_SPOOL_DIR")
+    smtp_retry_queue: str = Field(default="email_retries", alias="SMTP_RETRY_QUEUE")
+    smtp_retry_max_attempts: int = Field(default=5, alias="SMTP_RETRY_MAX_ATTEMPTS")
+    smtp_retry_base_seconds: float = Field(default=60, alias="SMTP_RETRY_BASE_SECONDS")
+    smtp_retry_max_seconds: float = Field(default=3600, alias="SMTP_RETRY_MAX_SECONDS")
+    template_cache_max_bytes: int = Field(
+        default=64 * 1024 * 1024, alias="TEMPLATE_CACHE_MAX_BYTES"
+    )
+    template_cache_redis: bool = Field(default=False, alias="TEMPLATE_CACHE_REDIS")
+    template_cache_redis_ttl: int = Field(default=86400, alias="TEMPLATE_CACHE_REDIS_TTL")
+    dkim_private_key_path: str | None = Field(default=None, alias="DKIM_PRIVATE_KEY_PATH")
+    dkim_selector: str | None = Field(default=None, alias="DKIM_SELECTOR")
+    dkim_domain: str | None = Field(default=None, alias="DKIM_DOMAIN")
+    contact_import_dir: str = Field(default="/tmp/contact-imports", alias="CONTACT_IMPORT_DIR")
+    contact_import_max_bytes: int = Field(
+        default=2 * 1024 * 1024 * 1024, alias="CONTACT_IMPORT_MAX_BYTES"
+    )
+    contact_import_chunk_size: int = Field(default=50_000, alias="CONTACT_IMPORT_CHUNK_SIZE")
+    sql_stats_enabled: bool = Field(default=False, alias="SQL_STATS_ENABLED")
+    sql_slow_query_ms: float = Field(default=500, alias="SQL_SLOW_QUERY_MS")
+    celery_metrics_port: int = Field(default=0, alias="CELERY_METRICS_PORT")
+    trace_exporter: str = Field(default="", alias="TRACE_EXPORTER")
+    trace_file: str = Field(default="/tmp/traces.jsonl", alias="TRACE_FILE")
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
@@ -47,6 +102,19 @@ class Settings(BaseSettings):
             return [part.strip() for part in value.split(",") if part.strip()]
         return value
 
+    @model_validator(mode="after")
+    def check_retry_backoff_fits_visibility_timeout(self):
+        # Redis redelivers an unacked message once the visibility timeout has
+        # passed since a worker reserved it, and a worker reserves a retry as
+        # soon as it is published, countdown included.
+        needed = self.smtp_retry_max_seconds + RETRY_RUN_ALLOWANCE_SECONDS
+        if self.celery_visibility_timeout < needed:
+            raise ValueError(
+                f"CELERY_VISIBILITY_TIMEOUT must be at least SMTP_RETRY_MAX_SECONDS + "
+                f"{RETRY_RUN_ALLOWANCE_SECONDS} ({needed:g}s) or delayed retries run twice"
+            )
+        return self
+
 
 @lru_cache
 def get_settings() -> Settings:
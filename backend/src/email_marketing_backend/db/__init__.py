@@ -6,7 +6,7 @@ from .models.user import User
 from .models.contact import Contact
 from .models.role import Role, Permission, role_permissions, user_roles
 from .models.email_template import EmailTemplate
-from .models.campaign import Campaign, EmailSend
+from .models.campaign import Campaign, CampaignBatch, CampaignStats, EmailSend
 
 __all__ = [
     "Base",
@@ -19,5 +19,7 @@ __all__ = [
     "user_roles",
     "EmailTemplate",
     "Campaign",
+    "CampaignBatch",
+    "CampaignStats",
     "EmailSend",
 ]
@@ -2,9 +2,10 @@ from .base import Base, TimestampMixin
 from .organization import Organization
 from .user import User
 from .contact import Contact
+from .contact_import import ContactImport, ContactImportReject
 from .role import Role, Permission, role_permissions, user_roles
 from .email_template import EmailTemplate
-from .campaign import Campaign, EmailSend
+from .campaign import Campaign, CampaignBatch, CampaignStats, EmailSend
 
 __all__ = [
     "Base",
@@ -12,11 +13,15 @@ __all__ = [
     "Organization",
     "User",
     "Contact",
+    "ContactImport",
+    "ContactImportReject",
     "Role",
     "Permission",
     "role_permissions",
     "user_roles",
     "EmailTemplate",
     "Campaign",
+    "CampaignBatch",
+    "CampaignStats",
     "EmailSend",
 ]
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from sqlalchemy import ForeignKey, String, Text, JSON
+from sqlalchemy import ForeignKey, Integer, String, Text, JSON, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base, TimestampMixin
@@ -31,9 +31,12 @@ class Campaign(TimestampMixin, Base):
     recipients: Mapped[list[str] | None] = mapped_column(JSON, nullable=True)
     notes: Mapped[str | None] = mapped_column(Text, nullable=True)
 
-    organization = relationship("Organization", lazy="joined")
-    created_by = relationship("User", lazy="joined")
-    template = relationship("EmailTemplate", lazy="joined")
+    # Nothing is loaded implicitly: a campaign row is read on every send-path
+    # refresh, and the API serializes ids. Callers that need a related row ask
+    # for it with an explicit loader option.
+    organization = relationship("Organization", lazy="raise")
+    created_by = relationship("User", lazy="raise")
+    template = relationship("EmailTemplate", lazy="raise")
 
 
 class EmailSend(TimestampMixin, Base):
@@ -51,5 +54,54 @@ class EmailSend(TimestampMixin, Base):
     status: Mapped[str] = mapped_column(String(32), nullable=False, default="queued")
     error: Mapped[str | None] = mapped_column(Text, nullable=True)
 
-    campaign = relationship("Campaign", lazy="joined")
+    campaign = relationship("Campaign", lazy="raise")
 
+
+class CampaignBatch(TimestampMixin, Base):
+    """
+    One slice of a campaign audience and its send checkpoint.
+
+    ``lower_bound``/``upper_bound`` are contact ids (``(lower, upper]``) for
+    contact audiences and offsets into ``Campaign.recipients`` for custom ones.
+    ``cursor`` is the last position whose outcome is durably recorded, and
+    ``sent``/``failed`` count outcomes up to the cursor; ``deferred`` counts
+    recipients waiting on the retry queue, which settle into the other two.
+    """
+
+    __tablename__ = "campaign_batches"
+    __table_args__ = (UniqueConstraint("campaign_id", "seq", name="uq_campaign_batch_seq"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    campaign_id: Mapped[int] = mapped_column(
+        ForeignKey("campaigns.id", ondelete="CASCADE"), nullable=False
+    )
+    seq: Mapped[int] = mapped_column(Integer, nullable=False)
+    kind: Mapped[str] = mapped_column(String(16), nullable=False)
+    lower_bound: Mapped[int] = mapped_column(Integer, nullable=False)
+    upper_bound: Mapped[int] = mapped_column(Integer, nullable=False)
+    cursor: Mapped[int] = mapped_column(Integer, nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    sent: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    failed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    deferred: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class CampaignStats(TimestampMixin, Base):
+    """
+    Running ``email_sends`` status counts for one campaign.
+
+    Maintained by ``EmailSendWriter`` with relative UPDATEs in the same
+    transaction as the status transitions they count, so reading progress is
+    a primary-key lookup instead of a scan of ``email_sends``.
+    """
+
+    __tablename__ = "campaign_stats"
+
+    campaign_id: Mapped[int] = mapped_column(
+        ForeignKey("campaigns.id", ondelete="CASCADE"), primary_key=True
+    )
+    queued: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    sent: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    failed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    deferred: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from sqlalchemy import UniqueConstraint, ForeignKey
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, backref, mapped_column, relationship
 
 from .base import Base, TimestampMixin
 
@@ -18,4 +18,6 @@ class Contact(TimestampMixin, Base):
         ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False
     )
 
-    organization = relationship("Organization", backref="contacts", lazy="joined")
+    organization = relationship(
+        "Organization", backref=backref("contacts", lazy="raise"), lazy="raise"
+    )
@@ -23,6 +23,10 @@ class EmailTemplate(TimestampMixin, Base):
     html: Mapped[str] = mapped_column(Text, nullable=False, default="")
     css: Mapped[str | None] = mapped_column(Text, nullable=True)
     project_data: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    # Send-ready output of services.rendering.compile_email_template, refreshed on save.
+    compiled_html: Mapped[str | None] = mapped_column(Text, nullable=True)
+    compiled_text: Mapped[str | None] = mapped_column(Text, nullable=True)
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
 
-    organization = relationship("Organization", lazy="joined")
-    created_by = relationship("User", lazy="joined")
+    organization = relationship("Organization", lazy="raise")
+    created_by = relationship("User", lazy="raise")
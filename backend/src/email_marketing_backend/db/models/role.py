@@ -32,9 +32,9 @@ class Role(TimestampMixin, Base):
     description: Mapped[str | None]
 
     permissions = relationship(
-        "Permission", secondary=role_permissions, back_populates="roles", lazy="joined"
+        "Permission", secondary=role_permissions, back_populates="roles", lazy="selectin"
     )
-    users = relationship("User", secondary=user_roles, back_populates="roles")
+    users = relationship("User", secondary=user_roles, back_populates="roles", lazy="raise")
 
 
 class Permission(TimestampMixin, Base):
@@ -45,5 +45,5 @@ class Permission(TimestampMixin, Base):
     description: Mapped[str | None]
 
     roles = relationship(
-        "Role", secondary=role_permissions, back_populates="permissions", lazy="joined"
+        "Role", secondary=role_permissions, back_populates="permissions", lazy="raise"
     )
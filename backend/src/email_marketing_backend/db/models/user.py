@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from sqlalchemy import ForeignKey
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, backref, mapped_column, relationship
 from werkzeug.security import generate_password_hash, check_password_hash
 
 from .base import Base, TimestampMixin
@@ -20,8 +20,12 @@ class User(TimestampMixin, Base):
         ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False
     )
 
-    organization = relationship("Organization", backref="users", lazy="joined")
-    roles = relationship("Role", secondary=user_roles, back_populates="users", lazy="joined")
+    organization = relationship(
+        "Organization", backref=backref("users", lazy="raise"), lazy="raise"
+    )
+    # Roles and their permissions are read together whenever a token is issued;
+    # selectin keeps that to one small query per level instead of a joined product.
+    roles = relationship("Role", secondary=user_roles, back_populates="users", lazy="selectin")
 
     def set_password(self, password: str) -> None:
         self.password_hash = generate_password_hash(password)
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import logging
+import re
+import time
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+
+from flask import Flask, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)"
+_VALUE_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)")
+_STATEMENT_LIMIT = 2000
+
+
+def normalize_sql(statement: str) -> str:
+    """
+    One line per statement shape: literals become ``?`` and ``IN``/``VALUES``
+    lists collapse to ``(...)``, so slow-query lines group by query rather
+    than by the values or batch size they ran with.
+    """
+    statement = _STRING.sub("?", _WHITESPACE.sub(" ", statement).strip())
+    statement = _VALUE_LIST.sub("(...)", _NUMBER.sub("?", statement))
+    return statement[:_STATEMENT_LIMIT]
+
+
+@dataclass
+class SQLStats:
+    """Statements run within one request or task."""
+
+    count: int = 0
+    seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: str | None = None
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        if seconds > self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+    def fields(self) -> dict:
+        return {
+            "sql_count": self.count,
+            "sql_ms": round(self.seconds * 1000, 2),
+            "sql_slowest_ms": round(self.slowest_seconds * 1000, 2),
+            "sql_slowest": normalize_sql(self.slowest_statement or ""),
+        }
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.seconds * 1000:.2f};desc="{self.count} queries", '
+            f"db-slowest;dur={self.slowest_seconds * 1000:.2f}"
+        )
+
+
+_current: ContextVar[SQLStats | None] = ContextVar("sql_stats", default=None)
+
+
+def start_sql_stats() -> tuple[SQLStats, Token]:
+    """Collect statements run in this context into a fresh ``SQLStats``."""
+    stats = SQLStats()
+    return stats, _current.set(stats)
+
+
+def stop_sql_stats(token: Token) -> None:
+    _current.reset(token)
+
+
+def instrument_engine(engine: Engine, *, slow_ms: float) -> None:
+    """
+    Time every statement ``engine`` runs.
+
+    Durations go to the ``SQLStats`` active in the calling context, if any;
+    statements slower than ``slow_ms`` (0 disables) are logged on their own.
+    """
+    slow_seconds = slow_ms / 1000 if slow_ms > 0 else None
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("sql_stats_started", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["sql_stats_started"].pop()
+        stats = _current.get()
+        if stats is not None:
+            stats.record(statement, seconds)
+        if slow_seconds is not None and seconds >= slow_seconds:
+            normalized = normalize_sql(statement)
+            logger.warning(
+                "Slow SQL statement (%.1f ms): %s",
+                seconds * 1000,
+                normalized,
+                extra={"sql_ms": round(seconds * 1000, 2), "sql": normalized},
+            )
+
+    def handle_error(exception_context):
+        # A failed statement never reaches ``after_cursor_execute``.
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("sql_stats_started"):
+            connection.info["sql_stats_started"].pop()
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", handle_error)
+
+
+def register_sql_instrumentation(app: Flask) -> None:
+    """
+    Report database time per request when ``SQL_STATS_ENABLED`` is set.
+
+    Responses get a ``Server-Timing`` header and each request logs its
+    statement count, total and slowest statement as ``extra`` fields. When
+    disabled nothing is registered, so queries run without any listener.
+    """
+    if not app.config.get("SQL_STATS_ENABLED"):
+        return
+    from .extensions import db
+
+    with app.app_context():
+        instrument_engine(db.engine, slow_ms=float(app.config.get("SQL_SLOW_QUERY_MS", 0)))
+
+    @app.before_request
+    def start_request_sql_stats():
+        g.sql_stats, g.sql_stats_token = start_sql_stats()
+
+    @app.after_request
+    def report_request_sql_stats(response):
+        stats = g.get("sql_stats")
+        if stats is None:
+            return response
+        response.headers.add("Server-Timing", stats.server_timing())
+        fields = stats.fields()
+        logger.info(
+            "%s %s -> %s: %d SQL statements in %.1f ms",
+            request.method,
+            request.path,
+            response.status_code,
+            stats.count,
+            fields["sql_ms"],
+            extra={**fields, "method": request.method, "path": request.path},
+        )
+        return response
+
+    @app.teardown_request
+    def stop_request_sql_stats(_exc=None):
+        token = g.pop("sql_stats_token", None)
+        if token is not None:
+            stop_sql_stats(token)
+
+
+_task_tokens: dict[str, Token] = {}
+
+
+def _start_task_sql_stats(task_id=None, **_kwargs) -> None:
+    _stats, _task_tokens[task_id] = start_sql_stats()
+
+
+def _report_task_sql_stats(task_id=None, task=None, state=None, **_kwargs) -> None:
+    token = _task_tokens.pop(task_id, None)
+    if token is None:
+        return
+    stats = _current.get()
+    stop_sql_stats(token)
+    if stats is None:
+        return
+    fields = stats.fields()
+    logger.info(
+        "task %s[%s] %s: %d SQL statements in %.1f ms",
+        getattr(task, "name", None),
+        task_id,
+        state,
+        stats.count,
+        fields["sql_ms"],
+        extra={**fields, "task": getattr(task, "name", None), "task_id": task_id},
+    )
+
+
+def register_task_sql_stats() -> None:
+    """Log the same per-task fields from Celery workers (see ``celery_app.init_celery``)."""
+    from celery.signals import task_postrun, task_prerun
+
+    task_prerun.connect(_start_task_sql_stats, weak=False, dispatch_uid="sql_stats_prerun")
+    task_postrun.connect(_report_task_sql_stats, weak=False, dispatch_uid="sql_stats_postrun")
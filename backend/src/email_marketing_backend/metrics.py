@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import os
+import time
+
+from flask import Flask, Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy.pool import QueuePool
+
+# Metric values live in memory-mapped files under PROMETHEUS_MULTIPROC_DIR when
+# it is set (gunicorn workers, Celery pool processes), so any process of the
+# same container can serve the sum over all of them.
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "API request latency.",
+    ["method", "blueprint", "endpoint", "status"],
+)
+DB_POOL_CHECKOUTS = Counter("db_pool_checkouts_total", "Connections checked out of the pool.")
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out.",
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Connections open beyond DB_POOL_SIZE (at most DB_MAX_OVERFLOW).",
+    multiprocess_mode="livesum",
+)
+DB_POOL_WAIT_SECONDS = Histogram(
+    "db_pool_wait_seconds",
+    "Time to get a connection from the pool, including opening an overflow one.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30),
+)
+CELERY_TASK_SECONDS = Histogram(
+    "celery_task_duration_seconds",
+    "Celery task run time.",
+    ["task", "state"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1800),
+)
+EMAILS = Counter(
+    "emails_total",
+    "Campaign recipients moved to a final or deferred status.",
+    ["status"],
+)
+SMTP_SECONDS = Histogram(
+    "smtp_operation_duration_seconds",
+    "SMTP latency: connect covers TCP, EHLO, STARTTLS and AUTH; send one transaction.",
+    ["operation"],
+)
+SMTP_CONNECT_SECONDS = SMTP_SECONDS.labels(operation="connect")
+SMTP_SEND_SECONDS = SMTP_SECONDS.labels(operation="send")
+TEMPLATE_CACHE_LOOKUPS = Counter(
+    "template_cache_lookups_total",
+    "Rendered-template cache lookups: hit (this process), shared_hit (Redis tier) or miss.",
+    ["result"],
+)
+TEMPLATE_CACHE_HITS = TEMPLATE_CACHE_LOOKUPS.labels(result="hit")
+TEMPLATE_CACHE_SHARED_HITS = TEMPLATE_CACHE_LOOKUPS.labels(result="shared_hit")
+TEMPLATE_CACHE_MISSES = TEMPLATE_CACHE_LOOKUPS.labels(result="miss")
+TEMPLATE_CACHE_EVICTIONS = Counter(
+    "template_cache_evictions_total",
+    "Rendered templates dropped to keep the cache under TEMPLATE_CACHE_MAX_BYTES.",
+)
+
+
+def metrics_registry() -> CollectorRegistry:
+    """The registry to expose: every process's values in multiprocess mode, else this one's."""
+    if not os.environ.get(MULTIPROC_DIR_ENV):
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def mark_process_dead(pid: int) -> None:
+    """Drop a finished process's live gauges (gunicorn ``child_exit``, Celery pool exit)."""
+    if os.environ.get(MULTIPROC_DIR_ENV):
+        multiprocess.mark_process_dead(pid)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    ``QueuePool`` that reports checkouts, the time each one waited for a
+    connection, and how many connections are checked out or in overflow.
+
+    Used as the engine's ``poolclass`` when ``DB_POOL_SIZE`` applies, i.e.
+    everywhere but SQLite.
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT_SECONDS.observe(time.perf_counter() - started)
+            DB_POOL_CHECKOUTS.inc()
+            self._sample()
+
+    def _do_return_conn(self, record) -> None:
+        super()._do_return_conn(record)
+        self._sample()
+
+    def _sample(self) -> None:
+        DB_POOL_CHECKED_OUT.set(self.checkedout())
+        DB_POOL_OVERFLOW.set(max(self.overflow(), 0))
+
+
+def register_metrics(app: Flask) -> None:
+    """
+    Time API requests and serve ``GET /metrics`` in the Prometheus text format.
+
+    Requests are labelled by blueprint and endpoint name, not path, so ids in
+    URLs do not create new series.
+    """
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def observe_request(response):
+        started = g.get("request_started")
+        if started is not None and request.endpoint != "metrics":
+            HTTP_REQUEST_SECONDS.labels(
+                request.method,
+                request.blueprint or "",
+                request.endpoint or "unmatched",
+                str(response.status_code),
+            ).observe(time.perf_counter() - started)
+        return response
+
+    @app.get("/metrics", endpoint="metrics")
+    def metrics():
+        return Response(generate_latest(metrics_registry()), mimetype=CONTENT_TYPE_LATEST)
+
+
+_task_started: dict[str, float] = {}
+
+
+def _start_task_timer(task_id=None, **_kwargs) -> None:
+    _task_started[task_id] = time.perf_counter()
+
+
+def _observe_task(task_id=None, task=None, state=None, **_kwargs) -> None:
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        CELERY_TASK_SECONDS.labels(getattr(task, "name", "unknown"), state or "UNKNOWN").observe(
+            time.perf_counter() - started
+        )
+
+
+def start_metrics_server(port: int) -> None:
+    """Serve ``/metrics`` from a Celery worker, which has no web server of its own."""
+    from prometheus_client import start_http_server
+
+    start_http_server(port, registry=metrics_registry())
+
+
+def register_task_metrics() -> None:
+    """Time Celery tasks (see ``celery_app.init_celery``)."""
+    from celery.signals import task_postrun, task_prerun
+
+    task_prerun.connect(_start_task_timer, weak=False, dispatch_uid="metrics_prerun")
+    task_postrun.connect(_observe_task, weak=False, dispatch_uid="metrics_postrun")
@@ -0,0 +1,357 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import contextvars
+import logging
+import re
+import smtplib
+import ssl
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Awaitable, Callable, Iterable, Iterator, Sequence
+
+from ..metrics import SMTP_CONNECT_SECONDS, SMTP_SEND_SECONDS
+from ..tracing import start_span
+from .smtp_pool import is_reconnect_error, recipient_outcomes
+from .throttle import SendThrottle, recipient_domain
+
+logger = logging.getLogger(__name__)
+
+_LEADING_DOT = re.compile(rb"(?m)^\.")
+
+ResultCallback = Callable[[str, BaseException | None], None]
+# Runs a blocking callable off the event loop and awaits its result.
+Offload = Callable[..., Awaitable[Any]]
+
+
+class AsyncSMTPSession:
+    """
+    One SMTP session over asyncio streams.
+
+    Failures are raised as the matching ``smtplib`` exceptions so callers can
+    classify them exactly like errors from the blocking pool.
+    """
+
+    def __init__(
+        self,
+        *,
+        host: str,
+        port: int,
+        username: str | None = None,
+        password: str | None = None,
+        use_tls: bool = False,
+        timeout: float = 15,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.messages_sent = 0
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._span = None
+
+    async def connect(self) -> None:
+        # Traced from connect to close, so the span shows the session's whole life.
+        self._span = start_span("smtp.session", host=self.host, port=self.port)
+        try:
+            await self._connect()
+        except BaseException as exc:
+            self.close(error=exc)
+            raise
+
+    async def _connect(self) -> None:
+        try:
+            self._reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), self.timeout
+            )
+        except (OSError, asyncio.TimeoutError) as exc:
+            raise smtplib.SMTPConnectError(421, str(exc).encode()) from exc
+        code, message = await self._read_reply()
+        if code != 220:
+            raise smtplib.SMTPConnectError(code, message)
+        await self._ehlo()
+        if self.use_tls:
+            await self._expect("STARTTLS", 220)
+            await self._writer.start_tls(ssl.create_default_context(), server_hostname=self.host)
+            await self._ehlo()
+        if self.username and self.password:
+            token = base64.b64encode(f"\0{self.username}\0{self.password}".encode()).decode()
+            code, message = await self.command(f"AUTH PLAIN {token}")
+            if code != 235:
+                raise smtplib.SMTPAuthenticationError(code, message)
+
+    async def _ehlo(self) -> None:
+        code, message = await self.command("EHLO constellation")
+        if code != 250:
+            await self._expect("HELO constellation", 250)
+
+    async def _read_reply(self) -> tuple[int, bytes]:
+        lines: list[bytes] = []
+        while True:
+            try:
+                line = await asyncio.wait_for(self._reader.readline(), self.timeout)
+            except asyncio.TimeoutError as exc:
+                raise smtplib.SMTPServerDisconnected("Timed out waiting for reply") from exc
+            if not line:
+                raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+            lines.append(line[4:].rstrip(b"\r\n"))
+            if line[3:4] != b"-":
+                try:
+                    return int(line[:3]), b"\n".join(lines)
+                except ValueError as exc:
+                    raise smtplib.SMTPServerDisconnected("Malformed reply") from exc
+
+    async def command(self, line: str) -> tuple[int, bytes]:
+        if self._writer is None:
+            raise smtplib.SMTPServerDisconnected("Not connected")
+        try:
+            self._writer.write(line.encode("utf-8") + b"\r\n")
+            await self._writer.drain()
+        except OSError as exc:
+            raise smtplib.SMTPServerDisconnected(str(exc)) from exc
+        return await self._read_reply()
+
+    async def _expect(self, line: str, expected: int) -> bytes:
+        code, message = await self.command(line)
+        if code != expected:
+            raise smtplib.SMTPResponseException(code, message)
+        return message
+
+    async def sendmail(
+        self, from_addr: str, to_addrs: list[str], data: bytes
+    ) -> dict[str, tuple[int, bytes]]:
+        code, message = await self.command(f"MAIL FROM:<{from_addr}>")
+        if code != 250:
+            await self._rset_quietly(code)
+            raise smtplib.SMTPSenderRefused(code, message, from_addr)
+
+        refused: dict[str, tuple[int, bytes]] = {}
+        for addr in to_addrs:
+            code, message = await self.command(f"RCPT TO:<{addr}>")
+            if code not in (250, 251):
+                refused[addr] = (code, message)
+            if code == 421:
+                self.close()
+                raise smtplib.SMTPRecipientsRefused(refused)
+        if len(refused) == len(to_addrs):
+            await self._rset_quietly(0)
+            raise smtplib.SMTPRecipientsRefused(refused)
+
+        code, message = await self.command("DATA")
+        if code != 354:
+            await self._rset_quietly(code)
+            raise smtplib.SMTPDataError(code, message)
+        payload = _LEADING_DOT.sub(b"..", data)
+        if not payload.endswith(b"\r\n"):
+            payload += b"\r\n"
+        try:
+            self._writer.write(payload + b".\r\n")
+            await self._writer.drain()
+        except OSError as exc:
+            raise smtplib.SMTPServerDisconnected(str(exc)) from exc
+        code, message = await self._read_reply()
+        if code != 250:
+            await self._rset_quietly(code)
+            raise smtplib.SMTPDataError(code, message)
+        self.messages_sent += 1
+        return refused
+
+    async def _rset_quietly(self, code: int) -> None:
+        if code == 421:
+            self.close()
+            return
+        try:
+            await self.command("RSET")
+        except smtplib.SMTPException:
+            self.close()
+
+    async def quit(self) -> None:
+        try:
+            await self.command("QUIT")
+        except (smtplib.SMTPException, OSError):
+            pass
+        self.close()
+
+    def close(self, error: BaseException | None = None) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+        if self._span is not None:
+            self._span.finish(error=error, messages=self.messages_sent)
+            self._span = None
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None
+
+
+class AsyncSMTPDispatcher:
+    """
+    Keep ``concurrency`` SMTP sessions busy from a single worker process.
+
+    Messages are pulled from a (synchronous) iterable into a bounded queue of
+    ``window`` in-flight items and delivered by one coroutine per session, so a
+    relay that tolerates parallel sessions can be saturated without one
+    process per connection. Each session is reused across messages, replaced
+    after a 421 or dropped socket (the message is retried once on the new
+    session) and retired after ``max_messages_per_connection`` deliveries.
+    When a ``throttle`` is given each message waits for its tokens first.
+
+    Pulling the next message and ``on_result`` touch the database (queued
+    rows, checkpoints, retry scheduling), so both run on one helper thread,
+    one call at a time, never on the event loop. A failure in either, or in
+    a session coroutine, cancels the whole dispatch and is raised from
+    ``run`` instead of leaving the producer blocked on a full queue.
+    """
+
+    def __init__(
+        self,
+        *,
+        host: str,
+        port: int,
+        username: str | None = None,
+        password: str | None = None,
+        use_tls: bool = False,
+        timeout: float = 15,
+        concurrency: int = 8,
+        window: int | None = None,
+        max_messages_per_connection: int = 100,
+        throttle: SendThrottle | None = None,
+        account: str = "",
+    ) -> None:
+        self.session_options = dict(
+            host=host,
+            port=port,
+            username=username,
+            password=password,
+            use_tls=use_tls,
+            timeout=timeout,
+        )
+        self.concurrency = max(1, concurrency)
+        self.window = max(self.concurrency, window or self.concurrency * 4)
+        self.max_messages_per_connection = max_messages_per_connection
+        self.throttle = throttle
+        self.account = account
+        self.connections_opened = 0
+
+    def run(
+        self,
+        from_addr: str,
+        messages: Iterable[tuple[str | Sequence[str], bytes]],
+        on_result: ResultCallback,
+    ) -> None:
+        """
+        Blocking entry point: deliver ``(recipients, raw_bytes)`` pairs.
+
+        ``recipients`` is one address or a group sharing a single transaction;
+        ``on_result`` is called once per address either way.
+        """
+        asyncio.run(self.dispatch(from_addr, messages, on_result))
+
+    async def dispatch(
+        self,
+        from_addr: str,
+        messages: Iterable[tuple[str | Sequence[str], bytes]],
+        on_result: ResultCallback,
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.window)
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="smtp-dispatch") as executor:
+
+            def offload(fn, *args):
+                # Keep the caller's context (app context, trace span) on the helper thread.
+                call = partial(contextvars.copy_context().run, fn, *args)
+                return loop.run_in_executor(executor, call)
+
+            tasks = [asyncio.create_task(self._produce(queue, iter(messages), offload))]
+            tasks += [
+                asyncio.create_task(self._worker(queue, from_addr, on_result, offload))
+                for _ in range(self.concurrency)
+            ]
+            try:
+                done, _pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+                for task in done:
+                    if task.exception() is not None:
+                        raise task.exception()
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _produce(self, queue: asyncio.Queue, messages: Iterator, offload: Offload) -> None:
+        while (item := await offload(next, messages, None)) is not None:
+            await queue.put(item)
+        for _ in range(self.concurrency):
+            await queue.put(None)
+
+    async def _open_session(self) -> AsyncSMTPSession:
+        session = AsyncSMTPSession(**self.session_options)
+        started = time.perf_counter()
+        await session.connect()
+        SMTP_CONNECT_SECONDS.observe(time.perf_counter() - started)
+        self.connections_opened += 1
+        return session
+
+    async def _worker(
+        self, queue: asyncio.Queue, from_addr: str, on_result: ResultCallback, offload: Offload
+    ) -> None:
+        session: AsyncSMTPSession | None = None
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    if session is not None:
+                        await session.quit()
+                        session = None
+                    return
+                recipients, data = item
+                to_addrs = [recipients] if isinstance(recipients, str) else list(recipients)
+                if self.throttle is not None:
+                    for to_email in to_addrs:
+                        await self.throttle.acquire_async(self.account, recipient_domain(to_email))
+                error: BaseException | None = None
+                refused: dict[str, tuple[int, bytes]] = {}
+                for attempt in (1, 2):
+                    try:
+                        if session is None or not session.connected:
+                            session = await self._open_session()
+                        started = time.perf_counter()
+                        refused = await session.sendmail(from_addr, to_addrs, data)
+                        SMTP_SEND_SECONDS.observe(time.perf_counter() - started)
+                        error = None
+                        break
+                    except Exception as exc:  # reported per message via on_result
+                        error = exc
+                        if not is_reconnect_error(exc):
+                            break
+                        if session is not None:
+                            session.close()
+                        session = None
+                        if attempt == 1:
+                            logger.info("Async SMTP session dropped; reconnecting")
+                outcomes = recipient_outcomes(to_addrs, refused, error)
+                await offload(_report, on_result, outcomes, self.throttle)
+                if session is not None and (
+                    session.messages_sent >= self.max_messages_per_connection
+                ):
+                    await session.quit()
+                    session = None
+        finally:
+            if session is not None:
+                session.close()
+
+
+def _report(
+    on_result: ResultCallback,
+    outcomes: list[tuple[str, BaseException | None]],
+    throttle: SendThrottle | None = None,
+):
+    if throttle is not None:
+        throttle.penalize_deferrals(outcomes)
+    for to_email, outcome in outcomes:
+        on_result(to_email, outcome)
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from itertools import islice
+from typing import Iterable, Iterator, Sequence, TypeVar
+
+from sqlalchemy import exists, select
+
+from ..db.models import Campaign, Contact
+from ..extensions import db
+
+T = TypeVar("T")
+
+DEFAULT_PAGE_SIZE = 1000
+
+
+def iter_contact_rows(
+    organization_id: int,
+    *columns,
+    after_id: int = 0,
+    until_id: int | None = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> Iterator[tuple]:
+    """
+    Stream ``(Contact.id, *columns)`` rows for an organization in id order.
+
+    Uses keyset pagination (``WHERE id > :last ORDER BY id LIMIT n``) rather than
+    a server-side cursor: the send path commits between pages, which would
+    invalidate an open cursor, and each page is an index range scan no matter
+    how deep into the audience we are. Memory stays bounded by ``page_size``.
+    """
+    selected = (Contact.id, *(columns or (Contact.email,)))
+    last_id = after_id
+    while True:
+        stmt = (
+            select(*selected)
+            .where(Contact.organization_id == organization_id, Contact.id > last_id)
+            .order_by(Contact.id)
+            .limit(page_size)
+        )
+        if until_id is not None:
+            stmt = stmt.where(Contact.id <= until_id)
+        page = db.session.execute(stmt).all()
+        if not page:
+            return
+        yield from page
+        if len(page) < page_size:
+            return
+        last_id = page[-1][0]
+
+
+def iter_audience(
+    campaign: Campaign,
+    *,
+    after: int = 0,
+    until: int | None = None,
+    fields: Sequence[str] = ("email",),
+) -> Iterator[tuple]:
+    """
+    Yield ``(position, *fields)`` for a campaign's recipients in send order.
+
+    Positions are contact ids for contact audiences and 1-based offsets into
+    ``campaign.recipients`` for custom ones; only positions in
+    ``(after, until]`` are yielded, which is how batches and resumed batches
+    select their slice. ``fields`` are ``Contact`` columns and must start with
+    ``email``; custom recipients are looked up by address a page at a time.
+    """
+    if campaign.audience_type == "custom":
+        recipients = campaign.recipients or []
+        stop = len(recipients) if until is None else min(until, len(recipients))
+        if tuple(fields) == ("email",):
+            for index in range(after, stop):
+                yield index + 1, recipients[index]
+            return
+        for start in range(after, stop, DEFAULT_PAGE_SIZE):
+            page = recipients[start : min(stop, start + DEFAULT_PAGE_SIZE)]
+            rows = contact_fields_by_email(campaign.organization_id, page, fields)
+            for offset, email in enumerate(page, start + 1):
+                yield offset, *rows[email]
+        return
+
+    yield from iter_contact_rows(
+        campaign.organization_id,
+        *(getattr(Contact, name) for name in fields),
+        after_id=after,
+        until_id=until,
+    )
+
+
+def contact_fields_by_email(
+    organization_id: int, emails: Iterable[str], fields: Sequence[str]
+) -> dict[str, tuple]:
+    """
+    Map each address to its contact's ``fields`` values in one query.
+
+    Addresses without a contact get ``None`` for everything but ``email``.
+    """
+    emails = set(emails)
+    rows = {
+        email: tuple(email if name == "email" else None for name in fields) for email in emails
+    }
+    if emails:
+        columns = [getattr(Contact, name) for name in fields]
+        for row in db.session.execute(
+            select(Contact.email, *columns).where(
+                Contact.organization_id == organization_id, Contact.email.in_(emails)
+            )
+        ):
+            rows[row[0]] = tuple(row[1:])
+    return rows
+
+
+def has_audience(campaign: Campaign) -> bool:
+    if campaign.audience_type == "custom":
+        return bool(campaign.recipients)
+    return bool(
+        db.session.scalar(
+            select(exists().where(Contact.organization_id == campaign.organization_id))
+        )
+    )
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from typing import Iterable, Sequence
+
+from sqlalchemy import Table, insert
+from sqlalchemy.orm import Session
+
+from .audience import chunked
+
+
+def bulk_insert(
+    session: Session,
+    table: Table,
+    columns: Sequence[str],
+    rows: Iterable[tuple],
+    *,
+    chunk_size: int = 10_000,
+) -> int:
+    """
+    Insert ``rows`` (tuples ordered like ``columns``) as fast as the database allows.
+
+    On Postgres the rows are streamed through ``COPY ... FROM STDIN`` on the
+    session's own connection, so they share its transaction; elsewhere they go
+    out as ``executemany`` INSERTs of ``chunk_size`` rows. ``rows`` may be a
+    generator and is consumed once, keeping memory flat for large loads.
+    Returns the number of rows written; the caller commits.
+    """
+    connection = session.connection()
+    written = 0
+    if connection.dialect.name == "postgresql":
+        raw = connection.connection.driver_connection
+        statement = f"COPY {table.name} ({', '.join(columns)}) FROM STDIN"
+        with raw.cursor() as cursor:
+            with cursor.copy(statement) as copy:
+                for row in rows:
+                    copy.write_row(row)
+                    written += 1
+        return written
+    for chunk in chunked(rows, chunk_size):
+        session.execute(insert(table), [dict(zip(columns, row)) for row in chunk])
+        written += len(chunk)
+    return written
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from typing import Iterable, Mapping
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from ..db.models import CampaignStats
+
+COUNTERS = ("queued", "sent", "failed", "deferred")
+
+
+def apply_stats_delta(session: Session, campaign_id: int, delta: Mapping[str, int]) -> None:
+    """
+    Add ``delta`` (status -> change) to a campaign's counters.
+
+    Issued as one relative UPDATE inside the caller's transaction, so the
+    counters commit or roll back together with the ``email_sends`` rows they
+    describe and concurrent batches never overwrite each other's increments.
+    """
+    values = {
+        name: getattr(CampaignStats, name) + change
+        for name, change in delta.items()
+        if name in COUNTERS and change
+    }
+    if not values:
+        return
+    statement = update(CampaignStats).where(CampaignStats.campaign_id == campaign_id)
+    if session.execute(statement.values(**values)).rowcount:
+        return
+    _create_row(session, campaign_id)
+    session.execute(statement.values(**values))
+
+
+def _create_row(session: Session, campaign_id: int) -> None:
+    dialect = session.connection().dialect.name
+    row = {"campaign_id": campaign_id, **{name: 0 for name in COUNTERS}}
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        with session.begin_nested():
+            session.execute(insert(CampaignStats).values(**row))
+        return
+    # Two batches may race to create the row; the loser just updates it.
+    session.execute(dialect_insert(CampaignStats).values(**row).on_conflict_do_nothing())
+
+
+def get_campaign_stats(session: Session, campaign_ids: Iterable[int]) -> dict[int, dict]:
+    """Counters for each campaign id; campaigns that never sent report zeros."""
+    ids = list(campaign_ids)
+    stats = {campaign_id: {name: 0 for name in COUNTERS} for campaign_id in ids}
+    rows = session.execute(
+        select(CampaignStats.campaign_id, *(getattr(CampaignStats, name) for name in COUNTERS))
+        .where(CampaignStats.campaign_id.in_(ids))
+    )
+    for campaign_id, *counts in rows:
+        stats[campaign_id] = dict(zip(COUNTERS, counts))
+    for counters in stats.values():
+        counters["total"] = sum(counters.values())
+    return stats
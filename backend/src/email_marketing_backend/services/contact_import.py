@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+import csv
+import io
+import logging
+import os
+import re
+import uuid
+from datetime import datetime, timezone
+from itertools import islice
+from typing import BinaryIO, Iterable, Sequence
+
+from email_validator import SPECIAL_USE_DOMAIN_NAMES, EmailNotValidError, validate_email
+from flask import current_app
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    and_,
+    func,
+    literal,
+    or_,
+    select,
+    true,
+)
+from sqlalchemy.orm import Session
+
+from ..db.models import Contact, ContactImport, ContactImportReject
+from ..extensions import db
+from .audience import chunked
+from .bulk import bulk_insert
+
+logger = logging.getLogger(__name__)
+
+# Header spellings accepted for each contact column, compared after lowercasing
+# and turning spaces and hyphens into underscores. Other columns are ignored.
+COLUMN_ALIASES = {
+    "email": ("email", "e_mail", "email_address"),
+    "first_name": ("first_name", "firstname", "given_name"),
+    "last_name": ("last_name", "lastname", "surname", "family_name"),
+}
+
+_ATEXT = r"[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+"
+_LABEL = r"[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?"
+# The ASCII addresses ``email_validator`` accepts, as one compiled match.
+_EMAIL = re.compile(
+    rf"(?P<local>{_ATEXT}(?:\.{_ATEXT})*)@(?P<domain>(?:{_LABEL}\.)+(?P<tld>[A-Za-z]{{2,63}}))"
+)
+_SPECIAL_USE = frozenset(SPECIAL_USE_DOMAIN_NAMES)
+
+# A per-connection scratch table each chunk is copied into before the upsert;
+# on its own MetaData so ``create_all`` never makes it permanent. Postgres
+# drops it with the chunk's transaction; SQLite keeps it and it is emptied
+# before each use.
+_staging = Table(
+    "contact_import_staging",
+    MetaData(),
+    Column("email", String, nullable=False),
+    Column("first_name", String),
+    Column("last_name", String),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+_REJECT_COLUMNS = ("import_id", "row_number", "email", "reason")
+_COPY_BUFFER = 1024 * 1024
+
+
+class ContactImportError(ValueError):
+    """The upload cannot be imported at all (as opposed to a rejected row)."""
+
+
+def normalize_emails(values: Sequence[str | None]) -> list[str | None]:
+    """
+    Normalize a batch of addresses; ``None`` marks an invalid one.
+
+    Matches what ``EmailStr`` accepts for a single contact -- whitespace is
+    trimmed and the domain lowercased -- but runs one precompiled match per
+    value instead of a full ``validate_email`` call. Only non-ASCII values
+    and punycode (``xn--``) domains, which ``EmailStr`` decodes to Unicode,
+    take the slow path.
+    """
+    stripped = [(value or "").strip() for value in values]
+    normalized: list[str | None] = []
+    for value, match in zip(stripped, map(_EMAIL.fullmatch, stripped)):
+        if match is not None and "xn--" not in match["domain"].lower():
+            if (
+                len(value) <= 254
+                and len(match["local"]) <= 64
+                and match["tld"].lower() not in _SPECIAL_USE
+            ):
+                normalized.append(f"{match['local']}@{match['domain'].lower()}")
+            else:
+                normalized.append(None)
+        elif value and (not value.isascii() or "xn--" in value.lower()):
+            normalized.append(_validate_slow(value))
+        else:
+            normalized.append(None)
+    return normalized
+
+
+def _validate_slow(value: str) -> str | None:
+    try:
+        return validate_email(value, check_deliverability=False).normalized
+    except EmailNotValidError:
+        return None
+
+
+def header_columns(header: Sequence[str] | None) -> dict[str, int]:
+    """Map contact columns to their index in ``header``; an email column is required."""
+    columns: dict[str, int] = {}
+    for index, name in enumerate(header or ()):
+        key = re.sub(r"[\s-]+", "_", name.strip().lower())
+        for field, aliases in COLUMN_ALIASES.items():
+            if key in aliases and field not in columns:
+                columns[field] = index
+    if "email" not in columns:
+        raise ContactImportError("CSV header has no email column")
+    return columns
+
+
+def save_upload(stream: BinaryIO, *, max_bytes: int) -> tuple[str, int]:
+    """
+    Copy an upload to ``CONTACT_IMPORT_DIR`` a buffer at a time.
+
+    Returns the path and size; raises ``ContactImportError`` (removing the
+    partial file) once more than ``max_bytes`` have arrived.
+    """
+    directory = current_app.config.get("CONTACT_IMPORT_DIR", "/tmp/contact-imports")
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{uuid.uuid4().hex}.csv")
+    size = 0
+    try:
+        with open(path, "wb") as handle:
+            while block := stream.read(_COPY_BUFFER):
+                size += len(block)
+                if size > max_bytes:
+                    raise ContactImportError(f"Upload exceeds {max_bytes} bytes")
+                handle.write(block)
+    except BaseException:
+        remove_upload(path)
+        raise
+    return path, size
+
+
+def check_upload(path: str) -> None:
+    """Read just the header of a saved upload, so a wrong file fails at upload time."""
+    try:
+        with open(path, newline="", encoding="utf-8-sig") as handle:
+            header_columns(next(csv.reader(handle), None))
+    except (csv.Error, UnicodeDecodeError) as exc:
+        raise ContactImportError(f"Upload is not a UTF-8 CSV file: {exc}") from exc
+
+
+def run_contact_import(import_id: int, *, chunk_size: int | None = None) -> dict:
+    """
+    Stream an uploaded CSV into ``contacts`` ``chunk_size`` rows at a time.
+
+    Each chunk's valid rows are copied into a temporary staging table and
+    merged with one ``INSERT ... SELECT ... ON CONFLICT (organization_id,
+    email) DO UPDATE``; blank names never overwrite stored ones, and rows
+    already up to date are not rewritten. Within a chunk the last row for an
+    address wins. The chunk's rejects and the import's counters commit in the
+    same transaction, so a redelivered task resumes after the last committed
+    chunk instead of starting over.
+    """
+    session = db.session
+    record = session.get(ContactImport, import_id)
+    if record is None:
+        return {"import_id": import_id, "status": "missing"}
+    if record.status in ("completed", "failed"):
+        return summarize_import(record)
+    chunk_size = max(
+        1, chunk_size or int(current_app.config.get("CONTACT_IMPORT_CHUNK_SIZE", 50_000))
+    )
+    record.status = "running"
+    record.started_at = record.started_at or datetime.now(tz=timezone.utc)
+    session.commit()
+
+    try:
+        with open(record.upload_path, "rb") as raw:
+            reader = csv.reader(io.TextIOWrapper(raw, encoding="utf-8-sig", newline=""))
+            columns = header_columns(next(reader, None))
+            rows = islice(enumerate(reader, 1), record.processed_rows, None)
+            for chunk in chunked(rows, chunk_size):
+                _import_chunk(session, record, columns, chunk)
+                record.processed_rows = chunk[-1][0]
+                record.processed_bytes = min(raw.tell(), record.size_bytes)
+                session.commit()
+    except (ContactImportError, csv.Error, UnicodeDecodeError, OSError) as exc:
+        session.rollback()
+        _finish(session, record, "failed", error=str(exc))
+        return summarize_import(record)
+    except Exception as exc:
+        session.rollback()
+        _finish(session, record, "failed", error=f"Import failed: {exc.__class__.__name__}")
+        raise
+    record.processed_bytes = record.size_bytes
+    _finish(session, record, "completed")
+    return summarize_import(record)
+
+
+def _import_chunk(
+    session: Session, record: ContactImport, columns: dict[str, int], chunk: list[tuple]
+) -> None:
+    email_index = columns["email"]
+    first_index = columns.get("first_name")
+    last_index = columns.get("last_name")
+    raw_emails = [row[email_index] if len(row) > email_index else "" for _n, row in chunk]
+
+    accepted: dict[str, tuple] = {}
+    rejects: list[tuple] = []
+    for (row_number, row), raw_email, email in zip(chunk, raw_emails, normalize_emails(raw_emails)):
+        if email is not None:
+            accepted[email] = (email, _cell(row, first_index), _cell(row, last_index))
+        elif raw_email.strip():
+            rejects.append((record.id, row_number, raw_email.strip()[:320], "invalid email"))
+        elif any(cell.strip() for cell in row):
+            rejects.append((record.id, row_number, None, "missing email"))
+
+    if rejects:
+        bulk_insert(session, ContactImportReject.__table__, _REJECT_COLUMNS, rejects)
+        record.rejected_count += len(rejects)
+    if accepted:
+        existing, changed = _upsert(session, record.organization_id, accepted.values())
+        created = len(accepted) - existing
+        record.created_count += created
+        record.updated_count += changed - created
+
+
+def _cell(row: list[str], index: int | None) -> str | None:
+    if index is None or index >= len(row):
+        return None
+    return row[index].strip() or None
+
+
+def _upsert(session: Session, organization_id: int, rows: Iterable[tuple]) -> tuple[int, int]:
+    """Merge ``(email, first_name, last_name)`` rows; returns (already existing, written)."""
+    connection = session.connection()
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        raise ContactImportError(f"Bulk import is not supported on {dialect}")
+
+    contacts = Contact.__table__
+    _staging.create(connection, checkfirst=True)
+    session.execute(_staging.delete())
+    bulk_insert(session, _staging, ("email", "first_name", "last_name"), rows)
+    existing = session.scalar(
+        select(func.count())
+        .select_from(_staging)
+        .join(
+            contacts,
+            and_(
+                contacts.c.organization_id == organization_id,
+                contacts.c.email == _staging.c.email,
+            ),
+        )
+    )
+    now = literal(datetime.now(tz=timezone.utc), DateTime(timezone=True))
+    statement = dialect_insert(contacts).from_select(
+        ["organization_id", "email", "first_name", "last_name", "created_at", "updated_at"],
+        # ``WHERE true`` keeps SQLite from reading ON CONFLICT as a join clause.
+        select(
+            literal(organization_id, Integer),
+            _staging.c.email,
+            _staging.c.first_name,
+            _staging.c.last_name,
+            now,
+            now,
+        ).where(true()),
+    )
+    excluded = statement.excluded
+    statement = statement.on_conflict_do_update(
+        index_elements=[contacts.c.organization_id, contacts.c.email],
+        set_={
+            "first_name": func.coalesce(excluded.first_name, contacts.c.first_name),
+            "last_name": func.coalesce(excluded.last_name, contacts.c.last_name),
+            "updated_at": excluded.updated_at,
+        },
+        where=or_(
+            and_(
+                excluded.first_name.is_not(None),
+                contacts.c.first_name.is_distinct_from(excluded.first_name),
+            ),
+            and_(
+                excluded.last_name.is_not(None),
+                contacts.c.last_name.is_distinct_from(excluded.last_name),
+            ),
+        ),
+    )
+    changed = session.execute(statement).rowcount
+    return existing, changed
+
+
+def _finish(session: Session, record: ContactImport, status: str, error: str | None = None) -> None:
+    record.status = status
+    record.error = error
+    record.finished_at = datetime.now(tz=timezone.utc)
+    session.commit()
+    if record.upload_path:
+        remove_upload(record.upload_path)
+
+
+def remove_upload(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError:
+        logger.warning("Could not remove contact import upload %s", path, exc_info=True)
+
+
+def summarize_import(record: ContactImport) -> dict:
+    return {
+        "import_id": record.id,
+        "status": record.status,
+        "processed_rows": record.processed_rows,
+        "created": record.created_count,
+        "updated": record.updated_count,
+        "rejected": record.rejected_count,
+    }
@@ -1,30 +1,421 @@
 from __future__ import annotations
 
-import smtplib
+import binascii
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from email.header import Header
 from email.message import EmailMessage
+from email.policy import SMTP
+from email.utils import formatdate, parseaddr
+from typing import Iterable, Iterator, Sequence
 
 from flask import current_app
 
+from .async_smtp import AsyncSMTPDispatcher
+from .dkim import BodySignature, DKIMSigner
+from .merge_tags import CompiledTemplate, address_row, compile_template
+from .smtp_pool import SMTPConnectionPool
+from .throttle import SendThrottle
+from .transports import MailTransport, MaildirTransport, NullTransport, SMTPTransport
 
-def send_html_email(*, to_email: str, subject: str, html: str) -> None:
-    host = current_app.config.get("SMTP_HOST", "mailhog")
-    port = int(current_app.config.get("SMTP_PORT", 1025))
-    username = current_app.config.get("SMTP_USERNAME")
-    password = current_app.config.get("SMTP_PASSWORD")
-    use_tls = bool(current_app.config.get("SMTP_USE_TLS", False))
-    from_email = current_app.config.get("SMTP_FROM_EMAIL", "no-reply@constellation.local")
+SMTP_TRANSPORTS = ("smtp_pool", "smtp")
+DEFAULT_TEXT = "This message contains HTML. Please view in an HTML-capable client."
 
-    msg = EmailMessage()
-    msg["To"] = to_email
+_pool_lock = threading.Lock()
+_pool: SMTPConnectionPool | None = None
+_pool_key: tuple | None = None
+_transport: MailTransport | None = None
+_transport_key: tuple | None = None
+_dkim_signer: DKIMSigner | None = None
+_dkim_key: tuple | None = None
+
+
+def get_smtp_pool() -> SMTPConnectionPool:
+    """
+    Return the SMTP pool owned by the current process.
+
+    The pool is keyed on the process id so forked Celery/gunicorn workers never
+    share a socket inherited from their parent, and on the SMTP settings so a
+    config change (tests, app factories) gets a fresh pool.
+    """
+    global _pool, _pool_key
+    config = current_app.config
+    key = (
+        os.getpid(),
+        config.get("SMTP_HOST", "mailhog"),
+        int(config.get("SMTP_PORT", 1025)),
+        config.get("SMTP_USERNAME"),
+        config.get("SMTP_PASSWORD"),
+        bool(config.get("SMTP_USE_TLS", False)),
+        int(config.get("SMTP_POOL_MAX_IDLE", 4)),
+        int(config.get("SMTP_MAX_MESSAGES_PER_CONNECTION", 100)),
+    )
+    with _pool_lock:
+        if _pool is None or _pool_key != key:
+            if _pool is not None and _pool_key and _pool_key[0] == key[0]:
+                _pool.close()
+            _pool = SMTPConnectionPool(
+                host=key[1],
+                port=key[2],
+                username=key[3],
+                password=key[4],
+                use_tls=key[5],
+                max_idle=key[6],
+                max_messages_per_connection=key[7],
+                timeout=float(config.get("SMTP_TIMEOUT", 15)),
+                health_check_after=float(config.get("SMTP_POOL_HEALTH_CHECK_SECONDS", 30)),
+            )
+            _pool_key = key
+        return _pool
+
+
+def close_smtp_pool() -> None:
+    global _pool, _pool_key
+    with _pool_lock:
+        if _pool is not None and _pool_key and _pool_key[0] == os.getpid():
+            _pool.close()
+        _pool = None
+        _pool_key = None
+
+
+def get_mail_transport() -> MailTransport:
+    """
+    Return the process's transport for ``MAIL_TRANSPORT``.
+
+    ``smtp_pool`` (default) reuses pooled sessions, ``smtp`` opens a session
+    per message, ``maildir`` spools into ``MAIL_SPOOL_DIR`` and ``null`` only
+    counts. Like the pool, the instance is cached per process and settings.
+    """
+    global _transport, _transport_key
+    config = current_app.config
+    name = config.get("MAIL_TRANSPORT", "smtp_pool")
+    if name == "smtp_pool":
+        return get_smtp_pool()
+    key = (
+        os.getpid(),
+        name,
+        config.get("MAIL_SPOOL_DIR"),
+        config.get("SMTP_HOST", "mailhog"),
+        int(config.get("SMTP_PORT", 1025)),
+        config.get("SMTP_USERNAME"),
+        config.get("SMTP_PASSWORD"),
+        bool(config.get("SMTP_USE_TLS", False)),
+    )
+    with _pool_lock:
+        if _transport is None or _transport_key != key:
+            if name == "null":
+                transport: MailTransport = NullTransport()
+            elif name == "maildir":
+                transport = MaildirTransport(config.get("MAIL_SPOOL_DIR") or "mail-spool")
+            elif name == "smtp":
+                transport = SMTPTransport(
+                    host=key[3],
+                    port=key[4],
+                    username=key[5],
+                    password=key[6],
+                    use_tls=key[7],
+                    timeout=float(config.get("SMTP_TIMEOUT", 15)),
+                )
+            else:
+                raise ValueError(f"Unknown MAIL_TRANSPORT: {name!r}")
+            if _transport is not None and _transport_key and _transport_key[0] == key[0]:
+                _transport.close()
+            _transport, _transport_key = transport, key
+        return _transport
+
+
+def close_mail_transport() -> None:
+    global _transport, _transport_key
+    close_smtp_pool()
+    with _pool_lock:
+        if _transport is not None and _transport_key and _transport_key[0] == os.getpid():
+            _transport.close()
+        _transport = None
+        _transport_key = None
+
+
+def get_dkim_signer() -> DKIMSigner | None:
+    """
+    The process's DKIM signer, or ``None`` when signing is not configured.
+
+    The private key is read and parsed once per process and settings, like
+    the SMTP pool; ``DKIM_DOMAIN`` defaults to each message's From domain.
+    """
+    global _dkim_signer, _dkim_key
+    config = current_app.config
+    path, selector = config.get("DKIM_PRIVATE_KEY_PATH"), config.get("DKIM_SELECTOR")
+    if not path or not selector:
+        return None
+    key = (os.getpid(), path, selector, config.get("DKIM_DOMAIN"))
+    with _pool_lock:
+        if _dkim_signer is None or _dkim_key != key:
+            with open(path, "rb") as handle:
+                _dkim_signer = DKIMSigner.from_pem(handle.read(), selector=selector, domain=key[3])
+            _dkim_key = key
+        return _dkim_signer
+
+
+def async_dispatch_enabled() -> bool:
+    """The asyncio dispatcher speaks SMTP itself, so it only replaces SMTP transports."""
+    config = current_app.config
+    return (
+        config.get("SMTP_DISPATCH_MODE", "sync") == "async"
+        and config.get("MAIL_TRANSPORT", "smtp_pool") in SMTP_TRANSPORTS
+    )
+
+
+def sending_account(from_email: str) -> str:
+    """The identity send quotas apply to: the relay login, else the sender."""
+    return current_app.config.get("SMTP_USERNAME") or from_email
+
+
+def get_async_dispatcher(
+    *, throttle: SendThrottle | None = None, account: str = ""
+) -> AsyncSMTPDispatcher:
+    """Build an asyncio dispatcher for one batch from the SMTP settings."""
+    config = current_app.config
+    window = config.get("SMTP_ASYNC_WINDOW")
+    return AsyncSMTPDispatcher(
+        host=config.get("SMTP_HOST", "mailhog"),
+        port=int(config.get("SMTP_PORT", 1025)),
+        username=config.get("SMTP_USERNAME"),
+        password=config.get("SMTP_PASSWORD"),
+        use_tls=bool(config.get("SMTP_USE_TLS", False)),
+        timeout=float(config.get("SMTP_TIMEOUT", 15)),
+        concurrency=int(config.get("SMTP_ASYNC_CONCURRENCY", 8)),
+        window=int(window) if window else None,
+        max_messages_per_connection=int(config.get("SMTP_MAX_MESSAGES_PER_CONNECTION", 100)),
+        throttle=throttle,
+        account=account,
+    )
+
+
+@dataclass(frozen=True)
+class PreparedMessage:
+    """
+    A campaign message serialized once and reused for every recipient.
+
+    ``head`` holds the shared headers (From, Subject, MIME-Version and the
+    multipart Content-Type with its boundary) and ``body`` the already
+    transfer-encoded text and HTML parts. Per recipient only To, Message-ID
+    and Date are generated and prepended, so the hot path is a few small byte
+    joins and ``sendmail`` on raw bytes. With ``dkim`` set, the body hash was
+    computed when the message was prepared and each copy only adds the
+    header signature.
+    """
+
+    from_email: str
+    subject: str
+    head: bytes
+    body: bytes
+    msgid_domain: str
+    dkim: BodySignature | None = None
+
+    def for_recipient(self, to_email: str) -> bytes:
+        return self._render(_header_value(to_email))
+
+    def for_recipients(self, to_emails: Sequence[str]) -> bytes:
+        """Bytes for one transaction; a shared transaction hides its recipient list."""
+        if len(to_emails) == 1:
+            return self.for_recipient(to_emails[0])
+        return self._render(b"undisclosed-recipients:;")
+
+    def _render(self, to_header: bytes) -> bytes:
+        recipient_headers = b"".join(
+            (
+                b"To: ",
+                to_header,
+                b"\r\nMessage-ID: <",
+                uuid.uuid4().hex.encode("ascii"),
+                b"@",
+                self.msgid_domain.encode("ascii", "ignore"),
+                b">\r\nDate: ",
+                _rfc2822_date(),
+                b"\r\n",
+            )
+        )
+        signature = b"" if self.dkim is None else self.dkim.header(recipient_headers)
+        return b"".join((signature, recipient_headers, self.head, b"\r\n\r\n", self.body))
+
+
+def _prepared(
+    *, from_email: str, subject: str, head: bytes, body: bytes, signer: DKIMSigner | None
+) -> PreparedMessage:
+    msgid_domain = parseaddr(from_email)[1].rpartition("@")[2] or "localhost"
+    return PreparedMessage(
+        from_email=from_email,
+        subject=subject,
+        head=head,
+        body=body,
+        msgid_domain=msgid_domain,
+        dkim=None if signer is None else signer.prepare(head, body, domain=msgid_domain),
+    )
+
+
+def _header_value(value: str) -> bytes:
+    # Addresses come from validated contacts, but never let a stray CR/LF
+    # turn into an injected header.
+    return value.replace("\r", "").replace("\n", "").encode("utf-8")
+
+
+_date_cache: tuple[int, bytes] = (0, b"")
+
+
+def _rfc2822_date() -> bytes:
+    global _date_cache
+    now = int(time.time())
+    if _date_cache[0] != now:
+        _date_cache = (now, formatdate(now, usegmt=True).encode("ascii"))
+    return _date_cache[1]
+
+
+def prepare_html_email(
+    *, subject: str, html: str, text: str | None = None, from_email: str | None = None
+) -> PreparedMessage:
+    from_email = from_email or current_app.config.get(
+        "SMTP_FROM_EMAIL", "no-reply@constellation.local"
+    )
+    msg = EmailMessage(policy=SMTP)
     msg["From"] = from_email
     msg["Subject"] = subject
-    msg.set_content("This message contains HTML. Please view in an HTML-capable client.")
+    msg.set_content(text or DEFAULT_TEXT)
     msg.add_alternative(html, subtype="html")
 
-    with smtplib.SMTP(host, port, timeout=15) as client:
-        if use_tls:
-            client.starttls()
-        if username and password:
-            client.login(username, password)
-        client.send_message(msg)
-    current_app.logger.info("Sent email to=%s subject=%s via %s:%s", to_email, subject, host, port)
+    head, _, body = msg.as_bytes().partition(b"\r\n\r\n")
+    return _prepared(
+        from_email=from_email, subject=subject, head=head, body=body, signer=get_dkim_signer()
+    )
+
+
+@dataclass(frozen=True)
+class PersonalizedMessage:
+    """
+    A campaign message whose subject or body carries merge tags.
+
+    Everything that does not depend on the contact is built once: the From,
+    MIME-Version and Content-Type headers, each part's headers, the encoded
+    bytes of parts without tags, and the compiled subject and part templates.
+    ``for_row`` renders the tagged pieces for one contact, quoted-printable
+    encodes them and returns a ``PreparedMessage`` for that recipient. Each
+    rendered body is different, so DKIM body hashes are per recipient here.
+    """
+
+    from_email: str
+    subject: CompiledTemplate
+    head: bytes
+    parts: tuple[tuple[bytes, CompiledTemplate | bytes], ...]
+    boundary: bytes
+    signer: DKIMSigner | None = None
+
+    def for_row(self, row: Sequence[str | None]) -> PreparedMessage:
+        """``row`` holds the contact's ``MERGE_FIELDS`` values."""
+        subject = self.subject.render(row)
+        body = [b"--" + self.boundary]
+        for headers, content in self.parts:
+            if isinstance(content, CompiledTemplate):
+                content = _quoted_printable(content.render(row))
+            body.extend((b"\r\n", headers, b"\r\n\r\n", content, b"\r\n--", self.boundary))
+        body.append(b"--\r\n")
+        return _prepared(
+            from_email=self.from_email,
+            subject=subject,
+            head=_subject_header(subject) + self.head,
+            body=b"".join(body),
+            signer=self.signer,
+        )
+
+
+def _quoted_printable(text: str) -> bytes:
+    encoded = binascii.b2a_qp(text.replace("\r\n", "\n").encode("utf-8"))
+    return encoded.replace(b"\n", b"\r\n")
+
+
+def _subject_header(subject: str) -> bytes:
+    subject = subject.replace("\r", " ").replace("\n", " ")
+    if subject.isascii() and len(subject) < 900:
+        return b"Subject: " + subject.encode("ascii") + b"\r\n"
+    encoded = Header(subject, "utf-8", header_name="Subject").encode(linesep="\r\n")
+    return b"Subject: " + encoded.encode("ascii") + b"\r\n"
+
+
+def prepare_campaign_email(
+    *, subject: str, html: str, text: str | None = None, from_email: str | None = None
+) -> PreparedMessage | PersonalizedMessage:
+    """
+    Prepare a campaign message, compiling merge tags in subject, HTML and text.
+
+    Without tags this is ``prepare_html_email``: one serialization shared by
+    every recipient. With tags, the static parts are still encoded once and
+    only the tagged ones are rendered per contact (see ``PersonalizedMessage``).
+    Raises ``MergeTagError`` for unknown fields.
+    """
+    compiled_subject = compile_template(subject)
+    compiled_text = compile_template(text or DEFAULT_TEXT)
+    compiled_html = compile_template(html, html=True)
+    if not (
+        compiled_subject.personalized or compiled_text.personalized or compiled_html.personalized
+    ):
+        return prepare_html_email(subject=subject, html=html, text=text, from_email=from_email)
+
+    from_email = from_email or current_app.config.get(
+        "SMTP_FROM_EMAIL", "no-reply@constellation.local"
+    )
+    # "=_" never occurs in quoted-printable output ("=" is always escaped),
+    # so the boundary cannot collide with any rendered part.
+    boundary = f"=_{uuid.uuid4().hex}"
+    msg = EmailMessage(policy=SMTP)
+    msg["From"] = from_email
+    msg["MIME-Version"] = "1.0"
+    msg["Content-Type"] = f'multipart/alternative; boundary="{boundary}"'
+    head = b"".join(SMTP.fold_binary(name, value) for name, value in msg.items())
+
+    parts = []
+    for subtype, compiled in (("plain", compiled_text), ("html", compiled_html)):
+        headers = (
+            f'Content-Type: text/{subtype}; charset="utf-8"\r\n'
+            "Content-Transfer-Encoding: quoted-printable"
+        ).encode("ascii")
+        content = compiled if compiled.personalized else _quoted_printable(compiled.source)
+        parts.append((headers, content))
+    return PersonalizedMessage(
+        from_email=from_email,
+        subject=compiled_subject,
+        head=head.removesuffix(b"\r\n"),
+        parts=tuple(parts),
+        boundary=boundary.encode("ascii"),
+        signer=get_dkim_signer(),
+    )
+
+
+def send_prepared_email(
+    prepared: PreparedMessage, to_email: str | Sequence[str]
+) -> dict[str, tuple[int, bytes]]:
+    """Send to one address, or to a group in one transaction; returns refused RCPTs."""
+    to_emails = [to_email] if isinstance(to_email, str) else list(to_email)
+    return get_mail_transport().sendmail(
+        prepared.from_email, to_emails, prepared.for_recipients(to_emails)
+    )
+
+
+def group_recipients_by_domain(
+    emails: Iterable[str], max_per_transaction: int
+) -> Iterator[list[str]]:
+    """Group addresses by destination domain into transactions of bounded size."""
+    by_domain: dict[str, list[str]] = {}
+    for email in emails:
+        by_domain.setdefault(email.rpartition("@")[2].lower(), []).append(email)
+    for group in by_domain.values():
+        for start in range(0, len(group), max_per_transaction):
+            yield group[start : start + max_per_transaction]
+
+
+def send_html_email(*, to_email: str, subject: str, html: str, text: str | None = None) -> None:
+    """Send one message; merge tags render with the recipient's address and fallbacks."""
+    prepared = prepare_campaign_email(subject=subject, html=html, text=text)
+    if isinstance(prepared, PersonalizedMessage):
+        prepared = prepared.for_row(address_row(to_email))
+    send_prepared_email(prepared, to_email)
+    current_app.logger.info("Sent email to=%s subject=%s", to_email, subject)
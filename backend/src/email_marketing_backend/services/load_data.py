@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import random
+from bisect import bisect
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from typing import Callable, Iterator
+
+from sqlalchemy import select
+
+from ..db.models import (
+    Campaign,
+    CampaignStats,
+    Contact,
+    EmailSend,
+    EmailTemplate,
+    Organization,
+    User,
+)
+from ..extensions import db
+from .bulk import bulk_insert
+from .iam import assign_roles, seed_iam
+from .rendering import compile_into
+
+# Everything is anchored to a fixed date so a given seed always produces
+# byte-identical rows, whenever it is run.
+ANCHOR = datetime(2025, 1, 1, tzinfo=timezone.utc)
+HISTORY_DAYS = 730
+
+# Reserved-TLD stand-ins for the usual mailbox-provider mix, so a load
+# workspace can never mail a real address.
+DOMAINS = (
+    ("gmail.test", 35),
+    ("outlook.test", 14),
+    ("yahoo.test", 10),
+    ("hotmail.test", 6),
+    ("icloud.test", 6),
+    ("aol.test", 2),
+    ("gmx.test", 2),
+    ("proton.test", 1),
+) + tuple((f"corp{idx}.test", 1) for idx in range(24))
+FIRST_NAMES = tuple(
+    """
+    James Mary Robert Patricia John Jennifer Michael Linda David Elizabeth William
+    Barbara Richard Susan Joseph Jessica Thomas Sarah Charles Karen Wei Aisha Mateo
+    Priya Yuki Olga Kwame Lucia
+    """.split()
+)
+LAST_NAMES = tuple(
+    """
+    Smith Johnson Williams Brown Jones Garcia Miller Davis Rodriguez Martinez Hernandez
+    Lopez Gonzalez Wilson Anderson Thomas Taylor Moore Jackson Martin Chen Okafor Novak
+    Sato Kowalski Haddad
+    """.split()
+)
+SUBJECTS = (
+    "Your {month} product roundup",
+    "Last chance: {pct}% off ends tonight",
+    "New arrivals picked for you",
+    "We've updated our terms",
+    "Your account summary for {month}",
+    "Join us for the {month} webinar",
+)
+MONTHS = ("January", "February", "March", "April", "May", "June", "July", "August")
+SEND_STATUSES = (("sent", 96), ("failed", 3), ("deferred", 1))
+SEND_ERRORS = {
+    "failed": "(550, b'5.1.1 Mailbox unavailable')",
+    "deferred": "(451, b'4.7.1 Try again later')",
+}
+
+Progress = Callable[[str], None]
+
+
+@dataclass(frozen=True)
+class LoadProfile:
+    organizations: int = 1
+    contacts: int = 100_000
+    templates: int = 10
+    campaigns: int = 20
+    sends_per_campaign: int = 10_000
+    seed: int = 42
+
+
+def seed_load(profile: LoadProfile, progress: Progress | None = None) -> list[int]:
+    """
+    Generate production-sized workspaces and return their organization ids.
+
+    Contacts and historical ``email_sends`` are streamed through
+    ``bulk_insert`` (COPY on Postgres); organizations, users, templates and
+    campaigns are few enough for the ORM. Every value derives from
+    ``profile.seed``, so the same profile reproduces the same dataset.
+    Raises ``ValueError`` if the seed's organizations already exist.
+    """
+    progress = progress or (lambda _message: None)
+    seed_iam()
+    org_ids = []
+    for index in range(profile.organizations):
+        slug = f"load-{profile.seed}-{index}"
+        if db.session.scalar(select(Organization.id).where(Organization.slug == slug)):
+            raise ValueError(f"Organization {slug!r} already exists; pick another --seed")
+        rng = random.Random(f"{profile.seed}:{index}")
+        org_ids.append(_seed_organization(rng, slug, profile, progress))
+    return org_ids
+
+
+def _seed_organization(
+    rng: random.Random, slug: str, profile: LoadProfile, progress: Progress
+) -> int:
+    org = Organization(name=f"Load Test {slug}", slug=slug, created_at=ANCHOR, updated_at=ANCHOR)
+    db.session.add(org)
+    db.session.flush()
+    owner = User(
+        email=f"owner@{slug}.test",
+        first_name="Load",
+        last_name="Owner",
+        organization_id=org.id,
+        created_at=ANCHOR,
+        updated_at=ANCHOR,
+    )
+    owner.set_password("load-test")
+    db.session.add(owner)
+    db.session.commit()
+    assign_roles(owner, ["org-admin"])
+
+    salt = rng.getrandbits(32)
+    written = bulk_insert(
+        db.session,
+        Contact.__table__,
+        ("organization_id", "email", "first_name", "last_name", "created_at", "updated_at"),
+        _contact_rows(random.Random(rng.random()), salt, org.id, profile.contacts),
+    )
+    db.session.commit()
+    progress(f"{slug}: {written} contacts")
+
+    templates = [_template(rng, org.id, owner.id, idx) for idx in range(profile.templates)]
+    db.session.add_all(templates)
+    db.session.commit()
+    progress(f"{slug}: {len(templates)} templates")
+
+    if not templates or not profile.contacts:
+        return org.id
+    campaigns = []
+    for idx in range(profile.campaigns):
+        template = rng.choice(templates)
+        sent_at = ANCHOR - timedelta(
+            days=HISTORY_DAYS * (profile.campaigns - idx) / profile.campaigns
+        )
+        campaigns.append(
+            Campaign(
+                organization_id=org.id,
+                created_by_user_id=owner.id,
+                name=f"Campaign {idx + 1:04d}",
+                status="sent",
+                template_id=template.id,
+                subject=template.subject,
+                audience_type="all_contacts",
+                created_at=sent_at,
+                updated_at=sent_at,
+            )
+        )
+    db.session.add_all(campaigns)
+    db.session.commit()
+
+    sends = 0
+    for campaign in campaigns:
+        counts = dict.fromkeys(("queued", "sent", "failed", "deferred"), 0)
+        sends += bulk_insert(
+            db.session,
+            EmailSend.__table__,
+            (
+                "organization_id",
+                "campaign_id",
+                "to_email",
+                "status",
+                "error",
+                "created_at",
+                "updated_at",
+            ),
+            _send_rows(random.Random(rng.random()), salt, campaign, profile, counts),
+        )
+        db.session.add(CampaignStats(campaign_id=campaign.id, **counts))
+        db.session.commit()
+    progress(f"{slug}: {len(campaigns)} campaigns, {sends} email_sends")
+    return org.id
+
+
+_DOMAIN_NAMES = tuple(name for name, _weight in DOMAINS)
+_DOMAIN_CUMULATIVE = tuple(accumulate(weight for _name, weight in DOMAINS))
+
+
+def contact_fields(salt: int, idx: int) -> tuple[str, str, str]:
+    """
+    ``(email, first_name, last_name)`` of contact ``idx``, a pure function of the index.
+
+    Historical sends rebuild recipient addresses from the index alone, so no
+    contact list has to be held in memory or read back.
+    """
+    mixed = ((idx + 1) * 0x9E3779B1 ^ salt) & 0xFFFFFFFF
+    mixed = (mixed * 0x85EBCA6B) & 0xFFFFFFFF
+    first = FIRST_NAMES[mixed % len(FIRST_NAMES)]
+    last = LAST_NAMES[(mixed >> 8) % len(LAST_NAMES)]
+    domain = _DOMAIN_NAMES[bisect(_DOMAIN_CUMULATIVE, (mixed >> 16) % _DOMAIN_CUMULATIVE[-1])]
+    return f"{first}.{last}.{idx}@{domain}".lower(), first, last
+
+
+def _contact_rows(rng: random.Random, salt: int, org_id: int, count: int) -> Iterator[tuple]:
+    for idx in range(count):
+        email, first, last = contact_fields(salt, idx)
+        created = ANCHOR - timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400))
+        yield org_id, email, first, last, created, created
+
+
+def _send_rows(
+    rng: random.Random,
+    salt: int,
+    campaign: Campaign,
+    profile: LoadProfile,
+    counts: dict[str, int],
+) -> Iterator[tuple]:
+    """Sends to a contiguous window of the audience, starting at a random contact."""
+    total = min(profile.sends_per_campaign, profile.contacts)
+    start = rng.randrange(profile.contacts)
+    statuses = [status for status, _weight in SEND_STATUSES]
+    weights = [weight for _status, weight in SEND_STATUSES]
+    for offset in range(total):
+        email, _first, _last = contact_fields(salt, (start + offset) % profile.contacts)
+        status = rng.choices(statuses, weights)[0]
+        counts[status] += 1
+        error = SEND_ERRORS.get(status)
+        stamp = campaign.created_at + timedelta(seconds=offset // 50)
+        yield campaign.organization_id, campaign.id, email, status, error, stamp, stamp
+
+
+def _template(rng: random.Random, org_id: int, user_id: int, idx: int) -> EmailTemplate:
+    subject = rng.choice(SUBJECTS).format(month=rng.choice(MONTHS), pct=rng.choice((10, 20, 30)))
+    project_data, html, css = _grapesjs_project(rng, idx, subject)
+    template = EmailTemplate(
+        organization_id=org_id,
+        created_by_user_id=user_id,
+        name=f"Template {idx + 1:03d}",
+        subject=subject,
+        html=html,
+        css=css,
+        project_data=project_data,
+        created_at=ANCHOR,
+        updated_at=ANCHOR,
+    )
+    compile_into(template)
+    return template
+
+
+def _grapesjs_project(rng: random.Random, idx: int, heading: str) -> tuple[dict, str, str]:
+    """A GrapesJS ``getProjectData()`` document plus the HTML/CSS it exports to."""
+    sections = []
+    html_parts = []
+    for section in range(rng.randint(3, 8)):
+        words = " ".join(rng.choice(LAST_NAMES).lower() for _ in range(rng.randint(25, 80)))
+        block_id = f"t{idx}s{section}"
+        sections.append(
+            {
+                "tagName": "section",
+                "attributes": {"id": block_id},
+                "components": [
+                    {
+                        "tagName": "h2",
+                        "type": "text",
+                        "components": [{"type": "textnode", "content": heading}],
+                    },
+                    {
+                        "tagName": "p",
+                        "type": "text",
+                        "components": [{"type": "textnode", "content": words}],
+                    },
+                    {
+                        "type": "link",
+                        "attributes": {"href": f"https://example.test/offer/{idx}/{section}"},
+                        "components": [{"type": "textnode", "content": "Shop now"}],
+                    },
+                ],
+            }
+        )
+        html_parts.append(
+            f'<section id="{block_id}"><h2>{heading}</h2><p>{words}</p>'
+            f'<a href="https://example.test/offer/{idx}/{section}">Shop now</a></section>'
+        )
+    color = f"#{rng.randrange(0x1000000):06x}"
+    styles = [
+        {"selectors": ["#wrapper"], "style": {"font-family": "Helvetica, Arial, sans-serif"}},
+        {"selectors": ["h2"], "style": {"color": color, "font-size": "22px"}},
+        {
+            "selectors": ["a"],
+            "style": {"background-color": color, "color": "#ffffff", "padding": "10px 18px"},
+        },
+    ]
+    css = (
+        "#wrapper{font-family:Helvetica, Arial, sans-serif;}"
+        f"h2{{color:{color};font-size:22px;}}"
+        f"a{{background-color:{color};color:#ffffff;padding:10px 18px;}}"
+    )
+    project_data = {
+        "assets": [],
+        "styles": styles,
+        "pages": [
+            {
+                "id": f"page-{idx}",
+                "frames": [
+                    {
+                        "component": {
+                            "type": "wrapper",
+                            "attributes": {"id": "wrapper"},
+                            "components": sections,
+                        }
+                    }
+                ],
+            }
+        ],
+        "symbols": [],
+        "dataSources": [],
+    }
+    return project_data, "".join(html_parts), css
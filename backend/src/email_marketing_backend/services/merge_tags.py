@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import re
+from html import escape as escape_html
+from typing import Sequence
+
+# Contact columns a template may reference, in the order rows are laid out:
+# ``CompiledTemplate.render`` takes a tuple of these values, as streamed from
+# ``contacts`` by ``iter_audience(..., fields=MERGE_FIELDS)``.
+MERGE_FIELDS = ("email", "first_name", "last_name")
+
+_FIELD_INDEX = {name: index for index, name in enumerate(MERGE_FIELDS)}
+
+# {{ field }} or {{ field | fallback }}; a fallback may be quoted to keep
+# leading/trailing spaces or a "}}".
+_TAG = re.compile(
+    r"""\{\{\s*(?P<field>[A-Za-z_][A-Za-z0-9_]*)\s*
+        (?:\|\s*(?:"(?P<quoted>[^"]*)"|(?P<bare>.*?))\s*)?
+        \}\}""",
+    re.VERBOSE | re.DOTALL,
+)
+
+
+class MergeTagError(ValueError):
+    """A template references a field contacts do not have."""
+
+
+class CompiledTemplate:
+    """
+    A template split once into literal chunks and field slots.
+
+    Rendering copies the pre-built list of parts, drops each contact's value
+    (or the slot's fallback when the value is empty or missing) into the slot
+    positions and joins; nothing is parsed per recipient. With ``html=True``
+    values are HTML-escaped, while literals and fallbacks are template content
+    and inserted as written.
+    """
+
+    __slots__ = ("_html", "_parts", "_slots", "fields", "source")
+
+    def __init__(self, source: str, parts: list[str], slots: list[tuple], html: bool) -> None:
+        self.source = source
+        self._parts = parts
+        self._slots = tuple(slots)
+        self._html = html
+        self.fields = tuple(dict.fromkeys(MERGE_FIELDS[index] for _pos, index, _fb in slots))
+
+    @property
+    def personalized(self) -> bool:
+        return bool(self._slots)
+
+    def render(self, row: Sequence[str | None]) -> str:
+        """Render for one contact; ``row`` holds values in ``MERGE_FIELDS`` order."""
+        if not self._slots:
+            return self.source
+        parts = self._parts.copy()
+        if self._html:
+            for position, index, fallback in self._slots:
+                value = row[index]
+                parts[position] = escape_html(value) if value else fallback
+        else:
+            for position, index, fallback in self._slots:
+                parts[position] = row[index] or fallback
+        return "".join(parts)
+
+
+def compile_template(source: str, *, html: bool = False) -> CompiledTemplate:
+    """
+    Compile ``{{ field }}`` / ``{{ field | fallback }}`` tags in ``source``.
+
+    Raises ``MergeTagError`` for fields outside ``MERGE_FIELDS`` so a typo is
+    caught when the template is saved rather than mailed to every contact.
+    """
+    parts: list[str] = []
+    slots: list[tuple[int, int, str]] = []
+    last = 0
+    for match in _TAG.finditer(source):
+        name = match["field"].lower()
+        if name not in _FIELD_INDEX:
+            raise MergeTagError(
+                f"Unknown merge field {match['field']!r}; "
+                f"available fields: {', '.join(MERGE_FIELDS)}"
+            )
+        if match.start() > last:
+            parts.append(source[last : match.start()])
+        fallback = match["quoted"] if match["quoted"] is not None else match["bare"] or ""
+        slots.append((len(parts), _FIELD_INDEX[name], fallback))
+        parts.append(fallback)
+        last = match.end()
+    if last < len(source):
+        parts.append(source[last:])
+    return CompiledTemplate(source, parts, slots, html)
+
+
+def address_row(email: str) -> tuple[str | None, ...]:
+    """The row for an address with no contact record: only ``email`` is known."""
+    return tuple(email if name == "email" else None for name in MERGE_FIELDS)
+
+
+def validate_merge_tags(*sources: str | None) -> None:
+    """Raise ``MergeTagError`` if any of ``sources`` has an invalid tag."""
+    for source in sources:
+        if source:
+            compile_template(source)
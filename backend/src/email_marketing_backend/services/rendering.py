@@ -1,5 +1,15 @@
 from __future__ import annotations
 
+import hashlib
+import re
+from dataclasses import dataclass
+from html import escape
+from html.parser import HTMLParser
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..db.models import EmailTemplate
+
 
 def render_html_document(*, html: str, css: str | None = None) -> str:
     """
@@ -17,3 +27,289 @@ def render_html_document(*, html: str, css: str | None = None) -> str:
     head = "<head><meta charset=\"utf-8\"/>" + (f"<style>{style}</style>" if style else "") + "</head>"
     return f"<!doctype html><html>{head}<body>{content}</body></html>"
 
+
+@dataclass(frozen=True)
+class CompiledEmail:
+    """Send-ready output of a template: the final HTML, its text alternative and their hash."""
+
+    html: str
+    text: str
+    content_hash: str
+
+
+def compile_email_template(*, html: str, css: str | None = None) -> CompiledEmail:
+    """
+    Turn a template's stored HTML/CSS into what is actually mailed.
+
+    Rules with simple selectors (``tag``, ``.class``, ``#id`` and compounds of
+    them) are inlined into ``style`` attributes, which is what most mail
+    clients honour; anything else (media queries, pseudo-classes, descendant
+    selectors, ``body``) stays in a ``<style>`` block. The markup is minified
+    and a text/plain alternative is derived from it. Merge tags pass through
+    untouched. Runs when a template is saved, so sends only read the result.
+    """
+    inline_rules, leftover = _split_css(css or "")
+    inliner = _Inliner(inline_rules)
+    inliner.feed((html or "").strip())
+    inliner.close()
+    body = "".join(inliner.out).strip()
+    document = render_html_document(html=body, css=leftover)
+    if leftover and "<html" in body.lower():
+        # render_html_document left the full document as is; the leftover
+        # rules go into its <head>, or a new one if it has none.
+        document = _add_head_style(document, leftover)
+    text = html_to_text(document)
+    digest = hashlib.sha256(document.encode("utf-8") + b"\0" + text.encode("utf-8")).hexdigest()
+    return CompiledEmail(html=document, text=text, content_hash=digest)
+
+
+def _add_head_style(document: str, css: str) -> str:
+    head_end = document.lower().find("</head>")
+    if head_end >= 0:
+        return f"{document[:head_end]}<style>{css}</style>{document[head_end:]}"
+    html_open = _HTML_OPEN.search(document)
+    if html_open is None:
+        return f"<head><style>{css}</style></head>{document}"
+    at = html_open.end()
+    return f"{document[:at]}<head><style>{css}</style></head>{document[at:]}"
+
+
+def compile_into(template: EmailTemplate) -> None:
+    """Recompile a template being saved and store the result on it."""
+    compiled = compile_email_template(html=template.html or "", css=template.css)
+    template.compiled_html = compiled.html
+    template.compiled_text = compiled.text
+    template.content_hash = compiled.content_hash
+
+
+_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+_HTML_OPEN = re.compile(r"<html\b[^>]*>", re.IGNORECASE)
+_SIMPLE_SELECTOR = re.compile(r"^(?P<tag>[a-zA-Z][a-zA-Z0-9]*)?(?P<rest>(?:[#.][\w-]+)*)$")
+_BLOCK_TAGS = frozenset(
+    """
+    address article aside blockquote body center div dl dd dt footer form h1 h2 h3 h4 h5 h6
+    head header hr html li link main meta nav ol p section style table tbody td tfoot th
+    thead title tr ul
+    """.split()
+)
+_VOID_TAGS = frozenset("area base br col embed hr img input link meta source track wbr".split())
+_PRESERVE_TAGS = frozenset(("pre", "textarea", "script", "style"))
+
+
+@dataclass(frozen=True)
+class _Rule:
+    tag: str | None
+    ids: tuple[str, ...]
+    classes: tuple[str, ...]
+    declarations: str
+    specificity: tuple[int, int, int, int]
+
+    def matches(self, tag: str, element_id: str | None, classes: set[str]) -> bool:
+        return (
+            (self.tag is None or self.tag == tag)
+            and all(element_id == value for value in self.ids)
+            and all(value in classes for value in self.classes)
+        )
+
+
+def _split_css(css: str) -> tuple[list[_Rule], str]:
+    """Split a stylesheet into inlinable rules and the CSS that must stay in ``<style>``."""
+    css = _COMMENT.sub("", css)
+    rules: list[_Rule] = []
+    leftover: list[str] = []
+    pos = 0
+    while True:
+        open_at = css.find("{", pos)
+        if open_at < 0:
+            break
+        prelude = css[pos:open_at].strip()
+        depth, close_at = 1, open_at + 1
+        while close_at < len(css) and depth:
+            depth += {"{": 1, "}": -1}.get(css[close_at], 0)
+            close_at += 1
+        block = css[open_at + 1 : close_at - 1].strip()
+        pos = close_at
+        if not prelude:
+            continue
+        if prelude.startswith("@"):
+            leftover.append(f"{prelude}{{{block}}}")
+            continue
+        declarations = ";".join(
+            part.strip() for part in block.split(";") if ":" in part and part.strip()
+        )
+        if not declarations:
+            continue
+        kept = []
+        for selector in (part.strip() for part in prelude.split(",")):
+            rule = _parse_selector(selector, declarations, len(rules))
+            if rule is None:
+                kept.append(selector)
+            else:
+                rules.append(rule)
+        if kept:
+            leftover.append(f"{','.join(kept)}{{{declarations}}}")
+    return rules, "".join(leftover)
+
+
+def _parse_selector(selector: str, declarations: str, order: int) -> _Rule | None:
+    match = _SIMPLE_SELECTOR.match(selector)
+    if not match or not selector or "!important" in declarations:
+        return None
+    tag = (match["tag"] or "").lower() or None
+    if tag in ("html", "body"):
+        return None
+    parts = re.findall(r"[#.][\w-]+", match["rest"])
+    ids = tuple(part[1:] for part in parts if part[0] == "#")
+    classes = tuple(part[1:] for part in parts if part[0] == ".")
+    return _Rule(tag, ids, classes, declarations, (len(ids), len(classes), int(bool(tag)), order))
+
+
+class _Inliner(HTMLParser):
+    """Re-emit HTML minified, with matching rules merged into each element's ``style``."""
+
+    def __init__(self, rules: list[_Rule]) -> None:
+        super().__init__(convert_charrefs=False)
+        self.rules = sorted(rules, key=lambda rule: rule.specificity)
+        self.out: list[str] = []
+        self._preserve = 0
+        self._pending_space = False
+        self._last_tag_block = True
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self._tag(tag, attrs, "/>" if tag in _VOID_TAGS else ">")
+        if tag in _PRESERVE_TAGS:
+            self._preserve += 1
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self._tag(tag, attrs, "/>")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in _VOID_TAGS:
+            return
+        if tag in _PRESERVE_TAGS and self._preserve:
+            self._preserve -= 1
+        self._space_before(tag)
+        self.out.append(f"</{tag}>")
+
+    def handle_data(self, data: str) -> None:
+        if self._preserve:
+            self.out.append(data)
+            return
+        collapsed = re.sub(r"\s+", " ", data)
+        if not collapsed.strip():
+            self._pending_space = bool(collapsed)
+            return
+        if self._pending_space and not collapsed.startswith(" ") and not self._last_tag_block:
+            self.out.append(" ")
+        if collapsed.startswith(" ") and self._last_tag_block:
+            collapsed = collapsed[1:]
+        self._pending_space = collapsed.endswith(" ")
+        self.out.append(collapsed.rstrip(" "))
+        self._last_tag_block = False
+
+    def handle_entityref(self, name: str) -> None:
+        self.handle_data(f"&{name};")
+
+    def handle_charref(self, name: str) -> None:
+        self.handle_data(f"&#{name};")
+
+    def handle_comment(self, data: str) -> None:
+        # Outlook's conditional comments carry markup; everything else goes.
+        if data.startswith("[if") or data.startswith("<![endif"):
+            self.out.append(f"<!--{data}-->")
+
+    def handle_decl(self, decl: str) -> None:
+        self.out.append(f"<!{decl}>")
+
+    def _space_before(self, tag: str) -> None:
+        block = tag in _BLOCK_TAGS
+        if self._pending_space and not block and not self._last_tag_block:
+            self.out.append(" ")
+        self._pending_space = False
+        self._last_tag_block = block
+
+    def _tag(self, tag: str, attrs: list[tuple[str, str | None]], close: str) -> None:
+        self._space_before(tag)
+        values = dict(attrs)
+        classes = set((values.get("class") or "").split())
+        styles = [
+            rule.declarations
+            for rule in self.rules
+            if rule.matches(tag, values.get("id"), classes)
+        ]
+        if styles:
+            if values.get("style"):
+                styles.append(values["style"].strip().rstrip(";"))
+            values["style"] = ";".join(styles)
+        rendered = [tag]
+        for name, value in values.items():
+            if value is None:
+                rendered.append(name)
+            elif '"' in value and "'" not in value:
+                rendered.append(f"{name}='{escape(value, quote=False)}'")
+            else:
+                rendered.append(f'{name}="{escape(value)}"')
+        self.out.append(f"<{' '.join(rendered)}{close}")
+
+
+def html_to_text(html: str) -> str:
+    """A readable text/plain rendering: block breaks, list bullets, link targets."""
+    extractor = _TextExtractor()
+    extractor.feed(html)
+    extractor.close()
+    text = "".join(extractor.out)
+    lines = [re.sub(r"[ \t]+", " ", line).strip() for line in text.split("\n")]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+class _TextExtractor(HTMLParser):
+    _SKIP = frozenset(("head", "style", "script", "title"))
+    _PARAGRAPH = frozenset(("p", "h1", "h2", "h3", "h4", "h5", "h6", "table", "blockquote", "pre"))
+    _LINE = frozenset(("div", "section", "tr", "ul", "ol", "header", "footer", "article"))
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.out: list[str] = []
+        self._skip = 0
+        self._links: list[str | None] = []
+        self._link_start = 0
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag in self._SKIP:
+            self._skip += 1
+        elif tag in self._PARAGRAPH:
+            self.out.append("\n\n")
+        elif tag in self._LINE or tag == "br":
+            self.out.append("\n")
+        elif tag == "li":
+            self.out.append("\n- ")
+        elif tag in ("td", "th"):
+            self.out.append(" ")
+        elif tag == "img":
+            alt = dict(attrs).get("alt")
+            if alt and not self._skip:
+                self.out.append(f" {alt} ")
+        elif tag == "a":
+            href = dict(attrs).get("href") or ""
+            keep = href and not href.startswith(("#", "mailto:", "javascript:"))
+            self._links.append(href if keep else None)
+            self._link_start = len(self.out)
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag not in self._SKIP:
+            self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self._SKIP:
+            self._skip = max(0, self._skip - 1)
+        elif tag in self._PARAGRAPH:
+            self.out.append("\n\n")
+        elif tag == "a" and self._links:
+            href = self._links.pop()
+            label = "".join(self.out[self._link_start :]).strip()
+            if href and href != label:
+                self.out.append(f" ({href})" if label else href)
+
+    def handle_data(self, data: str) -> None:
+        if not self._skip:
+            self.out.append(re.sub(r"\s+", " ", data))
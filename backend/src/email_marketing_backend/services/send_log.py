@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Sequence
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from ..db.models import EmailSend
+from ..extensions import db
+from ..metrics import EMAILS
+from .bulk import bulk_insert
+from .campaign_stats import apply_stats_delta
+
+_COPY_COLUMNS = ("organization_id", "campaign_id", "to_email", "status", "created_at", "updated_at")
+_UPDATE_CHUNK = 1000
+
+
+class EmailSendWriter:
+    """
+    Buffered writer for ``email_sends`` rows of one campaign.
+
+    ``queue`` inserts the queued rows for a chunk of recipients in a single
+    statement (COPY on Postgres, executemany elsewhere) and commits them before
+    anything is sent, so every attempt is on record. ``record`` buffers status
+    transitions, which are written as bulk UPDATEs whenever ``flush_size``
+    transitions are pending or ``flush_seconds`` have elapsed; a crash loses at
+    most that window of transitions, never the queued rows themselves.
+
+    Transitions only apply to rows still in ``from_status``; the retry queue
+    uses ``from_status="deferred"`` to settle recipients it re-attempts. Every
+    write also moves the campaign's ``campaign_stats`` counters in the same
+    transaction.
+    """
+
+    def __init__(
+        self,
+        *,
+        organization_id: int,
+        campaign_id: int,
+        session: Session | None = None,
+        flush_size: int = 200,
+        flush_seconds: float = 5.0,
+        from_status: str = "queued",
+    ) -> None:
+        self.organization_id = organization_id
+        self.campaign_id = campaign_id
+        self.session = session or db.session
+        self.flush_size = max(1, flush_size)
+        self.flush_seconds = flush_seconds
+        self.from_status = from_status
+        self._pending: list[tuple[str, str, str | None]] = []
+        self._last_flush = time.monotonic()
+
+    def __enter__(self) -> "EmailSendWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.flush()
+
+    def queue(self, emails: Sequence[str], *, skip_sent: bool = False) -> list[str]:
+        """
+        Record ``emails`` as queued and return the ones that should be sent.
+
+        With ``skip_sent`` (resumed or re-sent batches) recipients that already
+        have a ``sent`` row are dropped, and existing rows for the rest are
+        re-queued instead of duplicated.
+        """
+        if not emails:
+            return []
+        now = datetime.now(tz=timezone.utc)
+        to_send = list(emails)
+        to_insert = to_send
+        delta: Counter[str] = Counter()
+        if skip_sent:
+            table = EmailSend.__table__
+            existing: dict[str, str] = {}
+            for to_email, status in self.session.execute(
+                select(table.c.to_email, table.c.status).where(
+                    table.c.campaign_id == self.campaign_id, table.c.to_email.in_(set(emails))
+                )
+            ):
+                if existing.get(to_email) != "sent":
+                    existing[to_email] = status
+            to_send = [email for email in emails if existing.get(email) != "sent"]
+            requeue = [email for email in to_send if email in existing]
+            to_insert = [email for email in to_send if email not in existing]
+            for email in requeue:
+                delta[existing[email]] -= 1
+            if requeue:
+                self.session.execute(
+                    update(table)
+                    .where(
+                        table.c.campaign_id == self.campaign_id,
+                        table.c.status != "sent",
+                        table.c.to_email.in_(requeue),
+                    )
+                    .values(status="queued", error=None, updated_at=now)
+                )
+        delta["queued"] += len(to_send)
+        rows = [
+            (self.organization_id, self.campaign_id, email, "queued", now, now)
+            for email in to_insert
+        ]
+        if rows:
+            bulk_insert(self.session, EmailSend.__table__, _COPY_COLUMNS, rows)
+        apply_stats_delta(self.session, self.campaign_id, delta)
+        self.session.commit()
+        return to_send
+
+    def record(self, to_email: str, status: str, error: str | None = None) -> None:
+        self._pending.append((to_email, status, error))
+        if (
+            len(self._pending) >= self.flush_size
+            or time.monotonic() - self._last_flush >= self.flush_seconds
+        ):
+            self.flush()
+
+    def flush(self, *, commit: bool = True) -> None:
+        """Write buffered transitions; ``commit=False`` lets a caller add a checkpoint."""
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+
+        # Most transitions share (status, error) -- typically ("sent", None) --
+        # so each group becomes one UPDATE ... WHERE to_email IN (...).
+        groups: dict[tuple[str, str | None], list[str]] = defaultdict(list)
+        for to_email, status, error in pending:
+            groups[(status, error)].append(to_email)
+
+        now = datetime.now(tz=timezone.utc)
+        table = EmailSend.__table__
+        delta: Counter[str] = Counter()
+        for (status, error), emails in groups.items():
+            for start in range(0, len(emails), _UPDATE_CHUNK):
+                result = self.session.execute(
+                    update(table)
+                    .where(
+                        table.c.campaign_id == self.campaign_id,
+                        table.c.status == self.from_status,
+                        table.c.to_email.in_(emails[start : start + _UPDATE_CHUNK]),
+                    )
+                    .values(status=status, error=error, updated_at=now)
+                )
+                delta[self.from_status] -= result.rowcount
+                delta[status] += result.rowcount
+                EMAILS.labels(status).inc(result.rowcount)
+        apply_stats_delta(self.session, self.campaign_id, delta)
+        if commit:
+            self.session.commit()
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import logging
+import smtplib
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from email.message import EmailMessage
+from typing import Iterator, Sequence
+
+from ..metrics import SMTP_CONNECT_SECONDS, SMTP_SEND_SECONDS
+from ..tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+def is_reconnect_error(exc: BaseException) -> bool:
+    """True when the session can no longer be trusted and must be replaced."""
+    if isinstance(exc, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return exc.smtp_code == 421
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return any(code == 421 for code, _ in exc.recipients.values())
+    if isinstance(exc, smtplib.SMTPException):
+        return False
+    # Socket-level failures: resets, timeouts, broken pipes.
+    return isinstance(exc, OSError)
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """
+    True for failures worth retrying later: 4xx replies, dropped sessions,
+    timeouts and connection resets. 5xx replies are permanent.
+    """
+    code = smtp_reply_code(exc)
+    if code is not None:
+        return 400 <= code < 500
+    if isinstance(exc, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(exc, smtplib.SMTPException):
+        return False
+    return isinstance(exc, OSError)
+
+
+def smtp_reply_code(exc: BaseException) -> int | None:
+    """The SMTP reply code carried by an smtplib error, if any."""
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return exc.smtp_code
+    if isinstance(exc, smtplib.SMTPRecipientsRefused) and exc.recipients:
+        return min(code for code, _ in exc.recipients.values())
+    return None
+
+
+def recipient_outcomes(
+    recipients: Sequence[str],
+    refused: dict[str, tuple[int, bytes]] | None,
+    error: BaseException | None,
+) -> list[tuple[str, BaseException | None]]:
+    """
+    Split the result of one (possibly multi-RCPT) transaction per recipient.
+
+    Addresses refused at RCPT get their own ``SMTPRecipientsRefused`` carrying
+    their reply code; a transaction-level failure applies to every address.
+    ``SMTPRecipientsRefused`` means no DATA was sent, so addresses it does not
+    list (a 421 cut the RCPT sequence short) failed with it too.
+    """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        refused = error.recipients
+    refused = refused or {}
+    outcomes: list[tuple[str, BaseException | None]] = []
+    for addr in recipients:
+        if addr in refused:
+            outcomes.append((addr, smtplib.SMTPRecipientsRefused({addr: refused[addr]})))
+        elif error is not None:
+            outcomes.append((addr, error))
+        else:
+            outcomes.append((addr, None))
+    return outcomes
+
+
+@dataclass
+class PooledConnection:
+    client: smtplib.SMTP
+    messages_sent: int = 0
+    created_at: float = field(default_factory=time.monotonic)
+    last_used_at: float = field(default_factory=time.monotonic)
+    needs_reset: bool = False
+
+
+class SMTPConnectionPool:
+    """
+    Process-local pool of authenticated SMTP sessions.
+
+    Sessions are kept open across messages so a campaign pays the TCP, STARTTLS
+    and AUTH handshake once per connection instead of once per recipient.
+    Idle sessions are probed with NOOP before reuse, sessions that saw an error
+    are RSET before going back to the pool, and a session is retired after
+    ``max_messages_per_connection`` deliveries. A 421 reply or a dropped socket
+    discards the session and the send is retried once on a fresh one.
+    """
+
+    def __init__(
+        self,
+        *,
+        host: str,
+        port: int,
+        username: str | None = None,
+        password: str | None = None,
+        use_tls: bool = False,
+        timeout: float = 15,
+        max_idle: int = 4,
+        max_messages_per_connection: int = 100,
+        health_check_after: float = 30,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_messages_per_connection = max_messages_per_connection
+        self.health_check_after = health_check_after
+        self._idle: deque[PooledConnection] = deque()
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def _open(self) -> PooledConnection:
+        started = time.perf_counter()
+        # Pooled sessions outlive the batch that opened them, so only the
+        # handshake is traced.
+        with span("smtp.connect", host=self.host, port=self.port):
+            client = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            try:
+                client.ehlo_or_helo_if_needed()
+                if self.use_tls:
+                    client.starttls()
+                    client.ehlo()
+                if self.username and self.password:
+                    client.login(self.username, self.password)
+            except BaseException:
+                _close_quietly(client)
+                raise
+        SMTP_CONNECT_SECONDS.observe(time.perf_counter() - started)
+        self.connections_opened += 1
+        return PooledConnection(client=client)
+
+    def _is_healthy(self, conn: PooledConnection) -> bool:
+        try:
+            if conn.needs_reset:
+                code, _ = conn.client.rset()
+                conn.needs_reset = False
+                return code == 250
+            if time.monotonic() - conn.last_used_at >= self.health_check_after:
+                code, _ = conn.client.noop()
+                return code == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+        return True
+
+    def _acquire(self) -> PooledConnection:
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                return self._open()
+            if self._is_healthy(conn):
+                return conn
+            _close_quietly(conn.client)
+
+    def _release(self, conn: PooledConnection, *, broken: bool = False) -> None:
+        conn.last_used_at = time.monotonic()
+        if broken:
+            _close_quietly(conn.client)
+            return
+        if conn.messages_sent >= self.max_messages_per_connection:
+            _quit_quietly(conn.client)
+            return
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        _quit_quietly(conn.client)
+
+    @contextmanager
+    def connection(self) -> Iterator[PooledConnection]:
+        conn = self._acquire()
+        try:
+            yield conn
+        except BaseException as exc:
+            if is_reconnect_error(exc):
+                self._release(conn, broken=True)
+            else:
+                conn.needs_reset = True
+                self._release(conn)
+            raise
+        else:
+            self._release(conn)
+
+    def sendmail(
+        self, from_addr: str, to_addrs: Sequence[str], msg: bytes | str
+    ) -> dict[str, tuple[int, bytes]]:
+        """Send raw message bytes, returning smtplib's refused-recipient map."""
+        for attempt in (1, 2):
+            try:
+                with self.connection() as conn:
+                    started = time.perf_counter()
+                    refused = conn.client.sendmail(from_addr, list(to_addrs), msg)
+                    SMTP_SEND_SECONDS.observe(time.perf_counter() - started)
+                    conn.messages_sent += 1
+                    return refused
+            except BaseException as exc:
+                if attempt == 1 and is_reconnect_error(exc):
+                    logger.info("SMTP session to %s:%s dropped; reconnecting", self.host, self.port)
+                    continue
+                raise
+        raise AssertionError("unreachable")
+
+    def send_message(self, msg: EmailMessage) -> dict[str, tuple[int, bytes]]:
+        from_addr = msg["From"]
+        to_addrs = [addr.strip() for addr in str(msg["To"]).split(",") if addr.strip()]
+        return self.sendmail(from_addr, to_addrs, msg.as_bytes())
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for conn in idle:
+            _quit_quietly(conn.client)
+
+    @property
+    def idle_count(self) -> int:
+        return len(self._idle)
+
+
+def _quit_quietly(client: smtplib.SMTP) -> None:
+    try:
+        client.quit()
+    except (smtplib.SMTPException, OSError):
+        _close_quietly(client)
+
+
+def _close_quietly(client: smtplib.SMTP) -> None:
+    try:
+        client.close()
+    except OSError:
+        pass
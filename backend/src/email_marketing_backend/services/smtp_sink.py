@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from dataclasses import dataclass, field
+from typing import Callable
+
+
+@dataclass
+class ReceivedMessage:
+    mail_from: str
+    rcpt_tos: list[str]
+    data: bytes
+
+
+@dataclass
+class SMTPSink:
+    """
+    Minimal in-process SMTP server for tests and benchmarks.
+
+    Runs an asyncio server on a background thread and speaks just enough SMTP
+    (EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT) for smtplib and the async
+    dispatcher. Messages are kept in memory unless ``record`` is disabled.
+    """
+
+    host: str = "127.0.0.1"
+    port: int = 0
+    record: bool = True
+    rcpt_handler: Callable[[str], tuple[int, str] | None] | None = None
+    data_handler: Callable[[list[str]], tuple[int, str] | None] | None = None
+    drop_after_messages: int | None = None
+
+    messages: list[ReceivedMessage] = field(default_factory=list)
+    message_count: int = 0
+    connection_count: int = 0
+    command_counts: dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._server: asyncio.AbstractServer | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._sessions: set[asyncio.Task] = set()
+
+    def start(self) -> "SMTPSink":
+        ready = threading.Event()
+
+        def run() -> None:
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            self._loop = loop
+            self._server = loop.run_until_complete(
+                asyncio.start_server(self._handle, self.host, self.port)
+            )
+            self.port = self._server.sockets[0].getsockname()[1]
+            ready.set()
+            loop.run_forever()
+            self._server.close()
+            for task in list(self._sessions):
+                task.cancel()
+            loop.run_until_complete(
+                asyncio.gather(*self._sessions, return_exceptions=True)
+            )
+            loop.run_until_complete(self._server.wait_closed())
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name="smtp-sink", daemon=True)
+        self._thread.start()
+        ready.wait(timeout=5)
+        return self
+
+    def stop(self) -> None:
+        if self._loop and self._thread:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+        self._loop = None
+        self._thread = None
+
+    def __enter__(self) -> "SMTPSink":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _count(self, verb: str) -> None:
+        with self._lock:
+            self.command_counts[verb] = self.command_counts.get(verb, 0) + 1
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._sessions.add(task)
+        with self._lock:
+            self.connection_count += 1
+        delivered_on_connection = 0
+        mail_from: str | None = None
+        rcpt_tos: list[str] = []
+
+        async def reply(line: str) -> None:
+            writer.write(line.encode("ascii") + b"\r\n")
+            await writer.drain()
+
+        try:
+            await reply("220 smtp-sink ready")
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                line = raw.decode("utf-8", "replace").rstrip("\r\n")
+                verb, _, arg = line.partition(" ")
+                verb = verb.upper()
+                self._count(verb)
+
+                if verb in ("EHLO", "HELO"):
+                    if verb == "EHLO":
+                        await reply("250-smtp-sink")
+                        await reply("250-8BITMIME")
+                        await reply("250 PIPELINING")
+                    else:
+                        await reply("250 smtp-sink")
+                elif verb == "MAIL":
+                    mail_from = _extract_address(arg)
+                    rcpt_tos = []
+                    await reply("250 OK")
+                elif verb == "RCPT":
+                    address = _extract_address(arg)
+                    verdict = self.rcpt_handler(address) if self.rcpt_handler else None
+                    if verdict:
+                        await reply(f"{verdict[0]} {verdict[1]}")
+                    else:
+                        rcpt_tos.append(address)
+                        await reply("250 OK")
+                elif verb == "DATA":
+                    if not rcpt_tos:
+                        await reply("554 No valid recipients")
+                        continue
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    chunks: list[bytes] = []
+                    while True:
+                        chunk = await reader.readline()
+                        if not chunk or chunk in (b".\r\n", b".\n"):
+                            break
+                        if chunk.startswith(b".."):
+                            chunk = chunk[1:]
+                        chunks.append(chunk)
+                    verdict = self.data_handler(rcpt_tos) if self.data_handler else None
+                    if verdict:
+                        await reply(f"{verdict[0]} {verdict[1]}")
+                        if verdict[0] == 421:
+                            break
+                        continue
+                    with self._lock:
+                        self.message_count += 1
+                        if self.record:
+                            self.messages.append(
+                                ReceivedMessage(
+                                    mail_from=mail_from or "",
+                                    rcpt_tos=list(rcpt_tos),
+                                    data=b"".join(chunks),
+                                )
+                            )
+                    delivered_on_connection += 1
+                    await reply("250 OK queued")
+                    mail_from, rcpt_tos = None, []
+                    if (
+                        self.drop_after_messages is not None
+                        and delivered_on_connection >= self.drop_after_messages
+                    ):
+                        break
+                elif verb == "RSET":
+                    mail_from, rcpt_tos = None, []
+                    await reply("250 OK")
+                elif verb == "NOOP":
+                    await reply("250 OK")
+                elif verb == "QUIT":
+                    await reply("221 Bye")
+                    break
+                else:
+                    await reply("502 Command not implemented")
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+            self._sessions.discard(task)
+
+
+def _extract_address(arg: str) -> str:
+    start, end = arg.find("<"), arg.find(">")
+    if start != -1 and end > start:
+        return arg[start + 1 : end]
+    return arg.split(":", 1)[-1].strip()
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import select
+
+from ..db.models import EmailTemplate
+from ..extensions import db
+from ..metrics import (
+    TEMPLATE_CACHE_EVICTIONS,
+    TEMPLATE_CACHE_HITS,
+    TEMPLATE_CACHE_MISSES,
+    TEMPLATE_CACHE_SHARED_HITS,
+)
+from .rendering import CompiledEmail, compile_email_template
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RenderedTemplate:
+    """What a send needs from a template, detached from the ORM row."""
+
+    template_id: int
+    version: str
+    subject: str | None
+    html: str
+    text: str
+    content_hash: str
+
+    @property
+    def size(self) -> int:
+        # Characters rather than encoded bytes: cheap, and close enough for a budget.
+        return len(self.html) + len(self.text) + len(self.subject or "")
+
+
+def template_version(updated_at: datetime) -> str:
+    return updated_at.isoformat()
+
+
+class RedisTemplateStore:
+    """Shared second tier, so a template rendered by one worker is reused by all."""
+
+    def __init__(self, client, ttl_seconds: int) -> None:
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _key(template_id: int, version: str) -> str:
+        return f"template-render:{template_id}:{version}"
+
+    def get(self, template_id: int, version: str) -> RenderedTemplate | None:
+        raw = self.client.get(self._key(template_id, version))
+        return RenderedTemplate(**json.loads(raw)) if raw else None
+
+    def set(self, rendered: RenderedTemplate) -> None:
+        self.client.set(
+            self._key(rendered.template_id, rendered.version),
+            json.dumps(asdict(rendered)),
+            ex=self.ttl_seconds,
+        )
+
+
+class TemplateCache:
+    """
+    Bounded LRU of rendered templates keyed by ``(template_id, version)``.
+
+    The version is the row's ``updated_at``, so saving a template makes its
+    old entries unreachable and they age out; nothing has to be invalidated.
+    Entries are evicted least-recently-used first once their total size
+    exceeds ``max_bytes``. An optional shared store is consulted on a local
+    miss and filled on a load; its errors are logged, never raised, since a
+    cache must not fail a send.
+    """
+
+    def __init__(self, max_bytes: int, shared: RedisTemplateStore | None = None) -> None:
+        self.max_bytes = max_bytes
+        self.shared = shared
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[int, str], RenderedTemplate] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, template_id: int, version: str) -> RenderedTemplate | None:
+        key = (template_id, version)
+        with self._lock:
+            rendered = self._entries.get(key)
+            if rendered is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                TEMPLATE_CACHE_HITS.inc()
+                return rendered
+        if self.shared is not None:
+            try:
+                rendered = self.shared.get(template_id, version)
+            except Exception:
+                logger.warning("Shared template cache read failed", exc_info=True)
+            if rendered is not None:
+                self._store(rendered)
+                with self._lock:
+                    self.shared_hits += 1
+                TEMPLATE_CACHE_SHARED_HITS.inc()
+                return rendered
+        with self._lock:
+            self.misses += 1
+        TEMPLATE_CACHE_MISSES.inc()
+        return None
+
+    def put(self, rendered: RenderedTemplate) -> None:
+        self._store(rendered)
+        if self.shared is not None:
+            try:
+                self.shared.set(rendered)
+            except Exception:
+                logger.warning("Shared template cache write failed", exc_info=True)
+
+    def _store(self, rendered: RenderedTemplate) -> None:
+        if rendered.size > self.max_bytes:
+            return
+        key = (rendered.template_id, rendered.version)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[key] = rendered
+            self._bytes += rendered.size
+            while self._bytes > self.max_bytes:
+                _key, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+                TEMPLATE_CACHE_EVICTIONS.inc()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_cache_lock = threading.Lock()
+_cache: TemplateCache | None = None
+_cache_key: tuple | None = None
+
+
+def get_template_cache() -> TemplateCache:
+    """The process's cache; rebuilt after a fork or a settings change, like the SMTP pool."""
+    global _cache, _cache_key
+    config = current_app.config
+    key = (
+        os.getpid(),
+        int(config.get("TEMPLATE_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+        bool(config.get("TEMPLATE_CACHE_REDIS", False)),
+        config.get("REDIS_URL", "redis://redis:6379/0"),
+        int(config.get("TEMPLATE_CACHE_REDIS_TTL", 86400)),
+    )
+    with _cache_lock:
+        if _cache is None or _cache_key != key:
+            shared = None
+            if key[2]:
+                import redis
+
+                shared = RedisTemplateStore(redis.Redis.from_url(key[3]), key[4])
+            _cache, _cache_key = TemplateCache(key[1], shared), key
+        return _cache
+
+
+def get_rendered_template(template_id: int, version: str | None = None) -> RenderedTemplate | None:
+    """
+    Return a template's send-ready output, reading the row only on a cache miss.
+
+    With ``version`` (as handed from a campaign's dispatch to its batches) a
+    hit costs no query at all; without it only ``updated_at`` is selected to
+    find the current version. A miss loads just the columns a send needs --
+    never ``project_data`` or the eager-loaded relationships.
+    """
+    if version is None:
+        updated_at = db.session.scalar(
+            select(EmailTemplate.updated_at).where(EmailTemplate.id == template_id)
+        )
+        if updated_at is None:
+            return None
+        version = template_version(updated_at)
+
+    cache = get_template_cache()
+    rendered = cache.get(template_id, version)
+    if rendered is not None:
+        return rendered
+
+    row = db.session.execute(
+        select(
+            EmailTemplate.updated_at,
+            EmailTemplate.subject,
+            EmailTemplate.html,
+            EmailTemplate.css,
+            EmailTemplate.compiled_html,
+            EmailTemplate.compiled_text,
+            EmailTemplate.content_hash,
+        ).where(EmailTemplate.id == template_id)
+    ).first()
+    if row is None:
+        return None
+    if row.compiled_html is None:
+        compiled = compile_email_template(html=row.html or "", css=row.css)
+    else:
+        compiled = CompiledEmail(row.compiled_html, row.compiled_text or "", row.content_hash or "")
+    # If the template was saved since ``version`` was taken, the row is the
+    # newer version; cache it under its own key.
+    rendered = RenderedTemplate(
+        template_id=template_id,
+        version=template_version(row.updated_at),
+        subject=row.subject,
+        html=compiled.html,
+        text=compiled.text,
+        content_hash=compiled.content_hash,
+    )
+    cache.put(rendered)
+    return rendered
@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+from flask import current_app
+
+from .smtp_pool import smtp_reply_code
+
+logger = logging.getLogger(__name__)
+
+BUCKET_TTL_SECONDS = 3600
+
+
+@dataclass(frozen=True)
+class BucketSpec:
+    key: str
+    factor_key: str
+    rate: float
+    burst: float
+
+
+# Refill-and-take across several buckets atomically: tokens are only consumed
+# when every bucket has one, otherwise the longest wait is returned. Domain
+# buckets scale their rate by an adaptive factor that recovers linearly after a
+# deferral. Redis TIME keeps the clock consistent across workers.
+_TAKE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local n = tonumber(ARGV[1])
+local recovery = tonumber(ARGV[2 + 2 * n])
+local state = {}
+local wait = 0
+for i = 1, n do
+  local rate = tonumber(ARGV[2 * i])
+  local burst = tonumber(ARGV[2 * i + 1])
+  local factor = 1
+  local f = redis.call('HMGET', KEYS[n + i], 'factor', 'ts')
+  if f[1] then
+    factor = math.min(1, tonumber(f[1]) + (now - tonumber(f[2])) / recovery)
+  end
+  local effective = rate * factor
+  local b = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+  local tokens = tonumber(b[1]) or burst
+  local ts = tonumber(b[2]) or now
+  tokens = math.min(burst, tokens + math.max(0, now - ts) * effective)
+  state[i] = tokens
+  if tokens < 1 then
+    wait = math.max(wait, (1 - tokens) / effective)
+  end
+end
+for i = 1, n do
+  local tokens = state[i]
+  if wait == 0 then
+    tokens = tokens - 1
+  end
+  redis.call('HSET', KEYS[i], 'tokens', tostring(tokens), 'ts', tostring(now))
+  redis.call('EXPIRE', KEYS[i], tonumber(ARGV[3 + 2 * n]))
+end
+return tostring(wait)
+"""
+
+_PENALIZE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local backoff = tonumber(ARGV[1])
+local floor = tonumber(ARGV[2])
+local recovery = tonumber(ARGV[3])
+local current = 1
+local f = redis.call('HMGET', KEYS[1], 'factor', 'ts')
+if f[1] then
+  current = math.min(1, tonumber(f[1]) + (now - tonumber(f[2])) / recovery)
+end
+local factor = math.max(floor, current * backoff)
+redis.call('HSET', KEYS[1], 'factor', tostring(factor), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(recovery))
+return tostring(factor)
+"""
+
+
+class MemoryThrottleStore:
+    """Single-process bucket store with the same semantics as the Redis scripts."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self.clock = clock
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._factors: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def _factor(self, key: str, now: float, recovery: float) -> float:
+        if key not in self._factors:
+            return 1.0
+        factor, ts = self._factors[key]
+        return min(1.0, factor + (now - ts) / recovery)
+
+    def take(self, buckets: list[BucketSpec], recovery: float) -> float:
+        with self._lock:
+            now = self.clock()
+            state: list[float] = []
+            wait = 0.0
+            for spec in buckets:
+                effective = spec.rate * self._factor(spec.factor_key, now, recovery)
+                tokens, ts = self._buckets.get(spec.key, (spec.burst, now))
+                tokens = min(spec.burst, tokens + max(0.0, now - ts) * effective)
+                state.append(tokens)
+                if tokens < 1:
+                    wait = max(wait, (1 - tokens) / effective)
+            for spec, tokens in zip(buckets, state):
+                self._buckets[spec.key] = (tokens - 1 if wait == 0 else tokens, now)
+            return wait
+
+    def penalize(self, factor_key: str, backoff: float, floor: float, recovery: float) -> float:
+        with self._lock:
+            now = self.clock()
+            factor = max(floor, self._factor(factor_key, now, recovery) * backoff)
+            self._factors[factor_key] = (factor, now)
+            return factor
+
+
+class RedisThrottleStore:
+    """Bucket store shared by every worker through Redis Lua scripts."""
+
+    def __init__(self, client) -> None:
+        self.client = client
+        self._take = client.register_script(_TAKE_SCRIPT)
+        self._penalize = client.register_script(_PENALIZE_SCRIPT)
+
+    def take(self, buckets: list[BucketSpec], recovery: float) -> float:
+        keys = [spec.key for spec in buckets] + [spec.factor_key for spec in buckets]
+        args: list[float | int] = [len(buckets)]
+        for spec in buckets:
+            args.extend((spec.rate, spec.burst))
+        args.extend((recovery, BUCKET_TTL_SECONDS))
+        return float(self._take(keys=keys, args=args))
+
+    def penalize(self, factor_key: str, backoff: float, floor: float, recovery: float) -> float:
+        return float(self._penalize(keys=[factor_key], args=[backoff, floor, recovery]))
+
+
+class SendThrottle:
+    """
+    Token buckets per sending identity and per recipient domain.
+
+    A message may go out once both its account bucket and its domain bucket
+    hold a token. Deferrals (4xx replies) from a domain cut that domain's rate
+    by ``backoff_factor``; the rate then climbs back linearly to its configured
+    value over ``recovery_seconds`` unless further deferrals arrive. A rate of
+    0 disables the corresponding bucket.
+    """
+
+    def __init__(
+        self,
+        store: MemoryThrottleStore | RedisThrottleStore,
+        *,
+        account_rate: float = 0,
+        account_burst: float | None = None,
+        domain_rate: float = 0,
+        domain_burst: float | None = None,
+        domain_rates: dict[str, float] | None = None,
+        backoff_factor: float = 0.5,
+        min_factor: float = 0.05,
+        recovery_seconds: float = 300,
+    ) -> None:
+        self.store = store
+        self.account_rate = account_rate
+        self.account_burst = account_burst
+        self.domain_rate = domain_rate
+        self.domain_burst = domain_burst
+        self.domain_rates = {key.lower(): value for key, value in (domain_rates or {}).items()}
+        self.backoff_factor = backoff_factor
+        self.min_factor = min_factor
+        self.recovery_seconds = max(recovery_seconds, 1)
+        self._last_store_error = 0.0
+
+    def _buckets(self, account: str, domain: str) -> list[BucketSpec]:
+        domain = domain.lower()
+        buckets: list[BucketSpec] = []
+        if self.account_rate > 0:
+            buckets.append(
+                BucketSpec(
+                    key=f"throttle:bucket:account:{account}",
+                    factor_key=f"throttle:factor:account:{account}",
+                    rate=self.account_rate,
+                    burst=max(1.0, self.account_burst or self.account_rate),
+                )
+            )
+        rate = self.domain_rates.get(domain, self.domain_rate)
+        if rate > 0:
+            buckets.append(
+                BucketSpec(
+                    key=f"throttle:bucket:domain:{account}:{domain}",
+                    factor_key=f"throttle:factor:domain:{domain}",
+                    rate=rate,
+                    burst=max(1.0, self.domain_burst or rate),
+                )
+            )
+        return buckets
+
+    def reserve(self, account: str, domain: str) -> float:
+        """Take a token if one is available; otherwise return seconds to wait."""
+        buckets = self._buckets(account, domain)
+        if not buckets:
+            return 0.0
+        try:
+            return self.store.take(buckets, self.recovery_seconds)
+        except Exception:  # fail open: a throttle outage must not stop sending
+            self._log_store_error()
+            return 0.0
+
+    def acquire(self, account: str, domain: str) -> float:
+        waited = 0.0
+        while (wait := self.reserve(account, domain)) > 0:
+            time.sleep(wait)
+            waited += wait
+        return waited
+
+    async def acquire_async(self, account: str, domain: str) -> float:
+        # ``reserve`` may be a Redis round trip; keep it off the event loop.
+        waited = 0.0
+        while (wait := await asyncio.to_thread(self.reserve, account, domain)) > 0:
+            await asyncio.sleep(wait)
+            waited += wait
+        return waited
+
+    def penalize(self, domain: str) -> float:
+        """Record a deferral from ``domain`` and return its new rate factor."""
+        try:
+            return self.store.penalize(
+                f"throttle:factor:domain:{domain.lower()}",
+                self.backoff_factor,
+                self.min_factor,
+                self.recovery_seconds,
+            )
+        except Exception:
+            self._log_store_error()
+            return 1.0
+
+    def penalize_deferrals(self, outcomes: Iterable[tuple[str, BaseException | None]]) -> None:
+        """
+        Penalize each domain that deferred any recipient of one transaction, once.
+
+        A 4xx to the transaction itself is reported for every recipient in it;
+        counting it per recipient would cut the domain's rate once per address.
+        """
+        domains = {
+            recipient_domain(to_email)
+            for to_email, error in outcomes
+            if error is not None and 400 <= (smtp_reply_code(error) or 0) < 500
+        }
+        for domain in domains:
+            self.penalize(domain)
+
+    def _log_store_error(self) -> None:
+        now = time.monotonic()
+        if now - self._last_store_error > 60:
+            logger.warning("Send throttle store unavailable; sending unthrottled", exc_info=True)
+            self._last_store_error = now
+
+
+def recipient_domain(email: str) -> str:
+    return email.rpartition("@")[2].lower()
+
+
+def parse_domain_rates(value: str | None) -> dict[str, float]:
+    """Parse ``"gmail.com=20,outlook.com=10"`` into a domain -> rate map."""
+    rates: dict[str, float] = {}
+    for part in (value or "").split(","):
+        domain, _, rate = part.partition("=")
+        if domain.strip() and rate.strip():
+            rates[domain.strip().lower()] = float(rate)
+    return rates
+
+
+_store_lock = threading.Lock()
+_stores: dict[tuple, MemoryThrottleStore | RedisThrottleStore] = {}
+
+
+def _get_store(backend: str, redis_url: str) -> MemoryThrottleStore | RedisThrottleStore:
+    key = (os.getpid(), backend, redis_url)
+    with _store_lock:
+        if key not in _stores:
+            if backend == "redis":
+                import redis
+
+                _stores[key] = RedisThrottleStore(redis.Redis.from_url(redis_url))
+            else:
+                _stores[key] = MemoryThrottleStore()
+        return _stores[key]
+
+
+def get_send_throttle() -> SendThrottle | None:
+    config = current_app.config
+    if not config.get("THROTTLE_ENABLED", False):
+        return None
+    store = _get_store(
+        config.get("THROTTLE_BACKEND", "redis"),
+        config.get("REDIS_URL", "redis://redis:6379/0"),
+    )
+    return SendThrottle(
+        store,
+        account_rate=float(config.get("THROTTLE_ACCOUNT_RATE", 0)),
+        account_burst=config.get("THROTTLE_ACCOUNT_BURST"),
+        domain_rate=float(config.get("THROTTLE_DOMAIN_RATE", 0)),
+        domain_burst=config.get("THROTTLE_DOMAIN_BURST"),
+        domain_rates=parse_domain_rates(config.get("THROTTLE_DOMAIN_RATES")),
+        backoff_factor=float(config.get("THROTTLE_BACKOFF_FACTOR", 0.5)),
+        recovery_seconds=float(config.get("THROTTLE_RECOVERY_SECONDS", 300)),
+    )
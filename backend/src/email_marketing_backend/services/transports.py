@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import os
+import smtplib
+import socket
+import threading
+import time
+from itertools import count
+from typing import Protocol, Sequence
+
+from ..metrics import SMTP_CONNECT_SECONDS, SMTP_SEND_SECONDS
+from ..tracing import span
+
+Refused = dict[str, tuple[int, bytes]]
+
+
+class MailTransport(Protocol):
+    """
+    Delivers one prepared message to a list of envelope recipients.
+
+    ``sendmail`` mirrors ``smtplib.SMTP.sendmail``: it returns the recipients
+    refused at RCPT and raises ``smtplib`` exceptions for transaction-level
+    failures, so retry classification works the same for every backend.
+    """
+
+    def sendmail(self, from_addr: str, to_addrs: Sequence[str], message: bytes) -> Refused: ...
+
+    def close(self) -> None: ...
+
+
+class SMTPTransport:
+    """One SMTP session per message; the baseline the pool is measured against."""
+
+    def __init__(
+        self,
+        *,
+        host: str,
+        port: int,
+        username: str | None = None,
+        password: str | None = None,
+        use_tls: bool = False,
+        timeout: float = 15,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+
+    def sendmail(self, from_addr: str, to_addrs: Sequence[str], message: bytes) -> Refused:
+        started = time.perf_counter()
+        with (
+            span("smtp.session", host=self.host, port=self.port, recipients=len(to_addrs)),
+            smtplib.SMTP(self.host, self.port, timeout=self.timeout) as client,
+        ):
+            if self.use_tls:
+                client.starttls()
+                client.ehlo()
+            if self.username and self.password:
+                client.login(self.username, self.password)
+            connected = time.perf_counter()
+            SMTP_CONNECT_SECONDS.observe(connected - started)
+            refused = client.sendmail(from_addr, list(to_addrs), message)
+            SMTP_SEND_SECONDS.observe(time.perf_counter() - connected)
+            return refused
+
+    def close(self) -> None:
+        pass
+
+
+class MaildirTransport:
+    """
+    Spool messages into a Maildir instead of relaying them.
+
+    Each message is written to ``tmp/`` and renamed into ``new/`` so readers
+    never see partial files. The envelope is kept in ``X-Envelope-From`` and
+    ``X-Envelope-To`` headers prepended to the message.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        for sub in ("tmp", "new", "cur"):
+            os.makedirs(os.path.join(path, sub), exist_ok=True)
+        self._seq = count()
+        self._host = socket.gethostname().replace("/", "_").replace(":", "_")
+
+    def sendmail(self, from_addr: str, to_addrs: Sequence[str], message: bytes) -> Refused:
+        name = f"{time.time():.6f}.P{os.getpid()}Q{next(self._seq)}.{self._host}"
+        envelope = (
+            f"X-Envelope-From: <{from_addr}>\r\n"
+            f"X-Envelope-To: {', '.join(f'<{addr}>' for addr in to_addrs)}\r\n"
+        ).encode("utf-8")
+        tmp_path = os.path.join(self.path, "tmp", name)
+        with open(tmp_path, "wb") as handle:
+            handle.write(envelope)
+            handle.write(message)
+        os.rename(tmp_path, os.path.join(self.path, "new", name))
+        return {}
+
+    def close(self) -> None:
+        pass
+
+
+class NullTransport:
+    """
+    Accept every message without sending anything, counting what it saw.
+
+    Lets the rendering, persistence and task pipeline be benchmarked (and
+    regression-tested) on its own, with no relay in the way.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.messages = 0
+        self.recipients = 0
+        self.bytes = 0
+
+    def sendmail(self, from_addr: str, to_addrs: Sequence[str], message: bytes) -> Refused:
+        with self._lock:
+            self.messages += 1
+            self.recipients += len(to_addrs)
+            self.bytes += len(message)
+        return {}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.messages = self.recipients = self.bytes = 0
+
+    def close(self) -> None:
+        pass
@@ -1,6 +1,19 @@
 from __future__ import annotations
 
 from .example import log_heartbeat
-from .campaigns import send_campaign_task
+from .campaigns import (
+    finalize_campaign_task,
+    retry_campaign_sends_task,
+    send_campaign_batch_task,
+    send_campaign_task,
+)
+from .contacts import import_contacts_task
 
-__all__ = ["log_heartbeat", "send_campaign_task"]
+__all__ = [
+    "log_heartbeat",
+    "send_campaign_task",
+    "send_campaign_batch_task",
+    "finalize_campaign_task",
+    "retry_campaign_sends_task",
+    "import_contacts_task",
+]
@@ -1,82 +1,732 @@
 from __future__ import annotations
 
-from celery import shared_task
-from sqlalchemy import select
+import logging
+import random
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, Iterator, Mapping, Sequence
 
-from ..db.models import Campaign, Contact, EmailSend, EmailTemplate
+from celery import chord, group, shared_task
+from flask import current_app
+from sqlalchemy import and_, case, func, or_, select, update
+
+from ..db.models import Campaign, CampaignBatch, Contact, EmailSend
 from ..extensions import db
-from ..services.email import send_html_email
-from ..services.rendering import render_html_document
+from ..services.audience import chunked, contact_fields_by_email, iter_audience
+from ..services.email import (
+    PersonalizedMessage,
+    PreparedMessage,
+    async_dispatch_enabled,
+    get_async_dispatcher,
+    group_recipients_by_domain,
+    prepare_campaign_email,
+    send_prepared_email,
+    sending_account,
+)
+from ..services.merge_tags import MERGE_FIELDS
+from ..services.template_cache import RenderedTemplate, get_rendered_template
+from ..services.send_log import EmailSendWriter
+from ..services.smtp_pool import is_transient_error, recipient_outcomes
+from ..services.throttle import SendThrottle, get_send_throttle, recipient_domain
+from ..tracing import span
 
+logger = logging.getLogger(__name__)
 
-def _compose_html(*, template: EmailTemplate) -> str:
-    return render_html_document(html=template.html or "", css=template.css)
 
+def _batch_size() -> int:
+    return max(1, int(current_app.config.get("CAMPAIGN_BATCH_SIZE", 500)))
 
-@shared_task(name="tasks.send_campaign")
-def send_campaign_task(campaign_id: int) -> dict:
-    return send_campaign(campaign_id)
 
+def _send_writer(campaign: Campaign, from_status: str = "queued") -> EmailSendWriter:
+    config = current_app.config
+    return EmailSendWriter(
+        organization_id=campaign.organization_id,
+        campaign_id=campaign.id,
+        flush_size=int(config.get("SEND_LOG_FLUSH_SIZE", 200)),
+        flush_seconds=float(config.get("SEND_LOG_FLUSH_SECONDS", 5)),
+        from_status=from_status,
+    )
 
-def send_campaign(campaign_id: int) -> dict:
+
+def _max_attempts() -> int:
+    return max(1, int(current_app.config.get("SMTP_RETRY_MAX_ATTEMPTS", 5)))
+
+
+def retry_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    Backoff before retry ``attempt`` (1-based): exponential, capped, jittered.
+
+    Half of the capped delay is fixed and half is random, so recipients deferred
+    together by a throttling domain do not all come back in the same second.
+    """
+    ceiling = min(cap, base * 2 ** (attempt - 1))
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+def _mark_campaign(campaign: Campaign, status: str) -> None:
+    campaign.status = status
+    db.session.add(campaign)
+    db.session.commit()
+
+
+def plan_batches(campaign: Campaign, batch_size: int | None = None) -> list[dict]:
+    """
+    Split a campaign's audience into fixed-size batches.
+
+    Batches are position ranges rather than recipient lists so the broker
+    payload stays constant whatever the audience size: custom audiences are
+    sliced by offset into ``campaign.recipients``, contact audiences by
+    ``(lower, upper]`` ranges over ``contacts.id``.
+    """
+    size = batch_size or _batch_size()
+    if campaign.audience_type == "custom":
+        total = len(campaign.recipients or [])
+        return [
+            {"kind": "custom", "lower": start, "upper": min(start + size, total)}
+            for start in range(0, total, size)
+        ]
+
+    in_org = Contact.organization_id == campaign.organization_id
+    max_id = db.session.scalar(select(func.max(Contact.id)).where(in_org))
+    if max_id is None:
+        return []
+
+    batches: list[dict] = []
+    lower = 0
+    while lower < max_id:
+        upper = db.session.scalar(
+            select(Contact.id)
+            .where(in_org, Contact.id > lower)
+            .order_by(Contact.id)
+            .offset(size - 1)
+            .limit(1)
+        )
+        upper = max_id if upper is None else min(upper, max_id)
+        batches.append({"kind": "contacts", "lower": lower, "upper": upper})
+        lower = upper
+    return batches
+
+
+def ensure_batches(campaign: Campaign) -> list[CampaignBatch]:
+    """Load the campaign's persisted batches, planning them on first send."""
+    batches = db.session.scalars(
+        select(CampaignBatch)
+        .where(CampaignBatch.campaign_id == campaign.id)
+        .order_by(CampaignBatch.seq)
+    ).all()
+    if batches:
+        return list(batches)
+    batches = [
+        CampaignBatch(
+            campaign_id=campaign.id,
+            seq=seq,
+            kind=plan["kind"],
+            lower_bound=plan["lower"],
+            upper_bound=plan["upper"],
+            cursor=plan["lower"],
+            status="pending",
+            attempts=0,
+            sent=0,
+            failed=0,
+        )
+        for seq, plan in enumerate(plan_batches(campaign))
+    ]
+    db.session.add_all(batches)
+    db.session.commit()
+    return batches
+
+
+def reset_batches_for_resend(campaign: Campaign) -> None:
+    """
+    Rewind finished batches so a failed/partial campaign can be sent again.
+
+    Batches keep their ``attempts`` so the next run skips recipients that
+    already have a ``sent`` row; unfinished batches keep their cursor.
+    """
+    db.session.execute(
+        update(CampaignBatch)
+        .where(CampaignBatch.campaign_id == campaign.id, CampaignBatch.status == "done")
+        .values(
+            status="pending",
+            cursor=CampaignBatch.lower_bound,
+            sent=0,
+            failed=0,
+            deferred=0,
+        )
+    )
+
+
+def stall_cutoff(stale_after: timedelta | None = None) -> datetime:
+    """Batches ``sending`` without a checkpoint since this moment count as stalled."""
+    if stale_after is None:
+        stale_after = timedelta(minutes=int(current_app.config.get("CAMPAIGN_STALL_MINUTES", 30)))
+    return datetime.now(tz=timezone.utc) - stale_after
+
+
+def claimable(cutoff: datetime):
+    """
+    Batches a run may take over: not started yet, or ``sending`` with no
+    checkpoint since ``cutoff``. A batch a live worker is sending is never
+    claimable, so resuming cannot send its recipients twice.
+    """
+    return or_(
+        CampaignBatch.status == "pending",
+        and_(CampaignBatch.status == "sending", CampaignBatch.updated_at < cutoff),
+    )
+
+
+def has_claimable_batches(campaign_id: int) -> bool:
+    return db.session.scalar(
+        select(
+            select(CampaignBatch.id)
+            .where(CampaignBatch.campaign_id == campaign_id, claimable(stall_cutoff()))
+            .exists()
+        )
+    )
+
+
+def find_stalled_campaigns(stale_after: timedelta) -> list[int]:
+    """Campaigns stuck in ``sending`` whose batches stopped checkpointing."""
+    cutoff = stall_cutoff(stale_after)
+    last_progress = func.max(CampaignBatch.updated_at)
+    rows = db.session.execute(
+        select(Campaign.id, Campaign.updated_at, last_progress)
+        .outerjoin(CampaignBatch, CampaignBatch.campaign_id == Campaign.id)
+        .where(Campaign.status == "sending")
+        .group_by(Campaign.id, Campaign.updated_at)
+    ).all()
+    stalled = []
+    for campaign_id, updated_at, progressed_at in rows:
+        latest = max(_aware(updated_at), _aware(progressed_at or updated_at))
+        if latest < cutoff:
+            stalled.append(campaign_id)
+    return stalled
+
+
+def _aware(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes even for timezone-aware columns.
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _load_for_send(
+    campaign_id: int, template_version: str | None = None
+) -> tuple[Campaign | None, RenderedTemplate | None, dict | None]:
     campaign = db.session.get(Campaign, campaign_id)
     if not campaign:
-        return {"status": "missing", "campaign_id": campaign_id}
+        return None, None, {"status": "missing", "campaign_id": campaign_id}
 
-    template = db.session.get(EmailTemplate, campaign.template_id)
+    template = get_rendered_template(campaign.template_id, template_version)
     if not template:
-        campaign.status = "failed"
-        db.session.add(campaign)
-        db.session.commit()
-        return {"status": "failed", "campaign_id": campaign_id, "error": "template missing"}
+        _mark_campaign(campaign, "failed")
+        return campaign, None, {
+            "status": "failed",
+            "campaign_id": campaign_id,
+            "error": "template missing",
+        }
+    return campaign, template, None
 
-    recipients: list[str]
-    if campaign.audience_type == "custom":
-        recipients = list(campaign.recipients or [])
-    else:
-        recipients = db.session.scalars(
-            select(Contact.email).where(Contact.organization_id == campaign.organization_id)
-        ).all()
 
-    if not recipients:
-        campaign.status = "failed"
-        db.session.add(campaign)
-        db.session.commit()
+@shared_task(name="tasks.send_campaign")
+def send_campaign_task(campaign_id: int) -> dict:
+    return dispatch_campaign(campaign_id)
+
+
+# acks_late + reject_on_worker_lost: if the worker dies mid-batch the broker
+# redelivers the task and the batch resumes from its checkpoint.
+@shared_task(name="tasks.send_campaign_batch", acks_late=True, reject_on_worker_lost=True)
+def send_campaign_batch_task(
+    campaign_id: int, batch_id: int, template_version: str | None = None
+) -> dict:
+    try:
+        return send_campaign_batch(campaign_id, batch_id, template_version)
+    except Exception as exc:
+        # Keep the chord alive: the finalizer accounts for the broken batch.
+        logger.exception("Campaign %s batch %s failed", campaign_id, batch_id)
+        db.session.rollback()
+        return {"recipients": 0, "failures": 0, "error": str(exc)}
+
+
+@shared_task(name="tasks.finalize_campaign")
+def finalize_campaign_task(results: list[dict], campaign_id: int) -> dict:
+    return finalize_campaign(campaign_id, results)
+
+
+# Routed to the retry queue (see celery_app) and consumed by its own
+# low-concurrency worker, so retries never compete with first-attempt batches.
+@shared_task(name="tasks.retry_campaign_sends", acks_late=True, reject_on_worker_lost=True)
+def retry_campaign_sends_task(
+    campaign_id: int, batch_id: int, to_emails: list[str], attempt: int
+) -> dict:
+    try:
+        return retry_campaign_sends(campaign_id, batch_id, to_emails, attempt)
+    except Exception as exc:
+        logger.exception(
+            "Retry of %s deferred sends for campaign %s failed", len(to_emails), campaign_id
+        )
+        db.session.rollback()
+        # The broken run counts as a try, so the backoff grows and the loop ends.
+        if attempt + 1 < _max_attempts():
+            schedule_retry(campaign_id, batch_id, to_emails, attempt + 1)
+            return {"sent": 0, "failed": 0, "deferred": len(to_emails)}
+        return fail_deferred_sends(campaign_id, batch_id, to_emails, f"retry failed: {exc}")
+
+
+def schedule_retry(campaign_id: int, batch_id: int, to_emails: list[str], attempt: int) -> None:
+    config = current_app.config
+    delay = retry_delay(
+        attempt,
+        float(config.get("SMTP_RETRY_BASE_SECONDS", 60)),
+        float(config.get("SMTP_RETRY_MAX_SECONDS", 3600)),
+    )
+    retry_campaign_sends_task.apply_async(
+        (campaign_id, batch_id, list(to_emails), attempt), countdown=delay
+    )
+
+
+def dispatch_campaign(campaign_id: int) -> dict:
+    """
+    Fan a campaign out as a chord of batch subtasks across all workers.
+
+    Only batches that are not finished are dispatched, so calling this again
+    for a campaign stuck in ``sending`` resumes it.
+    """
+    campaign, template, error = _load_for_send(campaign_id)
+    if error:
+        return error
+
+    batches = ensure_batches(campaign)
+    if not batches:
+        _mark_campaign(campaign, "failed")
         return {"status": "failed", "campaign_id": campaign_id, "error": "no recipients"}
 
-    subject = campaign.subject or template.subject or campaign.name
-    html = _compose_html(template=template)
+    pending = [batch.id for batch in batches if batch.status != "done"]
+    if not pending:
+        return finalize_campaign(campaign_id)
 
-    failures = 0
-    for to_email in recipients:
-        send_row = EmailSend(
-            organization_id=campaign.organization_id,
-            campaign_id=campaign.id,
-            to_email=to_email,
-            status="queued",
+    # Batches get the template version resolved here, so they find the
+    # rendered template in the cache without reading the template row.
+    header = group(
+        send_campaign_batch_task.s(campaign_id, batch_id, template.version) for batch_id in pending
+    )
+    chord(header)(finalize_campaign_task.s(campaign_id))
+    return {"status": "dispatched", "campaign_id": campaign_id, "batches": len(pending)}
+
+
+@dataclass
+class _Chunk:
+    last_position: int
+    outstanding: int
+    sent: int = 0
+    failed: int = 0
+    deferred: list[str] = field(default_factory=list)
+
+
+class _Checkpoint:
+    """
+    Advance a batch's cursor as chunks of outcomes become durable.
+
+    A chunk is complete once every recipient in it has an outcome; completed
+    chunks are folded into the batch in order, and the cursor, counters and
+    buffered status transitions are committed together. Deferred recipients
+    are handed to ``on_deferred`` only after that commit, so the retry queue
+    never sees a recipient whose ``deferred`` row is not on record yet.
+    """
+
+    def __init__(
+        self,
+        batch: CampaignBatch,
+        writer: EmailSendWriter,
+        on_deferred: Callable[[list[str]], None],
+    ) -> None:
+        self.batch = batch
+        self.writer = writer
+        self.on_deferred = on_deferred
+        self._chunks: deque[_Chunk] = deque()
+        self._owners: dict[str, deque[_Chunk]] = {}
+
+    def open_chunk(self, last_position: int, to_send: list[str], already_sent: int) -> None:
+        chunk = _Chunk(last_position, len(to_send), sent=already_sent)
+        self._chunks.append(chunk)
+        for to_email in to_send:
+            self._owners.setdefault(to_email, deque()).append(chunk)
+        self._advance()
+
+    def settle(self, to_email: str, status: str) -> None:
+        owners = self._owners[to_email]
+        chunk = owners.popleft()
+        if not owners:
+            del self._owners[to_email]
+        chunk.outstanding -= 1
+        if status == "sent":
+            chunk.sent += 1
+        elif status == "deferred":
+            chunk.deferred.append(to_email)
+        else:
+            chunk.failed += 1
+        self._advance()
+
+    def _advance(self) -> None:
+        deferred: list[str] = []
+        advanced = False
+        while self._chunks and self._chunks[0].outstanding == 0:
+            chunk = self._chunks.popleft()
+            self.batch.cursor = chunk.last_position
+            self.batch.sent += chunk.sent
+            self.batch.failed += chunk.failed
+            self.batch.deferred += len(chunk.deferred)
+            deferred.extend(chunk.deferred)
+            advanced = True
+        if advanced:
+            self.writer.flush(commit=False)
+            db.session.commit()
+        if deferred:
+            self.on_deferred(deferred)
+
+
+def _claim_batch(batch: CampaignBatch) -> bool:
+    """Mark the batch as sending unless another run claimed it or is still sending it."""
+    result = db.session.execute(
+        update(CampaignBatch)
+        .where(
+            CampaignBatch.id == batch.id,
+            CampaignBatch.attempts == batch.attempts,
+            claimable(stall_cutoff()),
         )
-        db.session.add(send_row)
-        db.session.commit()
+        .values(status="sending", attempts=CampaignBatch.attempts + 1)
+        # The stall test compares timestamps SQLite hands back naive; let the
+        # database evaluate it rather than the session's in-Python evaluator.
+        .execution_options(synchronize_session="fetch")
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def _batch_summary(batch: CampaignBatch) -> dict:
+    return {
+        "recipients": batch.sent + batch.failed + batch.deferred,
+        "failures": batch.failed,
+        "deferred": batch.deferred,
+    }
 
+
+def _prepare_message(
+    campaign: Campaign, template: RenderedTemplate
+) -> PreparedMessage | PersonalizedMessage:
+    subject = campaign.subject or template.subject or campaign.name
+    return prepare_campaign_email(subject=subject, html=template.html, text=template.text or None)
+
+
+def _deliver(
+    from_email: str,
+    messages: Iterable[tuple[list[str], PreparedMessage]],
+    on_result: Callable[[str, BaseException | None], None],
+    throttle: SendThrottle | None,
+) -> None:
+    """Send each (recipients, message) pair with the configured dispatcher; report per address."""
+    account = sending_account(from_email)
+    if async_dispatch_enabled():
+        get_async_dispatcher(throttle=throttle, account=account).run(
+            from_email,
+            ((rcpts, prepared.for_recipients(rcpts)) for rcpts, prepared in messages),
+            on_result,
+        )
+        return
+    for rcpts, prepared in messages:
+        if throttle is not None:
+            for to_email in rcpts:
+                throttle.acquire(account, recipient_domain(to_email))
+        refused, error = None, None
         try:
-            send_html_email(to_email=to_email, subject=subject, html=html)
-            send_row.status = "sent"
-            send_row.error = None
+            refused = send_prepared_email(prepared, rcpts)
         except Exception as exc:
-            failures += 1
-            send_row.status = "failed"
-            send_row.error = str(exc)
-        db.session.add(send_row)
+            error = exc
+        outcomes = recipient_outcomes(rcpts, refused, error)
+        if throttle is not None:
+            throttle.penalize_deferrals(outcomes)
+        for to_email, outcome in outcomes:
+            on_result(to_email, outcome)
+
+
+def _messages(
+    message: PreparedMessage | PersonalizedMessage,
+    to_emails: list[str],
+    rows: Mapping[str, Sequence[str | None]],
+) -> Iterator[tuple[list[str], PreparedMessage]]:
+    """
+    Pair recipients with the message they get.
+
+    A personalized message is rendered from each recipient's ``MERGE_FIELDS``
+    row in ``rows`` and sent on its own; a shared one may go to a whole
+    domain group per transaction.
+    """
+    if isinstance(message, PersonalizedMessage):
+        for to_email in to_emails:
+            yield [to_email], message.for_row(rows[to_email])
+        return
+    for rcpts in _recipient_groups(to_emails):
+        yield rcpts, message
+
+
+def _recipient_groups(to_emails: list[str]) -> Iterable[list[str]]:
+    max_rcpt = max(1, int(current_app.config.get("SMTP_MAX_RCPT_PER_TRANSACTION", 1)))
+    if max_rcpt > 1:
+        return group_recipients_by_domain(to_emails, max_rcpt)
+    return ([to_email] for to_email in to_emails)
+
+
+def _classify(error: BaseException | None, attempt: int) -> str:
+    if error is None:
+        return "sent"
+    if is_transient_error(error) and attempt < _max_attempts():
+        return "deferred"
+    return "failed"
+
+
+def send_campaign_batch(
+    campaign_id: int, batch_id: int, template_version: str | None = None
+) -> dict:
+    campaign, template, error = _load_for_send(campaign_id, template_version)
+    if error:
+        return {"recipients": 0, "failures": 0, "error": error.get("error", error["status"])}
+
+    batch = db.session.get(CampaignBatch, batch_id)
+    if batch is None or batch.campaign_id != campaign_id:
+        return {"recipients": 0, "failures": 0, "error": "batch missing"}
+    if batch.status == "done":
+        return _batch_summary(batch)
+    resuming = batch.attempts > 0
+    if not _claim_batch(batch):
+        return {"recipients": 0, "failures": 0, "skipped": True}
+
+    message = _prepare_message(campaign, template)
+    personalized = isinstance(message, PersonalizedMessage)
+    throttle = get_send_throttle()
+    audience = iter_audience(
+        campaign,
+        after=batch.cursor,
+        until=batch.upper_bound,
+        fields=MERGE_FIELDS if personalized else ("email",),
+    )
+    with (
+        span("campaign.batch", campaign_id=campaign_id, batch_id=batch_id, resuming=resuming)
+        as batch_span,
+        _send_writer(campaign) as writer,
+    ):
+        checkpoint = _Checkpoint(
+            batch, writer, lambda emails: schedule_retry(campaign_id, batch_id, emails, 1)
+        )
+
+        def deliveries():
+            for chunk in chunked(audience, writer.flush_size):
+                emails = [row[1] for row in chunk]
+                to_send = writer.queue(emails, skip_sent=resuming)
+                checkpoint.open_chunk(chunk[-1][0], to_send, len(emails) - len(to_send))
+                rows = {row[1]: row[1:] for row in chunk} if personalized else {}
+                yield from _messages(message, to_send, rows)
+
+        def on_result(to_email: str, error: BaseException | None) -> None:
+            status = _classify(error, 1)
+            writer.record(to_email, status, None if error is None else str(error))
+            checkpoint.settle(to_email, status)
+
+        _deliver(message.from_email, deliveries(), on_result, throttle)
+        if batch_span is not None:
+            batch_span.set(**_batch_summary(batch))
+
+    batch.status = "done"
+    db.session.commit()
+    return _batch_summary(batch)
+
+
+def retry_campaign_sends(
+    campaign_id: int, batch_id: int, to_emails: list[str], attempt: int
+) -> dict:
+    """
+    Re-attempt recipients a batch deferred after a transient SMTP failure.
+
+    ``attempt`` is the number of earlier tries. Recipients that fail
+    transiently again are rescheduled with a longer backoff until
+    ``SMTP_RETRY_MAX_ATTEMPTS`` is reached, then marked failed. The batch's
+    counters are settled in one UPDATE and, once nothing is deferred any more,
+    the campaign is finalized. Only rows still ``deferred`` move the counters,
+    so a redelivered retry, or one whose recipients a resumed batch already
+    re-sent, leaves them alone.
+    """
+    campaign = db.session.get(Campaign, campaign_id)
+    if not campaign:
+        return {"status": "missing", "campaign_id": campaign_id}
+    template = get_rendered_template(campaign.template_id)
+
+    pending = _still_deferred(campaign_id, to_emails)
+    counts = {"sent": 0, "failed": 0, "deferred": 0}
+    redeferred: list[str] = []
+    throttle = get_send_throttle()
+    with (
+        span("campaign.retry", campaign_id=campaign_id, batch_id=batch_id, attempt=attempt)
+        as retry_span,
+        _send_writer(campaign, from_status="deferred") as writer,
+    ):
+
+        def on_result(to_email: str, error: BaseException | None) -> None:
+            status = _classify(error, attempt + 1)
+            writer.record(to_email, status, None if error is None else str(error))
+            counts[status] += 1
+            if status == "deferred":
+                redeferred.append(to_email)
+
+        if template is None:
+            for to_email in pending:
+                writer.record(to_email, "failed", "template missing")
+                counts["failed"] += 1
+        elif pending:
+            message = _prepare_message(campaign, template)
+            rows = (
+                contact_fields_by_email(campaign.organization_id, pending, MERGE_FIELDS)
+                if isinstance(message, PersonalizedMessage)
+                else {}
+            )
+            _deliver(message.from_email, _messages(message, pending, rows), on_result, throttle)
+
+        writer.flush(commit=False)
+        db.session.execute(
+            update(CampaignBatch)
+            .where(CampaignBatch.id == batch_id)
+            .values(
+                sent=CampaignBatch.sent + counts["sent"],
+                failed=CampaignBatch.failed + counts["failed"],
+                deferred=CampaignBatch.deferred - (len(pending) - len(redeferred)),
+            )
+        )
         db.session.commit()
+        if retry_span is not None:
+            retry_span.set(**counts)
+
+    if redeferred:
+        schedule_retry(campaign_id, batch_id, redeferred, attempt + 1)
+    elif _retries_settled(campaign_id):
+        finalize_campaign(campaign_id)
+    return counts
+
+
+def fail_deferred_sends(
+    campaign_id: int, batch_id: int, to_emails: list[str], error: str
+) -> dict:
+    """Give up on deferred recipients whose retries are exhausted and settle the batch."""
+    campaign = db.session.get(Campaign, campaign_id)
+    if not campaign:
+        return {"status": "missing", "campaign_id": campaign_id}
+    pending = _still_deferred(campaign_id, to_emails)
+    with _send_writer(campaign, from_status="deferred") as writer:
+        for to_email in pending:
+            writer.record(to_email, "failed", error)
+        writer.flush(commit=False)
+        db.session.execute(
+            update(CampaignBatch)
+            .where(CampaignBatch.id == batch_id)
+            .values(
+                failed=CampaignBatch.failed + len(pending),
+                deferred=CampaignBatch.deferred - len(pending),
+            )
+        )
+        db.session.commit()
+    if _retries_settled(campaign_id):
+        finalize_campaign(campaign_id)
+    return {"sent": 0, "failed": len(pending), "deferred": 0}
+
+
+def _still_deferred(campaign_id: int, to_emails: list[str]) -> list[str]:
+    # Only rows still deferred are retried: a resumed batch may have re-sent some.
+    table = EmailSend.__table__
+    return list(
+        dict.fromkeys(
+            db.session.scalars(
+                select(table.c.to_email).where(
+                    table.c.campaign_id == campaign_id,
+                    table.c.status == "deferred",
+                    table.c.to_email.in_(set(to_emails)),
+                )
+            )
+        )
+    )
+
+
+def _retries_settled(campaign_id: int) -> bool:
+    """True once every batch finished and no recipient is waiting on a retry."""
+    unfinished, deferred = db.session.execute(
+        select(
+            func.count(case((CampaignBatch.status != "done", 1))),
+            func.coalesce(func.sum(CampaignBatch.deferred), 0),
+        ).where(CampaignBatch.campaign_id == campaign_id)
+    ).one()
+    return unfinished == 0 and deferred == 0
+
+
+def finalize_campaign(campaign_id: int, results: list[dict] | None = None) -> dict:
+    """
+    Settle the campaign status from its persisted batch counters.
+
+    ``results`` (the chord's batch summaries) is accepted for the Celery
+    signature, but totals come from the batches so resumed runs and retries
+    are counted. While recipients are still deferred the campaign stays in
+    ``sending``; the retry that settles the last of them finalizes it. It
+    also stays ``sending`` when a batch was skipped because another run is
+    still sending it; ``resume-campaigns`` finalizes it once that run
+    finishes or stalls.
+    """
+    campaign = db.session.get(Campaign, campaign_id)
+    if not campaign:
+        return {"status": "missing", "campaign_id": campaign_id}
 
-    if failures == 0:
-        campaign.status = "sent"
-    elif failures == len(recipients):
-        campaign.status = "failed"
+    sent, failures, deferred, unfinished = db.session.execute(
+        select(
+            func.coalesce(func.sum(CampaignBatch.sent), 0),
+            func.coalesce(func.sum(CampaignBatch.failed), 0),
+            func.coalesce(func.sum(CampaignBatch.deferred), 0),
+            func.count(case((CampaignBatch.status != "done", 1))),
+        ).where(CampaignBatch.campaign_id == campaign_id)
+    ).one()
+    recipients = sent + failures + deferred
+
+    in_flight = sum(1 for result in results or () if result.get("skipped"))
+    if deferred or (unfinished and in_flight):
+        return {
+            "status": "sending",
+            "campaign_id": campaign_id,
+            "recipients": recipients,
+            "failures": failures,
+            "deferred": deferred,
+        }
+    if sent == 0:
+        status = "failed"
+    elif failures == 0 and unfinished == 0:
+        status = "sent"
     else:
-        campaign.status = "partial"
+        status = "partial"
+    _mark_campaign(campaign, status)
 
-    db.session.add(campaign)
-    db.session.commit()
+    summary = {
+        "status": status,
+        "campaign_id": campaign_id,
+        "recipients": recipients,
+        "failures": failures,
+    }
+    if unfinished:
+        summary["unfinished_batches"] = unfinished
+    return summary
+
+
+def send_campaign(campaign_id: int) -> dict:
+    """Run every unfinished batch of a campaign in this process, then finalize it."""
+    campaign, template, error = _load_for_send(campaign_id)
+    if error:
+        return error
+
+    batches = ensure_batches(campaign)
+    if not batches:
+        _mark_campaign(campaign, "failed")
+        return {"status": "failed", "campaign_id": campaign_id, "error": "no recipients"}
 
-    return {"status": campaign.status, "campaign_id": campaign_id, "recipients": len(recipients), "failures": failures}
+    pending = [batch.id for batch in batches if batch.status != "done"]
+    results = [send_campaign_batch(campaign_id, batch_id, template.version) for batch_id in pending]
+    return finalize_campaign(campaign_id, results)
@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from celery import shared_task
+
+from ..services.contact_import import run_contact_import
+
+
+# Late acks: a worker lost mid-import redelivers the task, which resumes after
+# the last chunk it committed.
+@shared_task(name="tasks.import_contacts", acks_late=True, reject_on_worker_lost=True)
+def import_contacts_task(import_id: int) -> dict:
+    return run_contact_import(import_id)
@@ -0,0 +1,402 @@
+from __future__ import annotations
+
+import importlib
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, Mapping, Protocol
+
+from flask import Flask, g, request
+
+# W3C trace context, used both for an incoming HTTP header and in Celery
+# message headers: ``00-<trace id>-<parent span id>-<flags>``.
+TRACEPARENT = "traceparent"
+ENQUEUED_AT = "trace_enqueued_at"
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+@dataclass
+class Span:
+    """One timed operation; ``start``/``end`` are Unix timestamps in seconds."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start: float
+    end: float | None = None
+    attributes: dict = field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def finish(self, error: BaseException | str | None = None, **attributes) -> None:
+        """End the span and hand it to the exporter; later calls are ignored."""
+        if self.end is not None:
+            return
+        self.end = time.time()
+        self.attributes.update(attributes)
+        if error is not None:
+            self.error = error if isinstance(error, str) else f"{error.__class__.__name__}: {error}"
+        exporter = _exporter
+        if exporter is not None:
+            exporter.export(self)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start,
+            "end": self.end,
+            "duration_ms": round(((self.end or self.start) - self.start) * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class SpanExporter(Protocol):
+    """Receives every finished span. ``export`` is called from request and task threads."""
+
+    def export(self, span: Span) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class MemoryExporter:
+    """Keeps the last ``max_spans`` spans in this process; for tests and a local shell."""
+
+    def __init__(self, max_spans: int = 10_000) -> None:
+        self.spans: deque[Span] = deque(maxlen=max_spans)
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def trace(self, trace_id: str) -> list[Span]:
+        return [span for span in self.spans if span.trace_id == trace_id]
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+    def close(self) -> None:
+        pass
+
+
+class FileExporter:
+    """
+    Appends spans as JSON lines to ``path``.
+
+    Each process opens its own handle (Celery and gunicorn fork after the
+    exporter is built) and writes whole lines, so several processes can share
+    one file; ``flask show-trace`` reads it back.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._handle = None
+        self._pid: int | None = None
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock:
+            if self._pid != os.getpid():
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._handle = open(self.path, "a", encoding="utf-8")
+                self._pid = os.getpid()
+            self._handle.write(line)
+            self._handle.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._handle is not None and self._pid == os.getpid():
+                self._handle.close()
+            self._handle = None
+            self._pid = None
+
+
+def build_exporter(config: Mapping) -> SpanExporter | None:
+    """
+    ``TRACE_EXPORTER``: empty (tracing off), ``memory``, ``file`` (JSON lines
+    to ``TRACE_FILE``) or ``package.module:factory``, called with the app
+    config to build any other ``SpanExporter``.
+    """
+    name = (config.get("TRACE_EXPORTER") or "").strip()
+    if not name or name == "none":
+        return None
+    if name == "memory":
+        return MemoryExporter()
+    if name == "file":
+        return FileExporter(config.get("TRACE_FILE") or "/tmp/traces.jsonl")
+    module, sep, attr = name.partition(":")
+    if not sep:
+        raise ValueError(f"Unknown TRACE_EXPORTER {name!r}")
+    return getattr(importlib.import_module(module), attr)(config)
+
+
+_exporter: SpanExporter | None = None
+_current: ContextVar[Span | None] = ContextVar("trace_span", default=None)
+
+
+def get_exporter() -> SpanExporter | None:
+    return _exporter
+
+
+def set_exporter(exporter: SpanExporter | None) -> None:
+    """Install the process-wide exporter; ``None`` turns tracing off."""
+    global _exporter
+    previous, _exporter = _exporter, exporter
+    if previous is not None and previous is not exporter:
+        previous.close()
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+def start_span(
+    name: str,
+    *,
+    parent: Span | str | None = None,
+    trace_id: str | None = None,
+    start: float | None = None,
+    **attributes,
+) -> Span | None:
+    """
+    Begin a span without making it current; ``None`` when tracing is off.
+
+    The parent defaults to the current span. A ``parent`` given as a span id
+    (from a propagated ``traceparent``) needs its ``trace_id`` too.
+    """
+    if _exporter is None:
+        return None
+    if parent is None:
+        parent = _current.get()
+    if isinstance(parent, Span):
+        trace_id, parent_id = parent.trace_id, parent.span_id
+    else:
+        parent_id = parent
+    return Span(
+        name=name,
+        trace_id=trace_id or os.urandom(16).hex(),
+        span_id=os.urandom(8).hex(),
+        parent_id=parent_id,
+        start=time.time() if start is None else start,
+        attributes=attributes,
+    )
+
+
+def activate(span: Span | None) -> Token:
+    return _current.set(span)
+
+
+def deactivate(token: Token) -> None:
+    _current.reset(token)
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span | None]:
+    """Time the block as a child of the current span; yields ``None`` when tracing is off."""
+    if _exporter is None:
+        yield None
+        return
+    current = start_span(name, **attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as exc:
+        current.finish(error=exc)
+        raise
+    finally:
+        _current.reset(token)
+        current.finish()
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str] | None:
+    """``(trace_id, parent span id)`` from a ``traceparent`` value, if it is well formed."""
+    match = _TRACEPARENT.match((value or "").strip().lower())
+    return (match[1], match[2]) if match else None
+
+
+def register_tracing(app: Flask) -> None:
+    """
+    Trace requests and Celery tasks when ``TRACE_EXPORTER`` is set.
+
+    Each API request is a root span (or continues an incoming
+    ``traceparent``) and answers with ``X-Trace-Id``. Publishing a task opens
+    a ``celery.enqueue`` span and stamps its ``traceparent`` and the publish
+    time into the message headers; the worker records the time the message
+    spent queued as ``celery.queue_wait`` and runs the task in a
+    ``celery.task`` span of the same trace. When unset nothing is
+    registered.
+    """
+    exporter = build_exporter(app.config)
+    set_exporter(exporter)
+    if exporter is None:
+        return
+    _connect_celery_signals()
+
+    @app.before_request
+    def start_request_span():
+        incoming = parse_traceparent(request.headers.get(TRACEPARENT))
+        trace_id, parent_id = incoming or (None, None)
+        rule = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        root = start_span(
+            f"{request.method} {rule}",
+            parent=parent_id,
+            trace_id=trace_id,
+            method=request.method,
+            route=rule,
+        )
+        g.trace_span, g.trace_token = root, activate(root)
+
+    @app.after_request
+    def tag_request_span(response):
+        root = g.get("trace_span")
+        if root is not None:
+            root.set(status=response.status_code)
+            response.headers["X-Trace-Id"] = root.trace_id
+        return response
+
+    @app.teardown_request
+    def finish_request_span(exc=None):
+        token = g.pop("trace_token", None)
+        if token is not None:
+            deactivate(token)
+        root = g.pop("trace_span", None)
+        if root is not None:
+            root.finish(error=exc)
+
+
+_publishing: dict[str, Span] = {}
+_running: dict[str, tuple[Span, Token]] = {}
+
+
+def _before_publish(sender=None, headers=None, routing_key=None, **_kwargs) -> None:
+    if _exporter is None or headers is None:
+        return
+    enqueue = start_span("celery.enqueue", task=sender, queue=routing_key)
+    headers[TRACEPARENT] = enqueue.traceparent
+    headers[ENQUEUED_AT] = enqueue.start
+    if headers.get("id"):
+        _publishing[headers["id"]] = enqueue
+
+
+def _after_publish(headers=None, **_kwargs) -> None:
+    enqueue = _publishing.pop((headers or {}).get("id"), None)
+    if enqueue is not None:
+        enqueue.finish()
+
+
+def _request_header(task_request, key: str):
+    value = getattr(task_request, key, None)
+    if value is None:
+        value = (getattr(task_request, "headers", None) or {}).get(key)
+    return value
+
+
+def _start_task_span(task_id=None, task=None, **_kwargs) -> None:
+    if _exporter is None or task is None:
+        return
+    task_request = task.request
+    propagated = parse_traceparent(_request_header(task_request, TRACEPARENT))
+    trace_id, parent_id = propagated or (None, None)
+    now = time.time()
+    enqueued_at = _request_header(task_request, ENQUEUED_AT)
+    if propagated and enqueued_at is not None:
+        start_span(
+            "celery.queue_wait",
+            parent=parent_id,
+            trace_id=trace_id,
+            start=min(float(enqueued_at), now),
+            task=task.name,
+            scheduled=bool(getattr(task_request, "eta", None)),
+        ).finish()
+    run = start_span(
+        "celery.task",
+        parent=parent_id,
+        trace_id=trace_id,
+        start=now,
+        task=task.name,
+        task_id=task_id,
+        retries=getattr(task_request, "retries", 0),
+    )
+    _running[task_id] = (run, activate(run))
+
+
+def _finish_task_span(task_id=None, state=None, **_kwargs) -> None:
+    entry = _running.pop(task_id, None)
+    if entry is None:
+        return
+    run, token = entry
+    deactivate(token)
+    run.finish(error=None if state != "FAILURE" else "task failed", state=state)
+
+
+def _connect_celery_signals() -> None:
+    from celery.signals import after_task_publish, before_task_publish, task_postrun, task_prerun
+
+    before_task_publish.connect(_before_publish, weak=False, dispatch_uid="trace_publish")
+    after_task_publish.connect(_after_publish, weak=False, dispatch_uid="trace_published")
+    task_prerun.connect(_start_task_span, weak=False, dispatch_uid="trace_prerun")
+    task_postrun.connect(_finish_task_span, weak=False, dispatch_uid="trace_postrun")
+
+
+def read_spans(path: str, trace_id: str | None = None) -> list[dict]:
+    """Spans a ``FileExporter`` wrote, optionally only one trace's."""
+    spans = []
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                item = json.loads(line)
+                if trace_id is None or item["trace_id"] == trace_id:
+                    spans.append(item)
+    return spans
+
+
+def summarize_trace(spans: Iterable[dict]) -> list[tuple[int, str, int, float]]:
+    """
+    Fold a trace into ``(depth, name, count, total_ms)`` rows.
+
+    Siblings with the same name are merged -- a campaign has one
+    ``campaign.batch`` span per batch and one ``smtp.session`` per session --
+    so the result reads like a profile of where the time went.
+    """
+    spans = list(spans)
+    children: dict[str | None, list[dict]] = defaultdict(list)
+    ids = {item["span_id"] for item in spans}
+    for item in sorted(spans, key=lambda item: item["start"]):
+        parent = item["parent_id"] if item["parent_id"] in ids else None
+        children[parent].append(item)
+
+    rows: list[tuple[int, str, int, float]] = []
+
+    def walk(group: list[dict], depth: int) -> None:
+        by_name: dict[str, list[dict]] = {}
+        for item in group:
+            label = item["name"]
+            task = item["attributes"].get("task")
+            if task and label.startswith("celery."):
+                label = f"{label} {task}"
+            by_name.setdefault(label, []).append(item)
+        for label, items in by_name.items():
+            total = sum(item["duration_ms"] for item in items)
+            rows.append((depth, label, len(items), round(total, 3)))
+            walk([child for item in items for child in children[item["span_id"]]], depth + 1)
+
+    walk(children[None], 0)
+    return rows
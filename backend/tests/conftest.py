@@ -5,8 +5,11 @@ import os
 os.environ.setdefault("API_KEYS", "test-key")
 os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
 
+from contextlib import contextmanager
+
 import pytest
 from flask import Flask
+from sqlalchemy import event
 
 from email_marketing_backend import create_app
 from email_marketing_backend.extensions import db
@@ -51,3 +54,51 @@ def auth_headers(client):
 @pytest.fixture()
 def internal_headers():
     return {"X-API-Key": "test-key"}
+
+
+class StatementLog:
+    """SQL statements run while a budget is active, and the rows SELECTs returned."""
+
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+        self.rows = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append(statement)
+        if executemany or not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            return
+        # Re-run the query as a count on the raw connection (invisible to
+        # engine events); fetched rows are what a joined cartesian inflates.
+        counter = conn.connection.cursor()
+        try:
+            counter.execute(f"SELECT COUNT(*) FROM ({statement}) AS budget_rows", parameters)
+            self.rows += counter.fetchone()[0]
+        finally:
+            counter.close()
+
+    def report(self) -> str:
+        return "\n".join(f"  {idx}. {sql}" for idx, sql in enumerate(self.statements, 1))
+
+
+@pytest.fixture()
+def query_budget(app):
+    """
+    ``with query_budget(statements=3, rows=50): ...`` fails the test when the
+    block runs more SQL statements, or reads more rows, than declared.
+    """
+
+    @contextmanager
+    def budget(*, statements: int, rows: int | None = None):
+        log = StatementLog()
+        event.listen(db.engine, "after_cursor_execute", log)
+        try:
+            yield log
+        finally:
+            event.remove(db.engine, "after_cursor_execute", log)
+        assert len(log.statements) <= statements, (
+            f"{len(log.statements)} SQL statements, budget {statements}:\n{log.report()}"
+        )
+        if rows is not None:
+            assert log.rows <= rows, f"{log.rows} rows read, budget {rows}:\n{log.report()}"
+
+    return budget
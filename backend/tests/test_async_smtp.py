@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import smtplib
+import threading
+
+import pytest
+
+from email_marketing_backend.services.async_smtp import AsyncSMTPDispatcher
+from email_marketing_backend.services.smtp_sink import SMTPSink
+
+
+@pytest.fixture()
+def sink():
+    with SMTPSink() as server:
+        yield server
+
+
+def run_dispatch(sink: SMTPSink, recipients: list[str], **kwargs) -> dict:
+    dispatcher = AsyncSMTPDispatcher(host=sink.host, port=sink.port, timeout=5, **kwargs)
+    results: dict[str, BaseException | None] = {}
+    body = b"Subject: hi\r\n\r\n.leading dot\r\nbody\r\n"
+    dispatcher.run(
+        "from@example.com",
+        ((to, f"To: {to}\r\n".encode() + body) for to in recipients),
+        lambda to, error: results.__setitem__(to, error),
+    )
+    return results
+
+
+def test_dispatcher_runs_concurrent_sessions(sink):
+    recipients = [f"user{idx}@example.com" for idx in range(40)]
+
+    results = run_dispatch(sink, recipients, concurrency=4, window=8)
+
+    assert all(error is None for error in results.values())
+    assert sorted(results) == sorted(recipients)
+    assert sink.message_count == 40
+    assert sink.connection_count == 4
+    assert all(b"\r\n.leading dot\r\n" in message.data for message in sink.messages)
+
+
+def test_dispatcher_reports_refused_recipients(sink):
+    sink.rcpt_handler = lambda addr: (550, "No such user") if addr.startswith("bad") else None
+
+    results = run_dispatch(sink, ["good@example.com", "bad@example.com"], concurrency=2)
+
+    assert results["good@example.com"] is None
+    assert isinstance(results["bad@example.com"], smtplib.SMTPRecipientsRefused)
+    assert sink.message_count == 1
+
+
+def test_dispatcher_reconnects_after_dropped_session(sink):
+    sink.drop_after_messages = 3
+    recipients = [f"user{idx}@example.com" for idx in range(10)]
+
+    results = run_dispatch(sink, recipients, concurrency=1)
+
+    assert all(error is None for error in results.values())
+    assert sink.message_count == 10
+    assert sink.connection_count == 4
+
+
+def test_dispatcher_retires_sessions_after_message_cap(sink):
+    recipients = [f"user{idx}@example.com" for idx in range(10)]
+
+    results = run_dispatch(sink, recipients, concurrency=1, max_messages_per_connection=2)
+
+    assert all(error is None for error in results.values())
+    assert sink.connection_count == 5
+
+
+def test_dispatcher_raises_when_result_callback_fails(sink):
+    # Every session dies on its first result while the producer still has
+    # messages for a full queue; run() must raise rather than block forever.
+    def on_result(to_email, error):
+        raise RuntimeError("flush failed")
+
+    dispatcher = AsyncSMTPDispatcher(
+        host=sink.host, port=sink.port, timeout=5, concurrency=2, window=2
+    )
+    outcome: list[BaseException] = []
+
+    def run():
+        try:
+            dispatcher.run(
+                "from@example.com",
+                ((f"user{idx}@example.com", b"Subject: hi\r\n\r\nx\r\n") for idx in range(50)),
+                on_result,
+            )
+        except BaseException as exc:
+            outcome.append(exc)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+
+    assert not thread.is_alive()
+    assert [type(exc) for exc in outcome] == [RuntimeError]
+
+
+def test_dispatcher_runs_callbacks_and_producer_off_the_event_loop(sink):
+    loop_thread = threading.current_thread()
+    seen: set[threading.Thread] = set()
+
+    def messages():
+        for idx in range(4):
+            seen.add(threading.current_thread())
+            yield f"user{idx}@example.com", b"Subject: hi\r\n\r\nx\r\n"
+
+    dispatcher = AsyncSMTPDispatcher(host=sink.host, port=sink.port, timeout=5, concurrency=2)
+    dispatcher.run(
+        "from@example.com",
+        messages(),
+        lambda to, error: seen.add(threading.current_thread()),
+    )
+
+    assert sink.message_count == 4
+    assert seen and loop_thread not in seen
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from email_marketing_backend.db.models import Campaign, Contact, Organization
+from email_marketing_backend.extensions import db
+from email_marketing_backend.services.audience import has_audience, iter_audience, iter_contact_rows
+
+
+def seed_org(count: int) -> Organization:
+    org = Organization(name="Audience Org", slug="audience-org")
+    other = Organization(name="Other Org", slug="other-org")
+    db.session.add_all([org, other])
+    db.session.flush()
+    for idx in range(count):
+        db.session.add(Contact(email=f"c{idx}@example.com", organization_id=org.id))
+        db.session.add(Contact(email=f"x{idx}@example.com", organization_id=other.id))
+    db.session.commit()
+    return org
+
+
+def test_iter_contact_rows_pages_by_keyset(app):
+    org = seed_org(7)
+
+    rows = list(iter_contact_rows(org.id, Contact.email, page_size=3))
+
+    assert [email for _id, email in rows] == [f"c{idx}@example.com" for idx in range(7)]
+    ids = [row_id for row_id, _email in rows]
+    assert ids == sorted(ids)
+
+
+def test_iter_audience_respects_batch_bounds(app):
+    org = seed_org(5)
+    ids = [row_id for row_id, _ in iter_contact_rows(org.id)]
+    campaign = Campaign(organization_id=org.id, name="C", template_id=1, audience_type="all_contacts")
+
+    assert list(iter_audience(campaign, after=ids[1], until=ids[3])) == [
+        (ids[2], "c2@example.com"),
+        (ids[3], "c3@example.com"),
+    ]
+    assert has_audience(campaign)
+
+    empty = Organization(name="Empty Org", slug="empty-org")
+    db.session.add(empty)
+    db.session.commit()
+    assert not has_audience(Campaign(organization_id=empty.id, audience_type="all_contacts"))
+
+
+def test_iter_audience_positions_for_custom_recipients(app):
+    campaign = Campaign(audience_type="custom", recipients=["a@x.com", "b@x.com", "c@x.com"])
+    assert list(iter_audience(campaign, after=1, until=3)) == [(2, "b@x.com"), (3, "c@x.com")]
@@ -37,3 +37,19 @@ def test_me_endpoint_requires_token(client):
     assert me.status_code == 200
     payload = me.get_json()
     assert payload["user"]["email"] == "user@example.com"
+
+
+def test_login_checks_workspace_slug(client):
+    register_user(client, "user@example.com", "pw", "alpha")
+
+    ok = client.post(
+        "/api/auth/login",
+        json={"email": "user@example.com", "password": "pw", "organization": "alpha"},
+    )
+    wrong = client.post(
+        "/api/auth/login",
+        json={"email": "user@example.com", "password": "pw", "organization": "beta"},
+    )
+
+    assert ok.status_code == 200
+    assert wrong.status_code == 401
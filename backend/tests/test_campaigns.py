@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import smtplib
 from types import SimpleNamespace
 
+import pytest
+
 
 def test_campaign_send_to_all_contacts(client, auth_headers, monkeypatch):
     me = client.get("/api/auth/me", headers=auth_headers).get_json()
@@ -20,10 +23,13 @@ def test_campaign_send_to_all_contacts(client, auth_headers, monkeypatch):
 
     sent = []
 
-    def fake_send_html_email(*, to_email: str, subject: str, html: str) -> None:
-        sent.append({"to": to_email, "subject": subject, "html": html})
+    def fake_send_prepared_email(prepared, to_emails: list[str]) -> None:
+        raw = prepared.for_recipients(to_emails)
+        sent.extend({"to": to, "subject": prepared.subject, "raw": raw} for to in to_emails)
 
-    monkeypatch.setattr("email_marketing_backend.tasks.campaigns.send_html_email", fake_send_html_email)
+    monkeypatch.setattr(
+        "email_marketing_backend.tasks.campaigns.send_prepared_email", fake_send_prepared_email
+    )
 
     template = client.post(
         "/api/templates",
@@ -50,7 +56,636 @@ def test_campaign_send_to_all_contacts(client, auth_headers, monkeypatch):
     queued = client.post(f"/api/campaigns/{campaign_id}/send", headers=auth_headers)
     assert queued.status_code == 202
     assert len(sent) == 2
+    assert {item["subject"] for item in sent} == {"Hello"}
+    assert b"<h1>Hi</h1>" in sent[0]["raw"]
 
     sends = client.get(f"/api/campaigns/{campaign_id}/sends", headers=auth_headers)
     assert sends.status_code == 200
     assert len(sends.get_json()["data"]) == 2
+
+
+def test_campaign_fans_out_into_batches(client, auth_headers, monkeypatch):
+    from email_marketing_backend.db.models import Campaign, Contact
+    from email_marketing_backend.extensions import db
+    from email_marketing_backend.tasks import campaigns as campaign_tasks
+
+    me = client.get("/api/auth/me", headers=auth_headers).get_json()
+    org_id = me["user"]["organization_id"]
+    db.session.add_all(
+        [Contact(email=f"user{idx}@example.com", organization_id=org_id) for idx in range(7)]
+    )
+    db.session.commit()
+
+    template = client.post(
+        "/api/templates",
+        json={"name": "Batch", "subject": "Hello", "html": "<p>Hi</p>"},
+        headers=auth_headers,
+    ).get_json()["data"]
+    campaign_id = client.post(
+        "/api/campaigns",
+        json={"name": "Batches", "template_id": template["id"]},
+        headers=auth_headers,
+    ).get_json()["data"]["id"]
+
+    sent = []
+    monkeypatch.setattr(
+        campaign_tasks, "send_prepared_email", lambda prepared, to_emails: sent.extend(to_emails)
+    )
+    client.application.config["CAMPAIGN_BATCH_SIZE"] = 3
+
+    dispatched = {}
+
+    def fake_chord(header):
+        def apply(callback):
+            dispatched["header"] = list(header.tasks)
+            dispatched["callback"] = callback
+
+        return apply
+
+    monkeypatch.setattr(campaign_tasks, "chord", fake_chord)
+
+    summary = campaign_tasks.dispatch_campaign(campaign_id)
+    assert summary == {"status": "dispatched", "campaign_id": campaign_id, "batches": 3}
+
+    results = [
+        campaign_tasks.send_campaign_batch(*signature.args) for signature in dispatched["header"]
+    ]
+    assert [result["recipients"] for result in results] == [3, 3, 1]
+    assert sorted(sent) == sorted(f"user{idx}@example.com" for idx in range(7))
+
+    final = campaign_tasks.finalize_campaign(*dispatched["callback"].args, results)
+    assert final["status"] == "sent"
+    assert db.session.get(Campaign, campaign_id).status == "sent"
+
+
+def test_campaign_batch_async_dispatch_mode(client, auth_headers):
+    from sqlalchemy import select
+
+    from email_marketing_backend.db.models import Contact, EmailSend
+    from email_marketing_backend.extensions import db
+    from email_marketing_backend.services.smtp_sink import SMTPSink
+    from email_marketing_backend.tasks.campaigns import send_campaign
+
+    me = client.get("/api/auth/me", headers=auth_headers).get_json()
+    org_id = me["user"]["organization_id"]
+    db.session.add_all(
+        [Contact(email=f"async{idx}@example.com", organization_id=org_id) for idx in range(12)]
+    )
+    db.session.commit()
+    template = client.post(
+        "/api/templates",
+        json={"name": "Async", "subject": "Hello", "html": "<p>Hi</p>"},
+        headers=auth_headers,
+    ).get_json()["data"]
+    campaign_id = client.post(
+        "/api/campaigns",
+        json={"name": "Async", "template_id": template["id"]},
+        headers=auth_headers,
+    ).get_json()["data"]["id"]
+
+    with SMTPSink() as sink:
+        sink.rcpt_handler = lambda addr: (550, "Unknown") if addr == "async3@example.com" else None
+        client.application.config.update(
+            SMTP_HOST=sink.host,
+            SMTP_PORT=sink.port,
+            SMTP_DISPATCH_MODE="async",
+            SMTP_ASYNC_CONCURRENCY=3,
+        )
+        summary = send_campaign(campaign_id)
+
+    assert summary["status"] == "partial"
+    assert summary["recipients"] == 12
+    assert sink.message_count == 11
+    assert sink.connection_count == 3
+    statuses = dict(
+        db.session.execute(
+            select(EmailSend.to_email, EmailSend.status).where(EmailSend.campaign_id == campaign_id)
+        ).all()
+    )
+    assert statuses["async3@example.com"] == "failed"
+    assert list(statuses.values()).count("sent") == 11
+
+
+def test_campaign_groups_recipients_per_domain(client, auth_headers):
+    from sqlalchemy import select
+
+    from email_marketing_backend.db.models import Contact, EmailSend
+    from email_marketing_backend.extensions import db
+    from email_marketing_backend.services.smtp_sink import SMTPSink
+    from email_marketing_backend.tasks.campaigns import send_campaign
+
+    me = client.get("/api/auth/me", headers=auth_headers).get_json()
+    org_id = me["user"]["organization_id"]
+    emails = [f"g{idx}@gmail.test" for idx in range(7)]
+    emails += [f"o{idx}@outlook.test" for idx in range(3)]
+    db.session.add_all([Contact(email=email, organization_id=org_id) for email in emails])
+    db.session.commit()
+    template = client.post(
+        "/api/templates",
+        json={"name": "Grouped", "subject": "Hello", "html": "<p>Hi</p>"},
+        headers=auth_headers,
+    ).get_json()["data"]
+    campaign_id = client.post(
+        "/api/campaigns",
+        json={"name": "Grouped", "template_id": template["id"]},
+        headers=auth_headers,
+    ).get_json()["data"]["id"]
+
+    with SMTPSink() as sink:
+        sink.rcpt_handler = lambda addr: (550, "Unknown") if addr == "g2@gmail.test" else None
+        client.application.config.update(
+            SMTP_HOST=sink.host, SMTP_PORT=sink.port, SMTP_MAX_RCPT_PER_TRANSACTION=5
+        )
+        summary = send_campaign(campaign_id)
+
+    assert summary == {
+        "status": "partial",
+        "campaign_id": campaign_id,
+        "recipients": 10,
+        "failures": 1,
+    }
+    assert sorted(len(message.rcpt_tos) for message in sink.messages) == [2, 3, 4]
+    assert all(b"To: undisclosed-recipients:;" in message.data for message in sink.messages)
+    rows = db.session.execute(
+        select(EmailSend.to_email, EmailSend.status, EmailSend.error).where(
+            EmailSend.campaign_id == campaign_id
+        )
+    ).all()
+    failed = [row for row in rows if row.status == "failed"]
+    assert [row.to_email for row in failed] == ["g2@gmail.test"]
+    assert "550" in failed[0].error
+
+
+@pytest.mark.parametrize("dispatch_mode", ["sync", "async"])
+def test_deferred_transaction_penalizes_its_domain_once(
+    client, auth_headers, monkeypatch, dispatch_mode
+):
+    from email_marketing_backend.db.models import Contact
+    from email_marketing_backend.extensions import db
+    from email_marketing_backend.services.smtp_sink import SMTPSink
+    from email_marketing_backend.services.throttle import MemoryThrottleStore, SendThrottle
+    from email_marketing_backend.tasks import campaigns as campaign_tasks
+
+    me = client.get("/api/auth/me", headers=auth_headers).get_json()
+    org_id = me["user"]["organization_id"]
+    db.session.add_all(
+        [Contact(email=f"busy{idx}@gmail.test", organization_id=org_id) for idx in range(4)]
+    )
+    db.session.commit()
+    template = client.post(
+        "/api/templates",
+        json={"name": "Busy", "subject": "Hello", "html": "<p>Hi</p>"},
+        headers=auth_headers,
+    ).get_json()["data"]
+    campaign_id = client.post(
+        "/api/campaigns",
+        json={"name": "Busy", "template_id": template["id"]},
+        headers=auth_headers,
+    ).get_json()["data"]["id"]
+
+    store = MemoryThrottleStore()
+    throttle = SendThrottle(store, domain_rate=1000, backoff_factor=0.5)
+    monkeypatch.setattr(campaign_tasks, "get_send_throttle", lambda: throttle)
+    monkeypatch.setattr(campaign_tasks, "schedule_retry", lambda *args: None)
+    with SMTPSink(rcpt_handler=lambda addr: (421, "Try again later")) as sink:
+        client.application.config.update(
+            SMTP_HOST=sink.host,
+            SMTP_PORT=sink.port,
+            SMTP_MAX_RCPT_PER_TRANSACTION=5,
+            SMTP_DISPATCH_MODE=dispatch_mode,
+        )
+        summary = campaign_tasks.send_campaign(campaign_id)
+
+    assert summary["deferred"] == 4
+    # One 421 for a four-recipient transaction halves gmail.test's rate once.
+    factor, _ts = store._factors["throttle:factor:domain:gmail.test"]
+    assert factor == pytest.approx(0.5)
+
+
+def test_interrupted_batch_resumes_without_resending(client, auth_headers, monkeypatch):
+    from datetime import datetime, timedelta, timezone
+
+    from sqlalchemy import update
+
+    from email_marketing_backend.db.models import Campaign, CampaignBatch, Contact
+    from email_marketing_backend.extensions import db
+    from email_marketing_backend.tasks import campaigns as campaign_tasks
+
+    me = client.get("/api/auth/me", headers=auth_headers).get_json()
+    org_id = me["user"]["organization_id"]
+    db.session.add_all(
+        [Contact(email=f"resume{idx}@example.com", organization_id=org_id) for idx in range(10)]
+    )
+    db.session.commit()
+    template = client.post(
+        "/api/templates",
+        json={"name": "Resume", "subject": "Hello", "html": "<p>Hi</p>"},
+        headers=auth_headers,
+    ).get_json()["data"]
+    campaign_id = client.post(
+        "/api/campaigns",
+        json={"name": "Resume", "template_id": template["id"]},
+        headers=auth_headers,
+    ).get_json()["data"]["id"]
+    client.application.config.update(SEND_LOG_FLUSH_SIZE=3)
+
+    sent = []
+
+    def crashing_send(prepared, to_emails):
+        if len(sent) == 7:
+            raise KeyboardInterrupt("worker killed")
+        sent.extend(to_emails)
+
+    monkeypatch.setattr(campaign_tasks, "send_prepared_email", crashing_send)
+    campaign = db.session.get(Campaign, campaign_id)
+    (batch,) = campaign_tasks.ensure_batches(campaign)
+    try:
+        campaign_tasks.send_campaign_batch(campaign_id, batch.id)
+    except KeyboardInterrupt:
+        db.session.rollback()
+
+    batch = db.session.get(CampaignBatch, batch.id)
+    assert batch.status == "sending"
+    assert batch.sent == 6  # two full chunks checkpointed, the third was in flight
+
+    monkeypatch.setattr(
+        campaign_tasks, "send_prepared_email", lambda prepared, to_emails: sent.extend(to_emails)
+    )
+    # Until the batch stalls it may still have a live worker: resuming is refused.
+    db.session.get(Campaign, campaign_id).status = "sending"
+    db.session.commit()
+    response = client.post(f"/api/campaigns/{campaign_id}/resume", headers=auth_headers)
+    assert response.status_code == 409
+    assert "none has stalled" in response.get_data(as_text=True)
+    assert campaign_tasks.send_campaign(campaign_id)["status"] == "sending"
+    assert len(sent) == 7
+
+    db.session.execute(
+        update(CampaignBatch)
+        .where(CampaignBatch.id == batch.id)
+        .values(updated_at=datetime.now(tz=timezone.utc) - timedelta(hours=1))
+    )
+    db.session.commit()
+    summary = campaign_tasks.send_campaign(campaign_id)
+
+    assert summary["status"] == "sent"
+    assert summary["recipients"] == 10
+    assert sorted(sent) == sorted(f"resume{idx}@example.com" for idx in range(10))
+
+
+def test_transient_failures_are_retried_before_finalizing(client, auth_headers, monkeypatch):
+    from sqlalchemy import select
+
+    from email_marketing_backend.db.models import Contact, EmailSend
+    from email_marketing_backend.extensions import db
+    from email_marketing_backend.services.smtp_sink import SMTPSink
+    from email_marketing_backend.tasks import campaigns as campaign_tasks
+
+    me = client.get("/api/auth/me", headers=auth_headers).get_json()
+    org_id = me["user"]["organization_id"]
+    db.session.add_all(
+        [Contact(email=f"retry{idx}@example.com", organization_id=org_id) for idx in range(4)]
+    )
+    db.session.commit()
+    template = client.post(
+        "/api/templates",
+        json={"name": "Retry", "subject": "Hello", "html": "<p>Hi</p>"},
+        headers=auth_headers,
+    ).get_json()["data"]
+    campaign_id = client.post(
+        "/api/campaigns",
+        json={"name": "Retry", "template_id": template["id"]},
+        headers=auth_headers,
+    ).get_json()["data"]["id"]
+
+    scheduled = []
+    monkeypatch.setattr(campaign_tasks, "schedule_retry", lambda *args: scheduled.append(args))
+    verdicts = {
+        "retry1@example.com": [(451, "Greylisted"), None],
+        "retry2@example.com": [(452, "Mailbox full"), (452, "Mailbox full")],
+        "retry3@example.com": [(550, "Unknown user")],
+    }
+
+    def rcpt_handler(addr):
+        pending = verdicts.get(addr)
+        return pending.pop(0) if pending else None
+
+    with SMTPSink(rcpt_handler=rcpt_handler) as sink:
+        client.application.config.update(
+            SMTP_HOST=sink.host, SMTP_PORT=sink.port, SMTP_RETRY_MAX_ATTEMPTS=2
+        )
+        first = campaign_tasks.send_campaign(campaign_id)
+        assert first["status"] == "sending"
+        assert first["deferred"] == 2
+        (retry,) = scheduled
+        assert sorted(retry[2]) == ["retry1@example.com", "retry2@example.com"]
+        assert retry[3] == 1
+
+        counts = campaign_tasks.retry_campaign_sends(*retry)
+
+    assert counts == {"sent": 1, "failed": 1, "deferred": 0}
+    assert len(scheduled) == 1
+    statuses = dict(
+        db.session.execute(
+            select(EmailSend.to_email, EmailSend.status).where(EmailSend.campaign_id == campaign_id)
+        ).all()
+    )
+    assert statuses == {
+        "retry0@example.com": "sent",
+        "retry1@example.com": "sent",
+        "retry2@example.com": "failed",
+        "retry3@example.com": "failed",
+    }
+    final = campaign_tasks.finalize_campaign(campaign_id)
+    assert final == {
+        "status": "partial",
+        "campaign_id": campaign_id,
+        "recipients": 4,
+        "failures": 2,
+    }
+
+
+def test_retry_only_settles_rows_still_deferred(client, auth_headers, monkeypatch):
+    from sqlalchemy import select
+
+    from email_marketing_backend.db.models import Campaign, CampaignBatch, Contact
+    from email_marketing_backend.extensions import db
+    from email_marketing_backend.services.smtp_sink import SMTPSink
+    from email_marketing_backend.tasks import campaigns as campaign_tasks
+
+    me = client.get("/api/auth/me", headers=auth_headers).get_json()
+    org_id = me["user"]["organization_id"]
+    db.session.add_all(
+        [Contact(email=f"settle{idx}@example.com", organization_id=org_id) for idx in range(3)]
+    )
+    db.session.commit()
+    template = client.post(
+        "/api/templates",
+        json={"name": "Settle", "subject": "Hello", "html": "<p>Hi</p>"},
+        headers=auth_headers,
+    ).get_json()["data"]
+    campaign_id = client.post(
+        "/api/campaigns",
+        json={"name": "Settle", "template_id": template["id"]},
+        headers=auth_headers,
+    ).get_json()["data"]["id"]
+
+    scheduled = []
+    monkeypatch.setattr(campaign_tasks, "schedule_retry", lambda *args: scheduled.append(args))
+    greylisted = {"settle1@example.com", "settle2@example.com"}
+    with SMTPSink() as sink:
+        sink.rcpt_handler = lambda addr: (451, "Busy") if addr in greylisted else None
+        client.application.config.update(SMTP_HOST=sink.host, SMTP_PORT=sink.port)
+        campaign_tasks.send_campaign(campaign_id)
+        (batch,) = db.session.scalars(
+            select(CampaignBatch).where(CampaignBatch.campaign_id == campaign_id)
+        ).all()
+        assert batch.deferred == 2
+
+        # settle0 was already sent, so only settle1 is still waiting on this retry.
+        greylisted.clear()
+        retry = (campaign_id, batch.id, ["settle0@example.com", "settle1@example.com"], 1)
+        assert campaign_tasks.retry_campaign_sends(*retry) == {
+            "sent": 1,
+            "failed": 0,
+            "deferred": 0,
+        }
+        db.session.refresh(batch)
+        assert (batch.sent, batch.deferred) == (2, 1)
+
+        # A redelivered copy of the same retry finds nothing left to settle.
+        assert campaign_tasks.retry_campaign_sends(*retry) == {
+            "sent": 0,
+            "failed": 0,
+            "deferred": 0,
+        }
+        db.session.refresh(batch)
+        assert (batch.sent, batch.deferred) == (2, 1)
+
+        retry = (campaign_id, batch.id, ["settle2@example.com"], 1)
+        campaign_tasks.retry_campaign_sends(*retry)
+
+    db.session.refresh(batch)
+    assert (batch.sent, batch.failed, batch.deferred) == (3, 0, 0)
+    assert db.session.get(Campaign, campaign_id).status == "sent"
+
+
+def test_broken_retry_counts_as_an_attempt(client, auth_headers, monkeypatch):
+    from sqlalchemy import select
+
+    from email_marketing_backend.db.models import Campaign, CampaignBatch, Contact, EmailSend
+    from email_marketing_backend.extensions import db
+    from email_marketing_backend.services.smtp_sink import SMTPSink
+    from email_marketing_backend.tasks import campaigns as campaign_tasks
+
+    me = client.get("/api/auth/me", headers=auth_headers).get_json()
+    org_id = me["user"]["organization_id"]
+    db.session.add_all(
+        [Contact(email=f"broken{idx}@example.com", organization_id=org_id) for idx in range(2)]
+    )
+    db.session.commit()
+    template = client.post(
+        "/api/templates",
+        json={"name": "Broken", "subject": "Hello", "html": "<p>Hi</p>"},
+        headers=auth_headers,
+    ).get_json()["data"]
+    campaign_id = client.post(
+        "/api/campaigns",
+        json={"name": "Broken", "template_id": template["id"]},
+        headers=auth_headers,
+    ).get_json()["data"]["id"]
+
+    scheduled = []
+    monkeypatch.setattr(campaign_tasks, "schedule_retry", lambda *args: scheduled.append(args))
+    with SMTPSink() as sink:
+        sink.rcpt_handler = lambda addr: (451, "Busy") if addr == "broken1@example.com" else None
+        client.application.config.update(
+            SMTP_HOST=sink.host, SMTP_PORT=sink.port, SMTP_RETRY_MAX_ATTEMPTS=3
+        )
+        assert campaign_tasks.send_campaign(campaign_id)["status"] == "sending"
+
+    def broken(*args):
+        raise RuntimeError("relay unreachable")
+
+    monkeypatch.setattr(campaign_tasks, "retry_campaign_sends", broken)
+    (retry,) = scheduled
+    # ``run`` keeps this app's config; calling the task pushes the worker app's context.
+    campaign_tasks.retry_campaign_sends_task.run(*retry)
+    assert scheduled[-1][3] == 2
+
+    counts = campaign_tasks.retry_campaign_sends_task.run(*scheduled[-1])
+
+    assert counts == {"sent": 0, "failed": 1, "deferred": 0}
+    assert len(scheduled) == 2
+    row = db.session.execute(
+        select(EmailSend.status, EmailSend.error).where(
+            EmailSend.campaign_id == campaign_id, EmailSend.to_email == "broken1@example.com"
+        )
+    ).one()
+    assert row.status == "failed" and "relay unreachable" in row.error
+    (batch,) = db.session.scalars(
+        select(CampaignBatch).where(CampaignBatch.campaign_id == campaign_id)
+    ).all()
+    db.session.refresh(batch)
+    assert (batch.sent, batch.failed, batch.deferred) == (1, 1, 0)
+    assert db.session.get(Campaign, campaign_id).status == "partial"
+
+
+def test_retry_delay_grows_exponentially_with_jitter():
+    from email_marketing_backend.tasks.campaigns import retry_delay
+
+    for attempt, ceiling in ((1, 60), (2, 120), (3, 240), (10, 3600)):
+        delays = [retry_delay(attempt, 60, 3600) for _ in range(50)]
+        assert all(ceiling / 2 <= delay <= ceiling for delay in delays)
+        assert len(set(delays)) > 1
+
+
+def test_retry_backoff_must_fit_the_visibility_timeout():
+    from pydantic import ValidationError
+
+    from email_marketing_backend.config import Settings
+
+    assert Settings(SMTP_RETRY_MAX_SECONDS=3600, CELERY_VISIBILITY_TIMEOUT=7200)
+    with pytest.raises(ValidationError, match="CELERY_VISIBILITY_TIMEOUT"):
+        Settings(SMTP_RETRY_MAX_SECONDS=3600, CELERY_VISIBILITY_TIMEOUT=3600)
+
+
+def test_campaign_stats_endpoints(client, auth_headers, monkeypatch):
+    from email_marketing_backend.db.models import Contact
+    from email_marketing_backend.extensions import db
+    from email_marketing_backend.tasks import campaigns as campaign_tasks
+
+    me = client.get("/api/auth/me", headers=auth_headers).get_json()
+    org_id = me["user"]["organization_id"]
+    db.session.add_all(
+        [Contact(email=f"stats{idx}@example.com", organization_id=org_id) for idx in range(5)]
+    )
+    db.session.commit()
+    template = client.post(
+        "/api/templates",
+        json={"name": "Stats", "subject": "Hello", "html": "<p>Hi</p>"},
+        headers=auth_headers,
+    ).get_json()["data"]
+    campaign_ids = [
+        client.post(
+            "/api/campaigns",
+            json={"name": name, "template_id": template["id"]},
+            headers=auth_headers,
+        ).get_json()["data"]["id"]
+        for name in ("Sent", "Draft")
+    ]
+
+    def fake_send(prepared, to_emails):
+        if to_emails == ["stats4@example.com"]:
+            raise smtplib.SMTPRecipientsRefused({"stats4@example.com": (550, b"Unknown")})
+
+    monkeypatch.setattr(campaign_tasks, "send_prepared_email", fake_send)
+    campaign_tasks.send_campaign(campaign_ids[0])
+
+    single = client.get(f"/api/campaigns/{campaign_ids[0]}/stats", headers=auth_headers)
+    assert single.status_code == 200
+    assert single.get_json()["data"] == {
+        "campaign_id": campaign_ids[0],
+        "status": "partial",
+        "queued": 0,
+        "sent": 4,
+        "failed": 1,
+        "deferred": 0,
+        "total": 5,
+    }
+
+    ids = ",".join(str(campaign_id) for campaign_id in campaign_ids)
+    many = client.get(f"/api/campaigns/stats?ids={ids},999999", headers=auth_headers)
+    assert many.status_code == 200
+    by_id = {item["campaign_id"]: item for item in many.get_json()["data"]}
+    assert set(by_id) == set(campaign_ids)
+    assert by_id[campaign_ids[1]]["total"] == 0
+    assert client.get("/api/campaigns/999999/stats", headers=auth_headers).status_code == 404
+
+
+def test_personalized_campaign_renders_merge_tags_per_contact(client, auth_headers):
+    from email import message_from_bytes
+    from email.policy import default
+
+    from email_marketing_backend.db.models import Contact
+    from email_marketing_backend.extensions import db
+    from email_marketing_backend.services.smtp_sink import SMTPSink
+    from email_marketing_backend.tasks.campaigns import send_campaign
+
+    me = client.get("/api/auth/me", headers=auth_headers).get_json()
+    org_id = me["user"]["organization_id"]
+    db.session.add_all(
+        [
+            Contact(email="ana@gmail.test", first_name="Ana", organization_id=org_id),
+            Contact(email="bo@gmail.test", first_name="<Bo>", organization_id=org_id),
+            Contact(email="cy@gmail.test", organization_id=org_id),
+        ]
+    )
+    db.session.commit()
+
+    rejected = client.post(
+        "/api/templates",
+        json={"name": "Typo", "subject": "Hi", "html": "<p>{{ frist_name }}</p>"},
+        headers=auth_headers,
+    )
+    assert rejected.status_code == 400
+    assert "frist_name" in rejected.get_json()["error"]["message"]
+
+    template = client.post(
+        "/api/templates",
+        json={
+            "name": "Personal",
+            "subject": "Hi {{ first_name | there }}",
+            "html": "<p>Dear {{first_name|friend}}, you are {{ email }}</p>",
+        },
+        headers=auth_headers,
+    ).get_json()["data"]
+    campaign_id = client.post(
+        "/api/campaigns",
+        json={"name": "Personal", "template_id": template["id"]},
+        headers=auth_headers,
+    ).get_json()["data"]["id"]
+
+    with SMTPSink() as sink:
+        client.application.config.update(
+            SMTP_HOST=sink.host, SMTP_PORT=sink.port, SMTP_MAX_RCPT_PER_TRANSACTION=5
+        )
+        summary = send_campaign(campaign_id)
+
+    assert summary["status"] == "sent"
+    # Personalized mail is never shared across a domain group.
+    assert [message.rcpt_tos for message in sink.messages] == [
+        ["ana@gmail.test"],
+        ["bo@gmail.test"],
+        ["cy@gmail.test"],
+    ]
+    parsed = [message_from_bytes(message.data, policy=default) for message in sink.messages]
+    assert [msg["Subject"] for msg in parsed] == ["Hi Ana", "Hi <Bo>", "Hi there"]
+    bodies = [msg.get_body(("html",)).get_content() for msg in parsed]
+    assert "<p>Dear Ana, you are ana@gmail.test</p>" in bodies[0]
+    assert "<p>Dear &lt;Bo&gt;, you are bo@gmail.test</p>" in bodies[1]
+    assert "<p>Dear friend, you are cy@gmail.test</p>" in bodies[2]
+
+
+def test_campaign_list_returns_summaries(client, auth_headers):
+    template = client.post(
+        "/api/templates",
+        json={"name": "List", "subject": "Hello", "html": "<p>Hi</p>"},
+        headers=auth_headers,
+    ).get_json()["data"]
+    for name, extra in (
+        ("Everyone", {}),
+        ("Few", {"audience_type": "custom", "recipients": ["a@example.com", "b@example.com"]}),
+    ):
+        client.post(
+            "/api/campaigns",
+            json={"name": name, "template_id": template["id"], **extra},
+            headers=auth_headers,
+        )
+
+    listing = client.get("/api/campaigns", headers=auth_headers).get_json()
+
+    assert listing["next_cursor"] is None
+    counts = {item["name"]: item["recipient_count"] for item in listing["data"]}
+    assert counts == {"Everyone": None, "Few": 2}
+    assert "recipients" not in listing["data"][0]
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import io
+import os
+from types import SimpleNamespace
+
+from sqlalchemy import select
+
+from email_marketing_backend.db.models import Contact, ContactImport
+from email_marketing_backend.extensions import db
+from email_marketing_backend.services.contact_import import normalize_emails, run_contact_import
+
+
+def _org_id(client, auth_headers) -> int:
+    return client.get("/api/auth/me", headers=auth_headers).get_json()["user"]["organization_id"]
+
+
+def test_normalize_emails_matches_single_contact_rules():
+    assert normalize_emails(
+        [
+            " Bob.Smith@Example.COM ",
+            "a..b@example.com",
+            "no-at-sign",
+            "someone@host.test",
+            "",
+            None,
+            "ü@exämple.de",
+            "ivan@Example.XN--P1AI",
+        ]
+    ) == [
+        "Bob.Smith@example.com",
+        None,
+        None,
+        None,
+        None,
+        None,
+        "ü@exämple.de",
+        "ivan@example.рф",
+    ]
+
+
+def test_import_upserts_contacts_and_reports_rejects(
+    app, client, auth_headers, monkeypatch, tmp_path
+):
+    app.config.update(CONTACT_IMPORT_DIR=str(tmp_path), CONTACT_IMPORT_CHUNK_SIZE=3)
+    org_id = _org_id(client, auth_headers)
+    client.post(
+        f"/api/organizations/{org_id}/contacts",
+        json={"email": "kept@example.com", "first_name": "Kept", "last_name": "Name"},
+        headers=auth_headers,
+    )
+    queued = []
+    monkeypatch.setattr(
+        "email_marketing_backend.api.routes.import_contacts_task.delay",
+        lambda import_id: queued.append(import_id) or SimpleNamespace(id="eager-task"),
+    )
+
+    csv_data = (
+        "E-mail,First Name,Last Name,Plan\n"
+        "new@Example.com,New,Person,pro\n"
+        "not-an-email,X,Y,free\n"
+        "kept@example.com,,Renamed,free\n"
+        "\n"
+        ",Nobody,Here,free\n"
+        "dup@example.com,First,Dup,pro\n"
+        "dup@example.com,Second,Dup,pro\n"
+    )
+    response = client.post(
+        f"/api/organizations/{org_id}/contacts/imports",
+        data={"file": (io.BytesIO(csv_data.encode()), "contacts.csv")},
+        headers=auth_headers,
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 202
+    created = response.get_json()["data"]
+    assert created["status"] == "queued"
+    assert created["size_bytes"] == len(csv_data.encode())
+    assert len(os.listdir(tmp_path)) == 1
+
+    assert run_contact_import(queued[0])["status"] == "completed"
+    assert os.listdir(tmp_path) == []
+
+    status = client.get(
+        f"/api/organizations/{org_id}/contacts/imports/{queued[0]}", headers=auth_headers
+    ).get_json()["data"]
+    assert status["status"] == "completed"
+    assert status["progress"] == 1.0
+    # The second dup@ row lands in the next chunk and updates the first one.
+    assert (status["processed_rows"], status["created"], status["updated"]) == (7, 2, 2)
+    assert status["rejected"] == 2
+
+    rows = db.session.execute(
+        select(Contact.email, Contact.first_name, Contact.last_name)
+        .where(Contact.organization_id == org_id)
+        .order_by(Contact.email)
+    ).all()
+    assert [tuple(row) for row in rows] == [
+        ("dup@example.com", "Second", "Dup"),
+        ("kept@example.com", "Kept", "Renamed"),
+        ("new@example.com", "New", "Person"),
+    ]
+
+    url = f"/api/organizations/{org_id}/contacts/imports/{queued[0]}/rejects"
+    first = client.get(f"{url}?limit=1", headers=auth_headers).get_json()
+    assert first["data"] == [{"row": 2, "email": "not-an-email", "reason": "invalid email"}]
+    rest = client.get(f"{url}?after={first['next_after']}", headers=auth_headers).get_json()
+    assert rest["data"] == [{"row": 5, "email": None, "reason": "missing email"}]
+    assert rest["next_after"] is None
+
+
+def test_import_resumes_after_last_committed_chunk(app, client, auth_headers, tmp_path):
+    org_id = _org_id(client, auth_headers)
+    path = tmp_path / "resume.csv"
+    path.write_text("email\na@example.com\nb@example.com\nc@example.com\n")
+    record = ContactImport(
+        organization_id=org_id,
+        status="running",
+        upload_path=str(path),
+        size_bytes=path.stat().st_size,
+        processed_rows=2,
+    )
+    db.session.add(record)
+    db.session.commit()
+
+    summary = run_contact_import(record.id, chunk_size=2)
+
+    assert summary["created"] == 1
+    emails = db.session.scalars(select(Contact.email).where(Contact.organization_id == org_id))
+    assert list(emails) == ["c@example.com"]
+
+
+def test_import_rejects_upload_without_email_column(app, client, auth_headers, tmp_path):
+    app.config.update(CONTACT_IMPORT_DIR=str(tmp_path))
+    org_id = _org_id(client, auth_headers)
+
+    response = client.post(
+        f"/api/organizations/{org_id}/contacts/imports",
+        data=b"name,phone\nNova,555\n",
+        headers={**auth_headers, "Content-Type": "text/csv"},
+    )
+
+    assert response.status_code == 400
+    assert "email column" in response.get_json()["error"]["message"]
+    assert os.listdir(tmp_path) == []
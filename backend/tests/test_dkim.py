@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import base64
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from email_marketing_backend.services import dkim as dkim_module
+from email_marketing_backend.services.dkim import DKIMSigner, canonical_body, canonical_header
+from email_marketing_backend.services.email import get_dkim_signer, prepare_html_email
+
+
+@pytest.fixture(scope="module")
+def rsa_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=1024)
+
+
+@pytest.fixture
+def signing_app(app, tmp_path, rsa_key):
+    key_path = tmp_path / "dkim.pem"
+    key_path.write_bytes(
+        rsa_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    app.config.update(DKIM_PRIVATE_KEY_PATH=str(key_path), DKIM_SELECTOR="mail")
+    return app
+
+
+def test_relaxed_canonicalization():
+    assert (
+        canonical_header(b"Subject ", b" Hello \t  world\r\n again ")
+        == b"subject:Hello world again"
+    )
+    assert canonical_body(b"a  b \t\r\n\r\nc\r\n\r\n\r\n") == b"a b\r\n\r\nc\r\n"
+    assert canonical_body(b"\r\n\r\n") == b""
+
+
+def test_body_is_hashed_once_per_prepared_message(signing_app, monkeypatch):
+    calls = []
+    original = dkim_module.canonical_body
+    monkeypatch.setattr(
+        dkim_module, "canonical_body", lambda body: calls.append(1) or original(body)
+    )
+
+    prepared = prepare_html_email(subject="Hi", html="<p>x</p>", from_email="news@example.test")
+    copies = [prepared.for_recipient(f"r{idx}@example.com") for idx in range(5)]
+
+    assert len(calls) == 1
+    assert get_dkim_signer() is get_dkim_signer()
+    signatures = {copy.split(b"\r\n", 1)[0] for copy in copies}
+    assert len(signatures) == 5
+    assert all(f"bh={prepared.dkim.body_hash.decode()};".encode() in sig for sig in signatures)
+    assert all(b"d=example.test; s=mail;" in sig for sig in signatures)
+
+
+def test_signatures_verify(signing_app, rsa_key):
+    dkim = pytest.importorskip("dkim")
+    public = rsa_key.public_key().public_bytes(
+        serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    record = b"v=DKIM1; k=rsa; p=" + base64.b64encode(public)
+
+    prepared = prepare_html_email(
+        subject="Grüße  aus Berlin", html="<p>Héllo  </p>", from_email="Jörg <news@example.test>"
+    )
+    raw = prepared.for_recipient("a@example.com")
+
+    assert dkim.verify(raw, dnsfunc=lambda _name, timeout=5: record)
+    assert not dkim.verify(raw.replace(b"Berlin", b"Bonn"), dnsfunc=lambda _name, timeout=5: record)
+
+
+def test_signer_rejects_unsupported_keys():
+    from cryptography.hazmat.primitives.asymmetric import ec
+
+    with pytest.raises(ValueError):
+        DKIMSigner(ec.generate_private_key(ec.SECP256R1()), selector="mail")
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from email import message_from_bytes
+from email.policy import default
+
+from email_marketing_backend.services.email import (
+    PersonalizedMessage,
+    prepare_campaign_email,
+    prepare_html_email,
+    send_html_email,
+)
+from email_marketing_backend.services.smtp_sink import SMTPSink
+
+
+def test_prepared_message_splices_recipient_headers(app):
+    prepared = prepare_html_email(subject="Grüße", html="<p>Héllo</p>", text="Héllo")
+
+    first = message_from_bytes(prepared.for_recipient("a@example.com"), policy=default)
+    second = message_from_bytes(prepared.for_recipient("b@example.com"), policy=default)
+
+    assert first["To"] == "a@example.com"
+    assert second["To"] == "b@example.com"
+    assert first["Message-ID"] != second["Message-ID"]
+    assert first["Subject"] == "Grüße"
+    assert first.get_body(("html",)).get_content().strip() == "<p>Héllo</p>"
+    assert first.get_body(("plain",)).get_content().strip() == "Héllo"
+
+
+def test_personalized_message_renders_subject_and_body_per_row(app):
+    message = prepare_campaign_email(
+        subject="Grüße, {{ first_name | Freund }}", html="<p>Hallo {{ first_name }}</p>"
+    )
+    assert isinstance(message, PersonalizedMessage)
+
+    raw = message.for_row(("a@example.com", "Jörg", None)).for_recipient("a@example.com")
+    parsed = message_from_bytes(raw, policy=default)
+
+    assert parsed["To"] == "a@example.com"
+    assert parsed["Subject"] == "Grüße, Jörg"
+    assert parsed.get_body(("html",)).get_content().strip() == "<p>Hallo Jörg</p>"
+    assert "HTML-capable" in parsed.get_body(("plain",)).get_content()
+    static = prepare_campaign_email(subject="Hi", html="<p>x</p>")
+    assert not isinstance(static, PersonalizedMessage)
+
+
+def test_prepared_message_strips_header_injection(app):
+    prepared = prepare_html_email(subject="Hi", html="<p>x</p>")
+    raw = prepared.for_recipient("a@example.com\r\nBcc: victim@example.com")
+    assert b"\r\nBcc:" not in raw
+
+
+def test_send_html_email_over_smtp(app):
+    with SMTPSink() as sink:
+        app.config.update(SMTP_HOST=sink.host, SMTP_PORT=sink.port)
+        send_html_email(to_email="a@example.com", subject="One", html="<p>1</p>")
+        send_html_email(to_email="b@example.com", subject="Two", html="<p>2</p>")
+
+    assert [message.rcpt_tos for message in sink.messages] == [["a@example.com"], ["b@example.com"]]
+    assert sink.connection_count == 1
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import logging
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+
+from email_marketing_backend import create_app
+from email_marketing_backend.config import settings
+from email_marketing_backend.extensions import db
+from email_marketing_backend.instrumentation import (
+    _report_task_sql_stats,
+    _start_task_sql_stats,
+    normalize_sql,
+)
+
+LOGGER = "email_marketing_backend.instrumentation"
+
+
+@pytest.fixture()
+def instrumented_app(monkeypatch):
+    monkeypatch.setattr(settings, "sql_stats_enabled", True)
+    # Low enough that every statement counts as slow.
+    monkeypatch.setattr(settings, "sql_slow_query_ms", 0.000001)
+    app = create_app()
+    app.config.update(TESTING=True)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_normalize_sql_collapses_literals_and_lists():
+    assert normalize_sql(
+        "SELECT *\n  FROM contacts\n WHERE email = 'a@b.com' AND id IN (?, ?, ?) LIMIT 10"
+    ) == "SELECT * FROM contacts WHERE email = ? AND id IN (...) LIMIT ?"
+    assert normalize_sql(
+        "INSERT INTO t (a, b) VALUES (%(a_1)s, %(b_1)s)"
+    ) == "INSERT INTO t (a, b) VALUES (...)"
+
+
+def test_disabled_instrumentation_adds_no_listeners_or_headers(app, client, auth_headers):
+    assert not db.engine.dispatch.after_cursor_execute
+    response = client.get("/api/auth/me", headers=auth_headers)
+    assert "Server-Timing" not in response.headers
+
+
+def test_request_reports_sql_stats(instrumented_app, caplog):
+    client = instrumented_app.test_client()
+    client.post(
+        "/api/auth/register",
+        json={"email": "admin@admin.com", "password": "secret", "organization": "test-org"},
+    )
+    token = client.post(
+        "/api/auth/login", json={"email": "admin@admin.com", "password": "secret"}
+    ).get_json()["access_token"]
+
+    with caplog.at_level(logging.INFO, logger=LOGGER):
+        response = client.get("/api/auth/me", headers={"Authorization": f"Bearer {token}"})
+
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("db;dur=") and "db-slowest;dur=" in timing
+    record = next(r for r in caplog.records if getattr(r, "path", None) == "/api/auth/me")
+    assert record.sql_count >= 1
+    assert f'desc="{record.sql_count} queries"' in timing
+    assert record.sql_slowest.startswith("SELECT")
+
+
+def test_slow_statements_are_logged_normalized(instrumented_app, caplog):
+    with caplog.at_level(logging.WARNING, logger=LOGGER):
+        db.session.execute(text("SELECT 1 WHERE 'x' = 'x'"))
+
+    slow = [r for r in caplog.records if r.getMessage().startswith("Slow SQL statement")]
+    assert slow and slow[0].sql == "SELECT ? WHERE ? = ?"
+
+
+def test_task_reports_sql_stats(instrumented_app, caplog):
+    with caplog.at_level(logging.INFO, logger=LOGGER):
+        _start_task_sql_stats(task_id="task-1")
+        db.session.execute(text("SELECT 1"))
+        db.session.execute(text("SELECT 2"))
+        _report_task_sql_stats(
+            task_id="task-1", task=SimpleNamespace(name="tasks.example"), state="SUCCESS"
+        )
+
+    record = next(r for r in caplog.records if getattr(r, "task_id", None) == "task-1")
+    assert record.task == "tasks.example"
+    assert record.sql_count == 2
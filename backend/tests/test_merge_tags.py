@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import pytest
+
+from email_marketing_backend.services.merge_tags import (
+    MergeTagError,
+    address_row,
+    compile_template,
+)
+
+
+def test_compiled_template_renders_values_and_fallbacks():
+    compiled = compile_template('Hi {{ first_name | "dear reader" }} {{last_name}} <{{ EMAIL }}>')
+
+    assert compiled.fields == ("first_name", "last_name", "email")
+    assert compiled.render(("a@x.test", "Ana", "Okafor")) == "Hi Ana Okafor <a@x.test>"
+    assert compiled.render(("b@x.test", "", None)) == "Hi dear reader  <b@x.test>"
+    assert compiled.render(address_row("c@x.test")) == "Hi dear reader  <c@x.test>"
+
+
+def test_html_templates_escape_values_but_not_literals():
+    compiled = compile_template("<b>{{ first_name | <i>you</i> }}</b>", html=True)
+
+    assert compiled.render(("a@x.test", "<script>", None)) == "<b>&lt;script&gt;</b>"
+    assert compiled.render(("a@x.test", None, None)) == "<b><i>you</i></b>"
+
+
+def test_templates_without_tags_render_verbatim():
+    compiled = compile_template("{ not a tag } {{ }}")
+    assert not compiled.personalized
+    assert compiled.render(("a@x.test", "Ana", None)) == "{ not a tag } {{ }}"
+
+
+def test_unknown_fields_are_rejected_at_compile_time():
+    with pytest.raises(MergeTagError, match="company"):
+        compile_template("Hello {{ company }}")
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+
+from email_marketing_backend.db.models import Campaign, EmailTemplate, Organization
+from email_marketing_backend.extensions import db
+from email_marketing_backend.metrics import InstrumentedQueuePool
+from email_marketing_backend.services.send_log import EmailSendWriter
+from email_marketing_backend.services.smtp_pool import SMTPConnectionPool
+from email_marketing_backend.services.smtp_sink import SMTPSink
+from email_marketing_backend.services.template_cache import RenderedTemplate, TemplateCache
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_metrics_endpoint_reports_request_latency(client, auth_headers):
+    labels = {"method": "GET", "blueprint": "auth", "endpoint": "auth.me", "status": "200"}
+    before = sample("http_request_duration_seconds_count", **labels)
+
+    client.get("/api/auth/me", headers=auth_headers)
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    assert "http_request_duration_seconds_bucket" in response.get_data(as_text=True)
+    assert sample("http_request_duration_seconds_count", **labels) == before + 1
+
+
+def test_pool_reports_checkouts_and_overflow(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+    )
+    checkouts = sample("db_pool_checkouts_total")
+    waits = sample("db_pool_wait_seconds_count")
+    try:
+        with engine.connect() as first, engine.connect() as second:
+            first.execute(text("SELECT 1"))
+            second.execute(text("SELECT 1"))
+            assert sample("db_pool_checked_out") == 2
+            assert sample("db_pool_overflow") == 1
+        assert sample("db_pool_checked_out") == 0
+    finally:
+        engine.dispose()
+    assert sample("db_pool_checkouts_total") == checkouts + 2
+    assert sample("db_pool_wait_seconds_count") == waits + 2
+
+
+def test_smtp_pool_reports_connect_and_send_latency():
+    connects = sample("smtp_operation_duration_seconds_count", operation="connect")
+    sends = sample("smtp_operation_duration_seconds_count", operation="send")
+
+    with SMTPSink() as sink:
+        pool = SMTPConnectionPool(host=sink.host, port=sink.port, timeout=5)
+        for idx in range(3):
+            pool.sendmail("from@example.com", [f"to{idx}@example.com"], b"Subject: hi\r\n\r\nx\r\n")
+        pool.close()
+
+    assert sample("smtp_operation_duration_seconds_count", operation="connect") == connects + 1
+    assert sample("smtp_operation_duration_seconds_count", operation="send") == sends + 3
+
+
+def test_send_writer_counts_emails_by_status(app):
+    org = Organization(name="Metrics Org", slug="metrics-org")
+    db.session.add(org)
+    db.session.flush()
+    template = EmailTemplate(organization_id=org.id, name="T", html="<p>x</p>")
+    db.session.add(template)
+    db.session.flush()
+    campaign = Campaign(organization_id=org.id, name="C", template_id=template.id)
+    db.session.add(campaign)
+    db.session.commit()
+    sent = sample("emails_total", status="sent")
+    failed = sample("emails_total", status="failed")
+
+    with EmailSendWriter(
+        organization_id=campaign.organization_id, campaign_id=campaign.id
+    ) as writer:
+        writer.queue(["a@example.com", "b@example.com", "c@example.com"])
+        writer.record("a@example.com", "sent")
+        writer.record("b@example.com", "sent")
+        writer.record("c@example.com", "failed", "550 mailbox unavailable")
+
+    assert sample("emails_total", status="sent") == sent + 2
+    assert sample("emails_total", status="failed") == failed + 1
+
+
+def test_template_cache_counts_hits_misses_and_evictions():
+    hits = sample("template_cache_lookups_total", result="hit")
+    misses = sample("template_cache_lookups_total", result="miss")
+    evictions = sample("template_cache_evictions_total")
+
+    cache = TemplateCache(max_bytes=15)
+    cache.put(RenderedTemplate(1, "v1", None, "x" * 10, "", "hash"))
+    cache.get(1, "v1")
+    cache.get(2, "v1")
+    cache.put(RenderedTemplate(2, "v1", None, "x" * 10, "", "hash"))
+
+    assert sample("template_cache_lookups_total", result="hit") == hits + 1
+    assert sample("template_cache_lookups_total", result="miss") == misses + 1
+    assert sample("template_cache_evictions_total") == evictions + 1
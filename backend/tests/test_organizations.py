@@ -60,3 +60,31 @@ def test_duplicate_contact_returns_conflict(client: FlaskClient, auth_headers):
         headers=auth_headers,
     )
     assert response.status_code == 409
+
+
+def test_list_contacts_pages_by_id_with_field_selection(client: FlaskClient, auth_headers):
+    me = client.get("/api/auth/me", headers=auth_headers).get_json()
+    org_id = me["user"]["organization_id"]
+    db.session.add_all(
+        Contact(email=f"c{idx}@example.com", first_name=f"C{idx}", organization_id=org_id)
+        for idx in range(5)
+    )
+    db.session.commit()
+    url = f"/api/organizations/{org_id}/contacts"
+
+    first = client.get(f"{url}?limit=2&fields=email", headers=auth_headers).get_json()
+    assert first["data"] == [
+        {"id": first["data"][0]["id"], "email": "c0@example.com"},
+        {"id": first["data"][1]["id"], "email": "c1@example.com"},
+    ]
+
+    emails, after = [], first["next_after"]
+    while after is not None:
+        page = client.get(f"{url}?limit=2&after={after}", headers=auth_headers).get_json()
+        emails += [item["email"] for item in page["data"]]
+        after = page["next_after"]
+    assert emails == ["c2@example.com", "c3@example.com", "c4@example.com"]
+    assert page["data"][-1]["first_name"] == "C4"
+
+    response = client.get(f"{url}?fields=email,password", headers=auth_headers)
+    assert response.status_code == 400
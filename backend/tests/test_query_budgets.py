@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import pytest
+
+from email_marketing_backend.db.models import Campaign, Contact, EmailSend, EmailTemplate
+from email_marketing_backend.extensions import db
+
+# Declared cost of each read endpoint against the workspace seeded below:
+# (path, max SQL statements, max rows read). Paths are formatted with the
+# seeded ids. Raise a budget only when the extra queries are intended.
+BUDGETS = [
+    # user, roles, permissions: one row per role and per permission, not their product.
+    ("/api/auth/me", 3, 15),
+    ("/api/organizations/{org_id}/contacts", 2, 41),
+    ("/api/organizations/{org_id}/contacts?fields=email&limit=10", 2, 12),
+    ("/api/templates", 1, 5),
+    ("/api/templates/{template_id}", 1, 1),
+    ("/api/campaigns", 1, 5),
+    ("/api/campaigns/{campaign_id}", 1, 1),
+    ("/api/campaigns/{campaign_id}/sends", 2, 21),
+    ("/api/campaigns/{campaign_id}/stats", 2, 2),
+    ("/api/campaigns/stats?ids={campaign_id}", 2, 2),
+]
+
+
+@pytest.fixture()
+def workspace(client, auth_headers):
+    me = client.get("/api/auth/me", headers=auth_headers).get_json()
+    org_id = me["user"]["organization_id"]
+    user_id = me["user"]["id"]
+    db.session.add_all(
+        Contact(email=f"budget{idx}@example.com", organization_id=org_id) for idx in range(40)
+    )
+    templates = [
+        EmailTemplate(
+            organization_id=org_id,
+            created_by_user_id=user_id,
+            name=f"Budget {idx}",
+            html="<p>Hi</p>",
+        )
+        for idx in range(5)
+    ]
+    db.session.add_all(templates)
+    db.session.flush()
+    campaigns = [
+        Campaign(
+            organization_id=org_id,
+            created_by_user_id=user_id,
+            name=f"Budget {idx}",
+            template_id=templates[idx].id,
+            audience_type="custom",
+            recipients=[f"budget{n}@example.com" for n in range(20)],
+        )
+        for idx in range(5)
+    ]
+    db.session.add_all(campaigns)
+    db.session.flush()
+    db.session.add_all(
+        EmailSend(
+            organization_id=org_id,
+            campaign_id=campaigns[0].id,
+            to_email=f"budget{idx}@example.com",
+            status="sent",
+        )
+        for idx in range(20)
+    )
+    db.session.commit()
+    ids = {"org_id": org_id, "template_id": templates[0].id, "campaign_id": campaigns[0].id}
+    db.session.expunge_all()
+    return ids
+
+
+@pytest.mark.parametrize("path, statements, rows", BUDGETS)
+def test_endpoint_stays_within_query_budget(
+    client, auth_headers, workspace, query_budget, path, statements, rows
+):
+    with query_budget(statements=statements, rows=rows):
+        response = client.get(path.format(**workspace), headers=auth_headers)
+    assert response.status_code == 200
+
+
+def test_campaign_send_stays_within_query_budget(app, workspace, query_budget, monkeypatch):
+    from email_marketing_backend.tasks import campaigns as campaign_tasks
+
+    app.config.update(CAMPAIGN_BATCH_SIZE=10)
+    monkeypatch.setattr(campaign_tasks, "send_prepared_email", lambda prepared, to_emails: None)
+
+    # Two batches of ten; each campaign refresh reads exactly one row.
+    with query_budget(statements=44, rows=22):
+        summary = campaign_tasks.send_campaign(workspace["campaign_id"])
+    assert summary["status"] == "sent"
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from email_marketing_backend.services.rendering import compile_email_template
+
+
+def test_compile_inlines_simple_rules_and_keeps_the_rest():
+    compiled = compile_email_template(
+        html='<div id="wrapper">\n  <p class="lead" style="color:blue">Hi   '
+        "<b>{{ first_name }}</b></p>\n</div>",
+        css="p{color:red} .lead{margin:0} #wrapper{padding:4px} a:hover{color:green} "
+        "@media (max-width:600px){p{font-size:12px}}",
+    )
+
+    assert compiled.html == (
+        '<!doctype html><html><head><meta charset="utf-8"/>'
+        "<style>a:hover{color:green}@media (max-width:600px){p{font-size:12px}}</style></head>"
+        '<body><div id="wrapper" style="padding:4px">'
+        '<p class="lead" style="color:red;margin:0;color:blue">Hi <b>{{ first_name }}</b></p>'
+        "</div></body></html>"
+    )
+    assert compiled.text == "Hi {{ first_name }}"
+
+
+def test_text_alternative_keeps_structure_and_links():
+    compiled = compile_email_template(
+        html="<h1>News</h1><p>Read&nbsp;the <a href='https://example.test/a?x=1&amp;y=2'>post</a>"
+        "</p><ul><li>One</li><li>Two</li></ul><!-- editor note -->"
+    )
+
+    assert "editor note" not in compiled.html
+    assert compiled.text == (
+        "News\n\nRead the post (https://example.test/a?x=1&y=2)\n\n- One\n- Two"
+    )
+
+
+def test_content_hash_tracks_output():
+    first = compile_email_template(html="<p>a</p>", css="p{color:red}")
+    again = compile_email_template(html="<p>a</p>", css="p{color:red}")
+    changed = compile_email_template(html="<p>a</p>", css="p{color:blue}")
+
+    assert first.content_hash == again.content_hash != changed.content_hash
+
+
+def test_full_document_gets_leftover_rules_in_its_own_head():
+    compiled = compile_email_template(
+        html="<html><head><title>T</title></head><body><p>Hi</p></body></html>",
+        css="p{color:red} a:hover{color:green}",
+    )
+
+    assert compiled.html == (
+        "<html><head><title>T</title><style>a:hover{color:green}</style></head>"
+        '<body><p style="color:red">Hi</p></body></html>'
+    )
+
+
+def test_full_document_without_head_gets_one_for_leftover_rules():
+    compiled = compile_email_template(
+        html='<html lang="en"><body><p>Hi</p></body></html>',
+        css="p{color:red} @media (max-width:600px){p{font-size:12px}}",
+    )
+
+    assert compiled.html == (
+        '<html lang="en"><head><style>@media (max-width:600px){p{font-size:12px}}</style></head>'
+        '<body><p style="color:red">Hi</p></body></html>'
+    )
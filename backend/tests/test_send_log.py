@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from sqlalchemy import event, select
+
+from email_marketing_backend.db.models import Campaign, EmailSend, EmailTemplate, Organization
+from email_marketing_backend.extensions import db
+from email_marketing_backend.services.campaign_stats import get_campaign_stats
+from email_marketing_backend.services.send_log import EmailSendWriter
+
+
+def make_campaign() -> Campaign:
+    org = Organization(name="Writer Org", slug="writer-org")
+    db.session.add(org)
+    db.session.flush()
+    template = EmailTemplate(organization_id=org.id, name="T", html="<p>x</p>")
+    db.session.add(template)
+    db.session.flush()
+    campaign = Campaign(organization_id=org.id, name="C", template_id=template.id)
+    db.session.add(campaign)
+    db.session.commit()
+    return campaign
+
+
+def test_writer_batches_inserts_and_status_updates(app):
+    campaign = make_campaign()
+    statements: list[str] = []
+    stats_statements: list[str] = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        verb = statement.split()[0].upper()
+        if "campaign_stats" in statement:
+            stats_statements.append(verb)
+        else:
+            statements.append(verb)
+
+    engine = db.engine
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        with EmailSendWriter(
+            organization_id=campaign.organization_id, campaign_id=campaign.id, flush_size=100
+        ) as writer:
+            emails = [f"user{idx}@example.com" for idx in range(50)]
+            writer.queue(emails)
+            for idx, email in enumerate(emails):
+                if idx % 10 == 0:
+                    writer.record(email, "failed", "550 mailbox unavailable")
+                else:
+                    writer.record(email, "sent")
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert statements.count("INSERT") == 1
+    assert statements.count("UPDATE") == 2
+    # The counters row is created on first use, then moved once per write.
+    assert stats_statements == ["UPDATE", "INSERT", "UPDATE", "UPDATE"]
+    assert get_campaign_stats(db.session, [campaign.id])[campaign.id] == {
+        "queued": 0,
+        "sent": 45,
+        "failed": 5,
+        "deferred": 0,
+        "total": 50,
+    }
+
+    rows = (
+        db.session.execute(select(EmailSend).where(EmailSend.campaign_id == campaign.id))
+        .unique()
+        .scalars()
+        .all()
+    )
+    assert len(rows) == 50
+    assert sum(1 for row in rows if row.status == "sent") == 45
+    assert {row.error for row in rows if row.status == "failed"} == {"550 mailbox unavailable"}
+
+
+def test_writer_flushes_every_window(app):
+    campaign = make_campaign()
+    writer = EmailSendWriter(
+        organization_id=campaign.organization_id, campaign_id=campaign.id, flush_size=2
+    )
+    writer.queue(["a@example.com", "b@example.com", "c@example.com"])
+    writer.record("a@example.com", "sent")
+    writer.record("b@example.com", "sent")
+    writer.record("c@example.com", "sent")
+
+    statuses = db.session.execute(
+        select(EmailSend.to_email, EmailSend.status).where(EmailSend.campaign_id == campaign.id)
+    ).all()
+    assert dict(statuses) == {
+        "a@example.com": "sent",
+        "b@example.com": "sent",
+        "c@example.com": "queued",
+    }
+
+    writer.flush()
+    assert db.session.scalar(
+        select(EmailSend.status).where(EmailSend.to_email == "c@example.com")
+    ) == "sent"
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import smtplib
+
+import pytest
+
+from email_marketing_backend.services.smtp_pool import SMTPConnectionPool, is_transient_error
+from email_marketing_backend.services.smtp_sink import SMTPSink
+
+
+@pytest.fixture()
+def sink():
+    with SMTPSink() as server:
+        yield server
+
+
+def make_pool(sink: SMTPSink, **kwargs) -> SMTPConnectionPool:
+    return SMTPConnectionPool(host=sink.host, port=sink.port, timeout=5, **kwargs)
+
+
+def test_pool_reuses_session_across_messages(sink):
+    pool = make_pool(sink)
+    for idx in range(5):
+        pool.sendmail("from@example.com", [f"to{idx}@example.com"], b"Subject: hi\r\n\r\nbody\r\n")
+    pool.close()
+
+    assert sink.message_count == 5
+    assert sink.connection_count == 1
+    assert sink.command_counts.get("EHLO") == 1
+
+
+def test_pool_caps_messages_per_connection(sink):
+    pool = make_pool(sink, max_messages_per_connection=2)
+    for idx in range(5):
+        pool.sendmail("from@example.com", [f"to{idx}@example.com"], b"Subject: hi\r\n\r\nbody\r\n")
+    pool.close()
+
+    assert sink.message_count == 5
+    assert sink.connection_count == 3
+
+
+def test_pool_reconnects_after_dropped_socket(sink):
+    sink.drop_after_messages = 1
+    pool = make_pool(sink)
+    for idx in range(3):
+        pool.sendmail("from@example.com", [f"to{idx}@example.com"], b"Subject: hi\r\n\r\nbody\r\n")
+    pool.close()
+
+    assert sink.message_count == 3
+    assert sink.connection_count == 3
+
+
+def test_pool_reconnects_after_421(sink):
+    replies = iter([(421, "Service shutting down")])
+    sink.data_handler = lambda _rcpts: next(replies, None)
+    pool = make_pool(sink)
+    pool.sendmail("from@example.com", ["to@example.com"], b"Subject: hi\r\n\r\nbody\r\n")
+    pool.close()
+
+    assert sink.message_count == 1
+    assert sink.connection_count == 2
+
+
+def test_pool_resets_session_after_refused_recipient(sink):
+    sink.rcpt_handler = lambda addr: (550, "No such user") if addr.startswith("bad") else None
+    pool = make_pool(sink, health_check_after=0)
+
+    with pytest.raises(smtplib.SMTPRecipientsRefused):
+        pool.sendmail("from@example.com", ["bad@example.com"], b"Subject: hi\r\n\r\nbody\r\n")
+    pool.sendmail("from@example.com", ["good@example.com"], b"Subject: hi\r\n\r\nbody\r\n")
+    pool.close()
+
+    assert sink.message_count == 1
+    assert sink.connection_count == 1
+    assert sink.command_counts.get("NOOP", 0) + sink.command_counts.get("RSET", 0) >= 1
+
+
+def test_transient_errors_are_4xx_and_network_failures():
+    assert is_transient_error(smtplib.SMTPDataError(451, b"Try again later"))
+    assert is_transient_error(smtplib.SMTPRecipientsRefused({"a@x.test": (452, b"Full")}))
+    assert is_transient_error(smtplib.SMTPServerDisconnected("gone"))
+    assert is_transient_error(ConnectionResetError())
+    assert is_transient_error(TimeoutError())
+    assert not is_transient_error(smtplib.SMTPRecipientsRefused({"a@x.test": (550, b"Unknown")}))
+    assert not is_transient_error(smtplib.SMTPDataError(554, b"Rejected"))
+    assert not is_transient_error(ValueError("bad header"))
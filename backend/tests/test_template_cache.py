@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from email_marketing_backend.services.template_cache import RenderedTemplate, TemplateCache
+
+
+def _rendered(template_id: int, version: str = "v1", size: int = 10) -> RenderedTemplate:
+    return RenderedTemplate(template_id, version, None, "x" * size, "", "hash")
+
+
+class FakeShared:
+    def __init__(self) -> None:
+        self.items: dict[tuple[int, str], RenderedTemplate] = {}
+
+    def get(self, template_id, version):
+        return self.items.get((template_id, version))
+
+    def set(self, rendered):
+        self.items[(rendered.template_id, rendered.version)] = rendered
+
+
+def test_cache_evicts_least_recently_used_by_size():
+    cache = TemplateCache(max_bytes=25)
+    cache.put(_rendered(1))
+    cache.put(_rendered(2))
+    assert cache.get(1, "v1") is not None  # 1 is now the most recent
+    cache.put(_rendered(3))
+
+    assert cache.get(2, "v1") is None
+    assert cache.get(1, "v1") is not None
+    assert cache.get(1, "v2") is None  # a saved template is a new key
+    assert cache.stats() == {
+        "entries": 2,
+        "bytes": 20,
+        "max_bytes": 25,
+        "hits": 2,
+        "shared_hits": 0,
+        "misses": 2,
+        "evictions": 1,
+    }
+
+
+def test_shared_tier_fills_the_local_cache():
+    shared = FakeShared()
+    TemplateCache(max_bytes=100, shared=shared).put(_rendered(7))
+
+    other_worker = TemplateCache(max_bytes=100, shared=shared)
+    assert other_worker.get(7, "v1") == _rendered(7)
+    assert other_worker.get(7, "v1") == _rendered(7)
+    assert other_worker.stats()["shared_hits"] == 1
+    assert other_worker.stats()["hits"] == 1
+
+
+def test_batches_do_not_read_the_template_table(client, auth_headers, monkeypatch):
+    from sqlalchemy import event
+
+    from email_marketing_backend.db.models import Contact
+    from email_marketing_backend.extensions import db
+    from email_marketing_backend.tasks import campaigns as campaign_tasks
+
+    me = client.get("/api/auth/me", headers=auth_headers).get_json()
+    org_id = me["user"]["organization_id"]
+    db.session.add_all(
+        [Contact(email=f"cache{idx}@example.com", organization_id=org_id) for idx in range(5)]
+    )
+    db.session.commit()
+    template = client.post(
+        "/api/templates",
+        json={"name": "Cached", "subject": "Hello", "html": "<p>Hi</p>"},
+        headers=auth_headers,
+    ).get_json()["data"]
+    campaign_id = client.post(
+        "/api/campaigns",
+        json={"name": "Cached", "template_id": template["id"]},
+        headers=auth_headers,
+    ).get_json()["data"]["id"]
+    monkeypatch.setattr(campaign_tasks, "send_prepared_email", lambda prepared, to_emails: {})
+    client.application.config["CAMPAIGN_BATCH_SIZE"] = 2
+
+    dispatched = {}
+
+    def fake_chord(header):
+        dispatched["header"] = list(header.tasks)
+        return lambda callback: None
+
+    monkeypatch.setattr(campaign_tasks, "chord", fake_chord)
+    campaign_tasks.dispatch_campaign(campaign_id)
+    db.session.expunge_all()
+
+    statements = []
+
+    def listener(conn, cursor, statement, *_args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        results = [
+            campaign_tasks.send_campaign_batch(*signature.args)
+            for signature in dispatched["header"]
+        ]
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+
+    assert [result["recipients"] for result in results] == [2, 2, 1]
+    assert statements
+    assert not [sql for sql in statements if "email_templates" in sql]
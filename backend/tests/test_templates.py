@@ -4,10 +4,11 @@ from __future__ import annotations
 def test_template_crud_and_send_test(client, auth_headers, monkeypatch):
     sent = {}
 
-    def fake_send_html_email(*, to_email: str, subject: str, html: str) -> None:
+    def fake_send_html_email(*, to_email: str, subject: str, html: str, text: str) -> None:
         sent["to"] = to_email
         sent["subject"] = subject
         sent["html"] = html
+        sent["text"] = text
 
     monkeypatch.setattr("email_marketing_backend.api.templates.send_html_email", fake_send_html_email)
 
@@ -19,6 +20,7 @@ def test_template_crud_and_send_test(client, auth_headers, monkeypatch):
     assert create.status_code == 201
     template = create.get_json()["data"]
     assert template["name"] == "Welcome"
+    assert len(template["content_hash"]) == 64
 
     list_resp = client.get("/api/templates", headers=auth_headers)
     assert list_resp.status_code == 200
@@ -42,3 +44,30 @@ def test_template_crud_and_send_test(client, auth_headers, monkeypatch):
     assert sent["to"] == "test@example.com"
     assert "Updated subject" in sent["subject"]
 
+    assert '<h1 style="color:red">Hi</h1>' in sent["html"]
+    assert sent["text"] == "Hi"
+
+
+def test_template_list_returns_paged_summaries(client, auth_headers):
+    ids = [
+        client.post(
+            "/api/templates",
+            json={"name": f"T{idx}", "html": "<p>body</p>", "project_data": {"pages": []}},
+            headers=auth_headers,
+        ).get_json()["data"]["id"]
+        for idx in range(3)
+    ]
+
+    first = client.get("/api/templates?limit=2", headers=auth_headers).get_json()
+    assert [item["id"] for item in first["data"]] == ids[:0:-1]
+    assert not {"html", "css", "project_data"} & set(first["data"][0])
+
+    rest = client.get(
+        f"/api/templates?limit=2&cursor={first['next_cursor']}", headers=auth_headers
+    ).get_json()
+    assert [item["id"] for item in rest["data"]] == [ids[0]]
+    assert rest["next_cursor"] is None
+
+    full = client.get(f"/api/templates/{ids[0]}", headers=auth_headers).get_json()["data"]
+    assert full["project_data"] == {"pages": []}
+    assert client.get("/api/templates?cursor=bogus", headers=auth_headers).status_code == 400
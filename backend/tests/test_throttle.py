@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from email_marketing_backend.services.throttle import (
+    MemoryThrottleStore,
+    RedisThrottleStore,
+    SendThrottle,
+    parse_domain_rates,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture(params=["memory", "redis"])
+def store(request, clock, monkeypatch):
+    if request.param == "memory":
+        return MemoryThrottleStore(clock)
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    from fakeredis.commands_mixins import server_mixin
+
+    # The Lua scripts read the clock with Redis TIME.
+    monkeypatch.setattr(server_mixin, "time", SimpleNamespace(time=clock))
+    return RedisThrottleStore(fakeredis.FakeRedis())
+
+
+def test_domain_bucket_limits_rate_after_burst(store, clock):
+    throttle = SendThrottle(store, domain_rate=2, domain_burst=2)
+
+    assert throttle.reserve("acct", "gmail.com") == 0
+    assert throttle.reserve("acct", "gmail.com") == 0
+    assert throttle.reserve("acct", "gmail.com") == pytest.approx(0.5)
+    # Other domains have their own bucket.
+    assert throttle.reserve("acct", "outlook.com") == 0
+
+    clock.now += 0.5
+    assert throttle.reserve("acct", "gmail.com") == 0
+
+
+def test_account_bucket_applies_across_domains(store):
+    throttle = SendThrottle(store, account_rate=1, account_burst=1)
+
+    assert throttle.reserve("acct", "a.com") == 0
+    assert throttle.reserve("acct", "b.com") == pytest.approx(1.0)
+    assert throttle.reserve("other", "b.com") == 0
+
+
+def test_no_tokens_consumed_when_any_bucket_is_empty(store, clock):
+    throttle = SendThrottle(
+        store, account_rate=1, account_burst=1, domain_rate=10, domain_burst=1
+    )
+    assert throttle.reserve("acct", "a.com") == 0
+    assert throttle.reserve("acct", "b.com") > 0
+
+    clock.now += 1
+    # b.com's bucket was not drained by the refused attempt above.
+    assert throttle.reserve("acct", "b.com") == 0
+
+
+def test_deferrals_back_off_and_recover(store, clock):
+    throttle = SendThrottle(
+        store,
+        domain_rates={"gmail.com": 10},
+        domain_burst=1,
+        backoff_factor=0.5,
+        recovery_seconds=100,
+    )
+    assert throttle.penalize("gmail.com") == pytest.approx(0.5)
+    assert throttle.penalize("gmail.com") == pytest.approx(0.25)
+
+    assert throttle.reserve("acct", "gmail.com") == 0
+    # 10/s scaled by 0.25 -> 2.5/s -> 0.4s per token.
+    assert throttle.reserve("acct", "gmail.com") == pytest.approx(0.4)
+
+    clock.now += 75
+    assert throttle.penalize("gmail.com") == pytest.approx(0.5)
+
+
+def test_unlimited_when_rates_are_zero(store):
+    throttle = SendThrottle(store)
+    assert all(throttle.reserve("acct", "a.com") == 0 for _ in range(100))
+
+
+def test_parse_domain_rates():
+    assert parse_domain_rates("Gmail.com=20, outlook.com=10,") == {
+        "gmail.com": 20.0,
+        "outlook.com": 10.0,
+    }
+    assert parse_domain_rates(None) == {}
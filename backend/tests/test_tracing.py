@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import pytest
+from celery import Celery
+from celery.signals import after_task_publish
+
+from email_marketing_backend import create_app
+from email_marketing_backend.config import settings
+from email_marketing_backend.extensions import db
+from email_marketing_backend.services.async_smtp import AsyncSMTPDispatcher
+from email_marketing_backend.services.smtp_sink import SMTPSink
+from email_marketing_backend.tracing import (
+    TRACEPARENT,
+    FileExporter,
+    get_exporter,
+    read_spans,
+    set_exporter,
+    span,
+    summarize_trace,
+)
+
+
+@pytest.fixture()
+def traced_app(monkeypatch):
+    monkeypatch.setattr(settings, "trace_exporter", "memory")
+    app = create_app()
+    app.config.update(TESTING=True)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+    set_exporter(None)
+
+
+def test_tracing_is_off_by_default(app, client):
+    assert get_exporter() is None
+    with span("unused") as current:
+        assert current is None
+    assert "X-Trace-Id" not in client.get("/api/healthz").headers
+
+
+def test_request_span_continues_incoming_traceparent(traced_app):
+    trace_id, parent_id = "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7"
+
+    response = traced_app.test_client().get(
+        "/api/healthz", headers={TRACEPARENT: f"00-{trace_id}-{parent_id}-01"}
+    )
+
+    assert response.headers["X-Trace-Id"] == trace_id
+    (root,) = get_exporter().trace(trace_id)
+    assert root.name == "GET /api/healthz"
+    assert root.parent_id == parent_id
+    assert root.attributes["status"] == 200
+
+
+def test_trace_follows_task_through_celery_headers(traced_app):
+    broker = Celery("trace-test", broker="memory://", backend="cache+memory://")
+    published: list[dict] = []
+
+    @broker.task(name="tests.traced")
+    def traced():
+        with span("inside task"):
+            return "ok"
+
+    def capture(headers=None, **_kwargs):
+        published.append(dict(headers))
+
+    after_task_publish.connect(capture, weak=False)
+    try:
+        with span("request") as request_span:
+            traced.delay()
+    finally:
+        after_task_publish.disconnect(capture)
+
+    # Run the published message the way a worker would see its headers.
+    (headers,) = published
+    traced.apply(headers={key: headers[key] for key in (TRACEPARENT, "trace_enqueued_at")})
+
+    spans = {item.name: item for item in get_exporter().trace(request_span.trace_id)}
+    assert set(spans) == {
+        "request",
+        "celery.enqueue",
+        "celery.queue_wait",
+        "celery.task",
+        "inside task",
+    }
+    enqueue = spans["celery.enqueue"]
+    assert enqueue.parent_id == request_span.span_id
+    assert headers[TRACEPARENT] == enqueue.traceparent
+    assert spans["celery.queue_wait"].parent_id == enqueue.span_id
+    assert spans["celery.task"].parent_id == enqueue.span_id
+    assert spans["celery.task"].attributes["state"] == "SUCCESS"
+    assert spans["inside task"].parent_id == spans["celery.task"].span_id
+
+
+def test_async_smtp_sessions_are_child_spans(traced_app):
+    with SMTPSink() as sink, span("campaign.batch") as batch_span:
+        dispatcher = AsyncSMTPDispatcher(host=sink.host, port=sink.port, timeout=5, concurrency=2)
+        dispatcher.run(
+            "from@example.com",
+            ((f"user{idx}@example.com", b"Subject: hi\r\n\r\nx\r\n") for idx in range(6)),
+            lambda to, error: None,
+        )
+
+    sessions = [s for s in get_exporter().trace(batch_span.trace_id) if s.name == "smtp.session"]
+    assert len(sessions) == 2
+    assert {s.parent_id for s in sessions} == {batch_span.span_id}
+    assert sum(s.attributes["messages"] for s in sessions) == 6
+
+
+def test_file_exporter_feeds_show_trace(traced_app, tmp_path):
+    path = tmp_path / "traces.jsonl"
+    set_exporter(FileExporter(str(path)))
+    with span("POST /api/campaigns/<int:campaign_id>/send") as root:
+        for _ in range(3):
+            with span("campaign.batch"):
+                with span("smtp.connect"):
+                    pass
+
+    spans = read_spans(str(path), root.trace_id)
+    assert [(depth, name, count) for depth, name, count, _ms in summarize_trace(spans)] == [
+        (0, "POST /api/campaigns/<int:campaign_id>/send", 1),
+        (1, "campaign.batch", 3),
+        (2, "smtp.connect", 3),
+    ]
+
+    traced_app.config.update(TRACE_FILE=str(path))
+    result = traced_app.test_cli_runner().invoke(args=["show-trace", root.trace_id])
+    assert result.exit_code == 0
+    assert "  campaign.batch x3" in result.output
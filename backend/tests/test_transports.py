@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import os
+from email import message_from_bytes
+
+import pytest
+
+from email_marketing_backend.services.email import (
+    async_dispatch_enabled,
+    close_mail_transport,
+    get_mail_transport,
+    prepare_html_email,
+    send_prepared_email,
+)
+from email_marketing_backend.services.smtp_sink import SMTPSink
+from email_marketing_backend.services.transports import (
+    MaildirTransport,
+    NullTransport,
+    SMTPTransport,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_transport():
+    yield
+    close_mail_transport()
+
+
+def test_null_transport_counts_without_sending(app):
+    app.config.update(MAIL_TRANSPORT="null", SMTP_DISPATCH_MODE="async")
+    transport = get_mail_transport()
+    assert isinstance(transport, NullTransport)
+    assert not async_dispatch_enabled()
+
+    prepared = prepare_html_email(subject="Hi", html="<p>x</p>")
+    assert send_prepared_email(prepared, ["a@x.test", "b@x.test"]) == {}
+    send_prepared_email(prepared, "c@x.test")
+
+    assert get_mail_transport() is transport
+    assert (transport.messages, transport.recipients) == (2, 3)
+    assert transport.bytes > 0
+
+
+def test_maildir_transport_spools_with_envelope(app, tmp_path):
+    app.config.update(MAIL_TRANSPORT="maildir", MAIL_SPOOL_DIR=str(tmp_path))
+    assert isinstance(get_mail_transport(), MaildirTransport)
+
+    prepared = prepare_html_email(subject="Spooled", html="<p>x</p>")
+    send_prepared_email(prepared, ["a@x.test", "b@x.test"])
+
+    assert os.listdir(tmp_path / "tmp") == []
+    (name,) = os.listdir(tmp_path / "new")
+    message = message_from_bytes((tmp_path / "new" / name).read_bytes())
+    assert message["X-Envelope-To"] == "<a@x.test>, <b@x.test>"
+    assert message["Subject"] == "Spooled"
+
+
+def test_smtp_transport_opens_a_session_per_message(app):
+    with SMTPSink() as sink:
+        app.config.update(MAIL_TRANSPORT="smtp", SMTP_HOST=sink.host, SMTP_PORT=sink.port)
+        assert isinstance(get_mail_transport(), SMTPTransport)
+        prepared = prepare_html_email(subject="Hi", html="<p>x</p>")
+        send_prepared_email(prepared, "a@x.test")
+        send_prepared_email(prepared, "b@x.test")
+
+    assert sink.message_count == 2
+    assert sink.connection_count == 2
+
+
+def test_unknown_transport_is_rejected(app):
+    app.config.update(MAIL_TRANSPORT="carrier-pigeon")
+    with pytest.raises(ValueError):
+        get_mail_transport()